@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+#
+# Benchmark the --alias-index device-alias index against parsing show device-alias database on every run
+#
+# Usage: python bench/bench_alias_index.py [--aliases 50000] [--lookups 768] [--runs 10]
+#
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, bench_dir)
+sys.path.insert(0, os.path.dirname(bench_dir))
+import show_int_tabular
+
+parser = argparse.ArgumentParser(prog='bench_alias_index', description='Benchmark building and using the device-alias index')
+parser.add_argument('--aliases', type=int, default=50000, help='Number of device-aliases in the database. Default 50000')
+parser.add_argument('--lookups', type=int, default=768, help='Number of F port PWWNs looked up. Default 768')
+parser.add_argument('--runs', type=int, default=10, help='Runs of each case. Best run is reported. Default 10')
+args = parser.parse_args()
+
+pwwn_list = ['21:00:00:24:ff:%02x:%02x:%02x' % (alias_num >> 16, (alias_num >> 8) & 255, alias_num & 255) for alias_num in range(args.aliases)]
+show_da_database_str = ''.join(['device-alias name host%d_hba0 pwwn %s\n' % (alias_num, pwwn) for alias_num, pwwn in enumerate(pwwn_list)])
+lookup_pwwn_list = random.sample(pwwn_list, min(args.lookups, args.aliases))
+
+alias_index_name = os.path.join(tempfile.mkdtemp(), 'alias')
+parse_time_list = []
+build_time_list = []
+lookup_time_list = []
+for run in range(args.runs):
+    start = time.time()
+    alias_list = show_int_tabular.parse_show_device_alias_database(show_da_database_str)
+    alias_dict = dict(alias_list)
+    device_alias_list = [alias_dict.get(pwwn, '') for pwwn in lookup_pwwn_list]
+    parse_time_list.append(time.time() - start)
+    start = time.time()
+    show_int_tabular.save_alias_index(alias_index_name, b'\0' * 20, alias_list)
+    build_time_list.append(time.time() - start)
+    start = time.time()
+    alias_index_dict = show_int_tabular.open_alias_index(alias_index_name)
+    index_device_alias_list = [show_int_tabular.lookup_alias_index(alias_index_dict, pwwn) for pwwn in lookup_pwwn_list]
+    show_int_tabular.close_alias_index(alias_index_dict)
+    lookup_time_list.append(time.time() - start)
+if index_device_alias_list != device_alias_list:
+    print('Device-alias index lookups do not match the database')
+    sys.exit(1)
+print('%d aliases: %d bytes' % (args.aliases, os.path.getsize(alias_index_name)))
+print('parse database + %d lookups: %.2f ms' % (len(lookup_pwwn_list), min(parse_time_list) * 1000))
+print('build index: %.2f ms' % (min(build_time_list) * 1000))
+print('open index + %d lookups: %.2f ms' % (len(lookup_pwwn_list), min(lookup_time_list) * 1000))
+os.remove(alias_index_name)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+#
+# Benchmark parsing a sample of show interface counters detailed output with the interface blocks of the previous
+# sample kept (watch mode and the exporter) vs parsing every block
+#
+# Two outputs of a generated switch with different counter values are made. The previous sample is the first, the
+# next sample has the blocks of the second output for a fraction of the interfaces (the ports that changed) and the
+# blocks of the first for the others. The parse of the next sample is timed with and without the block cache of the
+# previous sample and the interface tables are compared.
+#
+# Usage: python bench/bench_block_cache.py [--intfs 768] [--runs 5]
+#
+import argparse
+import os
+import random
+import sys
+import time
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, bench_dir)
+sys.path.insert(0, os.path.dirname(bench_dir))
+import gen_outputs
+import show_int_tabular
+
+def get_block_list(output):
+    return ['\n'.join([intf_line] + line_list) for intf_line, line_list in show_int_tabular.iter_intf_blocks(show_int_tabular.iter_lines(output))]
+
+#
+# Returns the interface table of the output and the seconds of the parse
+#
+def parse_sample(output, counter_list, block_cache_dict):
+    intf_table = show_int_tabular.create_intf_table(show_int_tabular.intf_info_var_list)
+    counter_index_dict = show_int_tabular.compile_counter_list(counter_list, intf_table)
+    start = time.time()
+    show_int_tabular.parse_show_int_counters(output, counter_index_dict, False, intf_table, [], block_cache_dict)
+    return intf_table, time.time() - start
+
+parser = argparse.ArgumentParser(prog='bench_block_cache', description='Benchmark the interface block cache of repeated samples')
+parser.add_argument('--intfs', type=int, default=768, help='Interfaces of the generated switch. Default 768')
+parser.add_argument('--runs', type=int, default=5, help='Runs of each case. Best run is reported. Default 5')
+args = parser.parse_args()
+
+gen_intf_list = gen_outputs.get_intf_list(args.intfs)
+prev_block_list = get_block_list(gen_outputs.gen_counters_new(gen_intf_list, random.Random(1)))
+changed_block_list = get_block_list(gen_outputs.gen_counters_new(gen_intf_list, random.Random(2)))
+counter_list = show_int_tabular.merge_counter_lists([show_int_tabular.build_counter_list(stat_type, True)[1]
+                                                     for stat_type in ['type_link_stats', 'type_congestion_stats', 'type_general_stats']])
+prev_output = '\n'.join(prev_block_list)
+rand = random.Random(3)
+
+print('%d interfaces, %d lines' % (args.intfs, prev_output.count('\n') + 1))
+print('%-10s %12s %12s %8s' % ('Changed', 'all ms', 'cached ms', 'Speedup'))
+for changed_percent in [0, 5, 25, 50, 100]:
+    changed_set = set(rand.sample(range(len(prev_block_list)), len(prev_block_list) * changed_percent // 100))
+    output = '\n'.join([changed_block_list[block_num] if block_num in changed_set else prev_block_list[block_num] for block_num in range(len(prev_block_list))])
+    all_seconds_list = []
+    cached_seconds_list = []
+    for run in range(args.runs):
+        intf_table, seconds = parse_sample(output, counter_list, None)
+        all_seconds_list.append(seconds)
+        block_cache_dict = {}
+        parse_sample(prev_output, counter_list, block_cache_dict)
+        cached_table, seconds = parse_sample(output, counter_list, block_cache_dict)
+        cached_seconds_list.append(seconds)
+        if cached_table != intf_table:
+            print('The interface tables are not the same with %d%% changed' % changed_percent)
+            sys.exit(1)
+    print('%9d%% %12.2f %12.2f %7.1fx' % (changed_percent, min(all_seconds_list) * 1000, min(cached_seconds_list) * 1000, min(all_seconds_list) / min(cached_seconds_list)))
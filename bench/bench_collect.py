@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+#
+# Benchmark concurrent vs serial issuing of the show commands
+#
+# Runs show_int_tabular.py with the stand-in cli module in this directory, so the time of each
+# run is mostly the modeled switch-side latency of the commands it issues
+#
+# Usage: python bench/bench_collect.py [--latency 0.5] [--runs 3]
+#
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+script = os.path.join(os.path.dirname(bench_dir), 'show_int_tabular.py')
+
+def run_script(script_args, latency):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = bench_dir
+    env['CLI_LATENCY'] = str(latency)
+    start = time.time()
+    subprocess.check_call([sys.executable, script] + script_args, env=env, stdout=open(os.devnull, 'w'))
+    return time.time() - start
+
+parser = argparse.ArgumentParser(prog='bench_collect', description='Benchmark concurrent vs serial show commands')
+parser.add_argument('--latency', type=float, default=0.5, help='Seconds each show command takes. Default 0.5')
+parser.add_argument('--runs', type=int, default=3, help='Runs of each case. Best run is reported. Default 3')
+args = parser.parse_args()
+
+print('%-30s %10s %10s %8s' % ('Case', 'Serial(s)', 'Conc.(s)', 'Speedup'))
+for case in [['--brief'], ['--brief', '--json'], ['--link-stats'], ['--sfp-stats', '--e']]:
+    serial_time = min([run_script(case + ['--serial'], args.latency) for run in range(args.runs)])
+    concurrent_time = min([run_script(case, args.latency) for run in range(args.runs)])
+    print('%-30s %10.2f %10.2f %7.1fx' % (' '.join(case), serial_time, concurrent_time, serial_time / concurrent_time))
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+#
+# Benchmark show_int_tabular.py --columns vs the stat types that have the same variables
+#
+# Runs main() in process on a generated switch with the stand-in cli module (no latency). For each case it reports
+# the time of the run and of the parse phase, the show commands issued and the bytes of their output. --columns
+# parses with the counter_list entries of its variables only and issues only the commands of their sources.
+#
+# Usage: python bench/bench_columns.py [--intfs 768] [--runs 5]
+#
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+os.environ['CLI_LATENCY'] = '0'
+sys.path.insert(0, bench_dir)
+sys.path.insert(0, os.path.dirname(bench_dir))
+import gen_outputs
+import replay
+import show_int_tabular
+
+#
+# Returns seconds of the run, seconds of the parse phase, commands issued, bytes of their output
+#
+def run_case(script_args):
+    seconds = replay.run_main(script_args, replay.CountingOutput())
+    command_list = show_int_tabular.timing_dict['commands']
+    return seconds, show_int_tabular.timing_dict['phases']['parse'], len(command_list), sum([command_entry[3] for command_entry in command_list])
+
+parser = argparse.ArgumentParser(prog='bench_columns', description='Benchmark show_int_tabular.py --columns')
+parser.add_argument('--intfs', type=int, default=768, help='Interfaces of the generated switch. Default 768')
+parser.add_argument('--runs', type=int, default=5, help='Runs of each case. Best run is reported. Default 5')
+args = parser.parse_args()
+
+replay_dir = tempfile.mkdtemp()
+try :
+    gen_outputs.write_replay_dir(replay_dir, args.intfs)
+    os.environ['CLI_REPLAY_DIR'] = replay_dir
+    print('%d interfaces' % args.intfs)
+    print('%-58s %8s %9s %5s %10s' % ('Case', 'run ms', 'parse ms', 'cmds', 'bytes'))
+    for case in [['--all'], ['--columns', 'invalid_crcs,txwait'],
+                 ['--link-stats', '--d'], ['--columns', 'invalid_crcs,description'],
+                 ['--sfp-detail-stats'], ['--columns', 'sfp_rx_power,sfp_tx_power'],
+                 ['--brief'], ['--columns', 'vsan,status,oper_speed']]:
+        result_list = [run_case(case) for run in range(args.runs)]
+        print('%-58s %8.1f %9.1f %5d %10d' % (' '.join(case), min([result[0] for result in result_list]) * 1000, min([result[1] for result in result_list]) * 1000, result_list[0][2], result_list[0][3]))
+finally:
+    shutil.rmtree(replay_dir)
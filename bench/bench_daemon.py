@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+#
+# Benchmark show_int_client.py with a resident show_int_tabular.py --daemon vs a cold start of show_int_tabular.py
+#
+# Each case is run as a new process, as an EEM policy runs it, on a generated switch with the stand-in cli module in
+# this directory. The end to end time includes starting the interpreter, the imports, the show commands and the
+# output. The daemon has served one request before the runs, so it has detected the NX-OS version. The outputs of
+# the client and the cold start are compared.
+#
+# Usage: python bench/bench_daemon.py [--intfs 768] [--latency 0.5] [--runs 5]
+#
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+script_dir = os.path.dirname(bench_dir)
+sys.path.insert(0, bench_dir)
+import gen_outputs
+
+#
+# Returns seconds of the run and its output without the clock of the stat type lines
+#
+def run_script(script_name, script_args, env):
+    start = time.time()
+    output = subprocess.check_output([sys.executable, os.path.join(script_dir, script_name)] + script_args, env=env)
+    seconds = time.time() - start
+    return seconds, re.sub(b'(?m)^20[0-9/]* [0-9:]*', b'', output)
+
+parser = argparse.ArgumentParser(prog='bench_daemon', description='Benchmark show_int_client.py with a --daemon vs a cold start')
+parser.add_argument('--intfs', type=int, default=768, help='Interfaces of the generated switch. Default 768')
+parser.add_argument('--latency', type=float, default=0.5, help='Seconds each show command takes. Default 0.5')
+parser.add_argument('--runs', type=int, default=5, help='Runs of each case. Best run is reported. Default 5')
+args = parser.parse_args()
+
+temp_dir = tempfile.mkdtemp()
+daemon_process = None
+try :
+    replay_dir = os.path.join(temp_dir, 'replay')
+    gen_outputs.write_replay_dir(replay_dir, args.intfs)
+    socket_name = os.path.join(temp_dir, 'show_int_tabular.sock')
+    env = dict(os.environ)
+    env['PYTHONPATH'] = bench_dir
+    env['CLI_REPLAY_DIR'] = replay_dir
+    env['CLI_LATENCY'] = str(args.latency)
+    env['SHOW_INT_TABULAR_SOCKET'] = socket_name
+    daemon_process = subprocess.Popen([sys.executable, os.path.join(script_dir, 'show_int_tabular.py'), '--daemon', socket_name], env=env, stdout=subprocess.PIPE)
+    daemon_process.stdout.readline()
+    run_script('show_int_client.py', ['--link-stats'], env)
+    print('%d interfaces, %.2fs per show command' % (args.intfs, args.latency))
+    print('%-26s %10s %10s %8s' % ('Case', 'Cold(s)', 'Client(s)', 'Speedup'))
+    for case in [['--link-stats'], ['--sfp-stats'], ['--all', '--wide'], ['--brief'], ['--link-stats', 'fc1/1-4']]:
+        cold_result_list = [run_script('show_int_tabular.py', case, env) for run in range(args.runs)]
+        client_result_list = [run_script('show_int_client.py', case, env) for run in range(args.runs)]
+        if client_result_list[0][1] != cold_result_list[0][1]:
+            print('The output of the client is not the same as the cold start for ' + ' '.join(case))
+            sys.exit(1)
+        cold_seconds = min([result[0] for result in cold_result_list])
+        client_seconds = min([result[0] for result in client_result_list])
+        print('%-26s %10.3f %10.3f %7.1fx' % (' '.join(case), cold_seconds, client_seconds, cold_seconds / client_seconds))
+finally:
+    if daemon_process != None:
+        daemon_process.terminate()
+        daemon_process.wait()
+    shutil.rmtree(temp_dir)
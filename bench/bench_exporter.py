@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+#
+# Benchmark show_int_tabular.py --exporter: concurrent scrapers sharing the cached sample
+#
+# The exporter is run on a generated switch with the stand-in cli module and --scrapers threads scrape it
+# back to back for --seconds. Reports the scrapes, the collections they caused and the scrape latency.
+# Without the shared sample every scrape would be a collection.
+#
+# Usage: python bench/bench_exporter.py [--intfs 768] [--scrapers 8] [--seconds 10] [--refresh 5s] [--latency 0.5]
+#
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+try :
+    from urllib.request import urlopen
+except ImportError:
+    from urllib2 import urlopen
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+script = os.path.join(os.path.dirname(bench_dir), 'show_int_tabular.py')
+sys.path.insert(0, bench_dir)
+import gen_outputs
+
+#
+# Scrape url until end_time, appending the seconds of each scrape to latency_list
+#
+def scrape_thread(url, end_time, latency_list):
+    while time.time() < end_time:
+        start = time.time()
+        urlopen(url).read()
+        latency_list.append(time.time() - start)
+
+parser = argparse.ArgumentParser(prog='bench_exporter', description='Benchmark show_int_tabular.py --exporter with concurrent scrapers')
+parser.add_argument('--intfs', type=int, default=768, help='Interfaces of the generated switch. Default 768')
+parser.add_argument('--scrapers', type=int, default=8, help='Concurrent scrapers. Default 8')
+parser.add_argument('--seconds', type=float, default=10.0, help='Seconds to scrape. Default 10')
+parser.add_argument('--refresh', default='5s', help='--exporter-refresh of the exporter. Default 5s')
+parser.add_argument('--latency', default='0.5', help='Seconds each show command takes. Default 0.5')
+parser.add_argument('--port', type=int, default=19180, help='Port of the exporter. Default 19180')
+args = parser.parse_args()
+
+replay_dir = tempfile.mkdtemp()
+exporter = None
+try :
+    gen_outputs.write_replay_dir(replay_dir, args.intfs)
+    env = dict(os.environ)
+    env.update({'CLI_REPLAY_DIR': replay_dir, 'CLI_LATENCY': args.latency, 'PYTHONPATH': bench_dir})
+    exporter = subprocess.Popen([sys.executable, script, '--exporter', str(args.port), '--exporter-address', '127.0.0.1', '--exporter-refresh', args.refresh],
+                                env=env, stdout=subprocess.PIPE)
+    exporter.stdout.readline()
+    url = 'http://127.0.0.1:%d/metrics' % args.port
+    end_time = time.time() + args.seconds
+    latency_list = []
+    thread_list = [threading.Thread(target=scrape_thread, args=(url, end_time, latency_list)) for scraper in range(args.scrapers)]
+    for thread in thread_list:
+        thread.start()
+    for thread in thread_list:
+        thread.join()
+    metrics = urlopen(url).read().decode('utf-8')
+    exporter_metric_dict = dict([line.split() for line in metrics.splitlines() if line.startswith('mds_exporter_')])
+    latency_list.sort()
+    print('%d interfaces, %d scrapers for %.0fs, --exporter-refresh %s, %ss per command' % (args.intfs, args.scrapers, args.seconds, args.refresh, args.latency))
+    print('  scrapes          %8d' % len(latency_list))
+    print('  collections      %8d' % int(exporter_metric_dict['mds_exporter_collections_total']))
+    print('  collection s     %8.3f' % float(exporter_metric_dict['mds_exporter_collection_duration_seconds']))
+    print('  scrape p50 s     %8.3f' % latency_list[len(latency_list) // 2])
+    print('  scrape max s     %8.3f' % latency_list[-1])
+    print('  metrics bytes    %8d' % len(metrics))
+finally:
+    if exporter != None:
+        exporter.terminate()
+        exporter.wait()
+    shutil.rmtree(replay_dir)
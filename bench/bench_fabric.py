@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+#
+# Benchmark show_int_fabric.py: one switch at a time over one connection vs concurrent switches and pooled connections
+#
+# The switches are stub NX-API servers (nxapi_stub.py) replaying one generated switch, with --latency seconds for
+# each command to model the time the switch takes. The time of a collection is then mostly waiting, which is what
+# the workers and connection pool of show_int_fabric.py overlap.
+#
+# Usage: python bench/bench_fabric.py [--switches 16] [--intfs 96] [--latency 0.2] [--runs 3]
+#
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+script = os.path.join(os.path.dirname(bench_dir), 'show_int_fabric.py')
+sys.path.insert(0, bench_dir)
+import gen_outputs
+import nxapi_stub
+
+parser = argparse.ArgumentParser(prog='bench_fabric', description='Benchmark show_int_fabric.py against stub NX-API switches')
+parser.add_argument('--switches', type=int, default=16, help='Number of stub switches. Default 16')
+parser.add_argument('--intfs', type=int, default=96, help='Interfaces of each switch. Default 96')
+parser.add_argument('--latency', type=float, default=0.2, help='Seconds each command takes on a switch. Default 0.2')
+parser.add_argument('--port', type=int, default=18001, help='Port of the first stub switch. Default 18001')
+parser.add_argument('--runs', type=int, default=3, help='Runs of each case. Best run is reported. Default 3')
+args = parser.parse_args()
+
+case_list = [
+    ['serial', ['--workers', '1', '--connections', '1']],
+    ['workers', ['--connections', '1']],
+    ['workers+pool', []],
+]
+
+replay_dir = tempfile.mkdtemp()
+try :
+    gen_outputs.write_replay_dir(replay_dir, args.intfs)
+    nxapi_stub.start_stub_servers([replay_dir] * args.switches, args.port, args.latency)
+    switch_list = ['sw%d=127.0.0.1:%d' % (switch_num + 1, args.port + switch_num) for switch_num in range(args.switches)]
+    env = dict(os.environ)
+    env['SHOW_INT_FABRIC_PASSWORD'] = 'bench'
+    print('%d switches, %d interfaces each, %.3fs per command' % (args.switches, args.intfs, args.latency))
+    print('%-14s %-10s %8s' % ('Case', 'Type', 'Seconds'))
+    for stat_type in ['--link-stats', '--brief']:
+        for case_name, case_args in case_list:
+            elapsed_list = []
+            for run in range(args.runs):
+                start = time.time()
+                status = subprocess.call([sys.executable, script, '--http', '--batch', '4', stat_type] + case_args + switch_list, env=env,
+                                         stdout=open(os.devnull, 'w'))
+                elapsed_list.append(time.time() - start)
+                if status != 0:
+                    print('show_int_fabric.py ' + stat_type + ' ' + ' '.join(case_args) + ' failed')
+                    sys.exit(1)
+            print('%-14s %-10s %8.3f' % (case_name, stat_type[2:], min(elapsed_list)))
+finally:
+    shutil.rmtree(replay_dir)
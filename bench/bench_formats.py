@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+#
+# Benchmark show_int_tabular.py --format: the table vs csv, jsonl and json records
+#
+# Runs main() in process on a generated switch with the stand-in cli module (no latency). For each format it
+# reports the time from the start of the run to the first byte of the table or records written to stdout, the
+# time of the whole run and the bytes written.
+#
+# Usage: python bench/bench_formats.py [--intfs 768] [--runs 5] [--type link]
+#
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+os.environ['CLI_LATENCY'] = '0'
+sys.path.insert(0, bench_dir)
+sys.path.insert(0, os.path.dirname(bench_dir))
+import gen_outputs
+import replay
+import show_int_tabular
+
+#
+# Returns seconds to the first byte, seconds of the run, bytes written
+#
+def run_format(script_args):
+    counting_output = replay.CountingOutput()
+    start = time.time()
+    seconds = replay.run_main(script_args, counting_output)
+    return counting_output.first_write_time - start, seconds, counting_output.bytes
+
+parser = argparse.ArgumentParser(prog='bench_formats', description='Benchmark show_int_tabular.py --format')
+parser.add_argument('--intfs', type=int, default=768, help='Interfaces of the generated switch. Default 768')
+parser.add_argument('--runs', type=int, default=5, help='Runs of each format. Best run is reported. Default 5')
+parser.add_argument('--type', default='all', choices=['link', 'congestion', 'general', 'sfp', 'brief', 'all'], help='Stat type. Default all')
+args = parser.parse_args()
+
+replay_dir = tempfile.mkdtemp()
+try :
+    gen_outputs.write_replay_dir(replay_dir, args.intfs)
+    os.environ['CLI_REPLAY_DIR'] = replay_dir
+    type_args = ['--' + args.type] if args.type in ['all', 'brief'] else ['--' + args.type + '-stats']
+    print('%d interfaces, --%s' % (args.intfs, args.type))
+    print('%-6s %12s %10s %10s' % ('Format', 'first byte s', 'run s', 'bytes'))
+    for output_format in ['table', 'csv', 'jsonl', 'json']:
+        result_list = [run_format(type_args + ['--wide', '--format', output_format]) for run in range(args.runs)]
+        print('%-6s %12.4f %10.4f %10d' % (output_format, min([result[0] for result in result_list]), min([result[1] for result in result_list]), result_list[0][2]))
+finally:
+    shutil.rmtree(replay_dir)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+#
+# Benchmark recording samples in a --history file and the --query stats over it
+#
+# Usage: python bench/bench_history.py [--intfs 768] [--counters 15] [--samples 1440] [--runs 5]
+#
+import argparse
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, bench_dir)
+sys.path.insert(0, os.path.dirname(bench_dir))
+import show_int_tabular
+
+parser = argparse.ArgumentParser(prog='bench_history', description='Benchmark a history file and history queries')
+parser.add_argument('--intfs', type=int, default=768, help='Number of interfaces. Default 768')
+parser.add_argument('--counters', type=int, default=15, help='Number of counters per interface. Default 15')
+parser.add_argument('--samples', type=int, default=1440, help='Number of 1 minute samples in the history file. Default 1440 (a day)')
+parser.add_argument('--runs', type=int, default=5, help='Runs of each case. Best run is reported. Default 5')
+args = parser.parse_args()
+
+intf_list = ['fc%d/%d' % (intf_num // 48 + 1, intf_num % 48 + 1) for intf_num in range(args.intfs)]
+var_list = ['intf_counter_%d' % var_num for var_num in range(args.counters)]
+intf_table = show_int_tabular.create_intf_table(var_list)
+for intf in intf_list:
+    for var_name in var_list:
+        show_int_tabular.set_intf_value(intf_table, intf, var_name, random.randint(0, 2 ** 32))
+history_col_list = show_int_tabular.get_history_col_list(var_list, intf_table)
+
+history_name = os.path.join(tempfile.mkdtemp(), 'history')
+history_dict, error_str = show_int_tabular.open_history_for_write(history_name, history_col_list, intf_list, args.samples * 60, 60)
+start_time = time.time() - args.samples * 60
+write_time_list = []
+for run in range(args.runs):
+    start = time.time()
+    show_int_tabular.write_history_sample(history_dict, history_col_list, start_time + run * 60, intf_list, intf_table)
+    write_time_list.append(time.time() - start)
+#
+# Fill the other samples directly, counters increase by a random delta each minute
+#
+counter_list = [show_int_tabular.get_intf_value(intf_table, intf, var_name) for intf in intf_list for var_name in var_list]
+slot_len = args.intfs * history_dict['record_len']
+for slot_num in range(args.runs, args.samples):
+    counter_list = [counter + random.randint(0, 1000) for counter in counter_list]
+    record_list = [struct.pack(history_dict['record_format'], start_time + slot_num * 60, intf_num, 0, *counter_list[intf_num * args.counters:(intf_num + 1) * args.counters]) for intf_num in range(args.intfs)]
+    offset = history_dict['samples_offset'] + slot_num * slot_len
+    history_dict['mmap'][offset:offset + slot_len] = b''.join(record_list)
+show_int_tabular.close_history(history_dict)
+
+print('%d interfaces x %d counters x %d samples: %d bytes' % (args.intfs, args.counters, args.samples, os.path.getsize(history_name)))
+print('write sample: %.2f ms' % (min(write_time_list) * 1000))
+history_dict, error_str = show_int_tabular.open_history(history_name)
+query_list = [['array', show_int_tabular.query_history_array]]
+if show_int_tabular.numpy != None:
+    query_list.insert(0, ['numpy', show_int_tabular.query_history_numpy])
+for query_name, query_function in query_list:
+    for query_stat in ['delta', 'rate', 'max', 'p95']:
+        query_time_list = []
+        for run in range(args.runs):
+            start = time.time()
+            query_function(history_dict, 1, query_stat)
+            query_time_list.append(time.time() - start)
+        print('query %s %s: %.1f ms' % (query_name, query_stat, min(query_time_list) * 1000))
+show_int_tabular.close_history(history_dict)
+os.remove(history_name)
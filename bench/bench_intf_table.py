@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+#
+# Benchmark the interface table (one list per variable, counters as ints) vs the previous dictionary per interface
+# of strings
+#
+# The counters detailed, transceiver and brief outputs of a generated switch are parsed into an interface table with
+# the merged counter_list of all the stat types. The previous store is rebuilt from it the way the previous parser
+# left it: {intf: {variable name: string}} with 'NF' for the variables that were not found. The memory of each is
+# measured with tracemalloc while it is built.
+#
+# Usage: python bench/bench_intf_table.py [--intfs 768] [--runs 5]
+#
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, bench_dir)
+sys.path.insert(0, os.path.dirname(bench_dir))
+import gen_outputs
+import show_int_tabular
+
+#
+# Returns the result of function and the bytes allocated by it that are still in use
+#
+def get_memory(function, *function_args):
+    tracemalloc.start()
+    start_bytes = tracemalloc.get_traced_memory()[0]
+    result = function(*function_args)
+    used_bytes = tracemalloc.get_traced_memory()[0] - start_bytes
+    tracemalloc.stop()
+    return result, used_bytes
+
+def parse_intf_table(counter_list, output_list, brief_output):
+    intf_table = show_int_tabular.create_intf_table(show_int_tabular.intf_info_var_list)
+    intf_list = []
+    show_int_tabular.parse_show_int_brief(brief_output, False, None, intf_table, intf_list, {})
+    counter_index_dict = show_int_tabular.compile_counter_list(counter_list, intf_table)
+    for output in output_list:
+        show_int_tabular.parse_show_int_counters(output, counter_index_dict, False, intf_table, intf_list)
+    return intf_table, intf_list
+
+def build_variables_dict(intf_table, default_intf_dict):
+    show_int_variables_dict = {}
+    for intf in intf_table['intf_names']:
+        intf_variables_dict = dict(default_intf_dict)
+        for var_name in intf_table['var_list']:
+            var_value = show_int_tabular.get_intf_value(intf_table, intf, var_name)
+            if var_value != None:
+                intf_variables_dict[var_name] = str(var_value)
+        show_int_variables_dict[intf] = intf_variables_dict
+    return show_int_variables_dict
+
+parser = argparse.ArgumentParser(prog='bench_intf_table', description='Benchmark the interface table vs a dictionary per interface')
+parser.add_argument('--intfs', type=int, default=768, help='Interfaces of the generated switch. Default 768')
+parser.add_argument('--runs', type=int, default=5, help='Runs of each case. Best run is reported. Default 5')
+args = parser.parse_args()
+
+rand = random.Random(1)
+gen_intf_list = gen_outputs.get_intf_list(args.intfs)
+output_list = [gen_outputs.gen_counters_new(gen_intf_list, rand), gen_outputs.gen_transceiver(gen_intf_list, rand)]
+brief_output = gen_outputs.gen_brief(gen_intf_list)
+counter_list = show_int_tabular.merge_counter_lists([show_int_tabular.build_counter_list(stat_type, True)[1]
+                                                     for stat_type in ['type_link_stats', 'type_congestion_stats', 'type_general_stats', 'type_sfp_detail_stats']])
+column_names_list, column_widths_list, default_intf_dict = show_int_tabular.build_columns(counter_list)
+render_args = argparse.Namespace(filter_errorsonly = False, type_sfp_stats = False, type_sfp_detail_stats = False, sort = None)
+
+(intf_table, intf_list), table_bytes = get_memory(parse_intf_table, counter_list, output_list, brief_output)
+show_int_variables_dict, dict_bytes = get_memory(build_variables_dict, intf_table, default_intf_dict)
+parse_seconds_list = []
+render_seconds_list = []
+for run in range(args.runs):
+    start = time.time()
+    parse_intf_table(counter_list, output_list, brief_output)
+    parse_seconds_list.append(time.time() - start)
+    start = time.time()
+    show_int_tabular.build_table_rows(counter_list, intf_list, intf_table, list(column_widths_list), render_args)
+    render_seconds_list.append(time.time() - start)
+
+print('%d interfaces x %d variables' % (len(intf_list), len(intf_table['var_list'])))
+print('%-28s %10s %10s' % ('Store', 'KB', 'B/intf'))
+print('%-28s %10.1f %10d' % ('dictionary per interface', dict_bytes / 1024.0, dict_bytes // len(intf_list)))
+print('%-28s %10.1f %10d' % ('interface table', table_bytes / 1024.0, table_bytes // len(intf_list)))
+print('parse into table: %.2f ms' % (min(parse_seconds_list) * 1000))
+print('build rows:       %.2f ms' % (min(render_seconds_list) * 1000))
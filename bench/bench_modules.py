@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+#
+# Benchmark show_int_tabular.py --per-module: one show command per module vs one show command for all the interfaces
+#
+# Runs show_int_tabular.py on a generated switch with the stand-in cli module in this directory. Each command takes
+# the modeled latency plus a latency for each line of its output, so a command for all the interfaces of a large
+# switch takes as long as the commands of all its modules issued one after the other. The outputs of the cases are
+# compared so a case that parses differently fails the benchmark.
+#
+# Usage: python bench/bench_modules.py [--intfs 768] [--latency 0.5] [--line-latency 0.0001] [--runs 3]
+#
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+script = os.path.join(os.path.dirname(bench_dir), 'show_int_tabular.py')
+sys.path.insert(0, bench_dir)
+import gen_outputs
+
+#
+# Returns seconds of the run and its output without the clock of the stat type lines
+#
+def run_script(script_args, env):
+    start = time.time()
+    output = subprocess.check_output([sys.executable, script] + script_args, env=env)
+    seconds = time.time() - start
+    return seconds, re.sub(b'(?m)^20[0-9/]* [0-9:]*', b'', output)
+
+parser = argparse.ArgumentParser(prog='bench_modules', description='Benchmark show_int_tabular.py --per-module')
+parser.add_argument('--intfs', type=int, default=768, help='Interfaces of the generated switch. Default 768')
+parser.add_argument('--latency', type=float, default=0.5, help='Seconds each show command takes. Default 0.5')
+parser.add_argument('--line-latency', type=float, default=0.0001, help='Seconds each line of output adds to a show command. Default 0.0001')
+parser.add_argument('--runs', type=int, default=3, help='Runs of each case. Best run is reported. Default 3')
+args = parser.parse_args()
+
+replay_dir = tempfile.mkdtemp()
+try :
+    gen_outputs.write_replay_dir(replay_dir, args.intfs)
+    env = dict(os.environ)
+    env['PYTHONPATH'] = bench_dir
+    env['CLI_REPLAY_DIR'] = replay_dir
+    env['CLI_LATENCY'] = str(args.latency)
+    env['CLI_LATENCY_PER_LINE'] = str(args.line_latency)
+    print('%d interfaces, %d modules' % (args.intfs, len(set([intf.rsplit('/', 1)[0] for intf in gen_outputs.get_intf_list(args.intfs)]))))
+    print('%-22s %-36s %8s %8s' % ('Stat type', 'Case', 'run s', 'Speedup'))
+    for type_args in [['--link-stats'], ['--all', '--wide'], ['--sfp-detail-stats']]:
+        base_seconds = None
+        base_output = None
+        for case_name, case_args in [['one command', []], ['--per-module', ['--per-module']],
+                                     ['--per-module --parse-processes 4', ['--per-module', '--parse-processes', '4']]]:
+            result_list = [run_script(type_args + case_args, env) for run in range(args.runs)]
+            seconds = min([result[0] for result in result_list])
+            if base_seconds == None:
+                base_seconds = seconds
+                base_output = result_list[0][1]
+            elif result_list[0][1] != base_output:
+                print('The output of %s %s is not the same as one command' % (' '.join(type_args), case_name))
+                sys.exit(1)
+            print('%-22s %-36s %8.2f %7.1fx' % (' '.join(type_args), case_name, seconds, base_seconds / seconds))
+finally:
+    shutil.rmtree(replay_dir)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+#
+# Benchmark the table renderer: print_table() vs the previous renderer that built each line with += and printed it
+#
+# The table is 768 interfaces x the 16 link stats columns by default. stdout is replaced by a text stream on
+# /dev/null whose raw file counts its write system calls, either line buffered (a terminal, e.g. an SSH session on the
+# switch) or block buffered (a pipe or file).
+#
+# Usage: python bench/bench_render.py [--intfs 768] [--runs 20]
+#
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(bench_dir))
+import show_int_tabular
+
+#
+# /dev/null raw file that counts the write system calls
+#
+class CountingFile(io.FileIO):
+    write_count = 0
+
+    def write(self, output):
+        CountingFile.write_count += 1
+        return io.FileIO.write(self, output)
+
+#
+# The previous renderer: each line was built with += and printed on its own
+#
+def print_table_per_line(clock_type_line, column_names_list, column_widths_list, output_table_list, intf_table, max_descr_len, args, outfile_handle):
+    column_number_list = range(0,len(column_names_list[0]))
+    header_trailer = ' '
+    seperator = '+'
+    for column_width in column_widths_list:
+        header_trailer += ''.ljust(column_width + 1,'-') + '-+'
+        seperator += ''.ljust(column_width + 1,'-') + '-+'
+    header_trailer = header_trailer[:-1]
+    print(clock_type_line)
+    print(header_trailer)
+    for row_num in range(len(column_names_list)):
+        header_str = ''
+        for column_num in column_number_list:
+            header_str += '| ' + column_names_list[row_num][column_num].ljust(column_widths_list[column_num] +1)
+        header_str += '|'
+        print(header_str)
+    print(seperator)
+    for row_num in range(0,len(output_table_list)):
+        row_str = '| ' + output_table_list[row_num][0].ljust(column_widths_list[0] +1 )
+        for column_num in column_number_list[1:]:
+            row_str += '| ' + (output_table_list[row_num][column_num]+' ').rjust(column_widths_list[column_num] +1)
+        row_str += '|'
+        print(row_str)
+    print(header_trailer)
+
+#
+# Returns best seconds of runs renders and the write system calls of one render
+#
+def run_renderer(print_function, table_args, line_buffering, runs):
+    saved_stdout = sys.stdout
+    seconds_list = []
+    write_count = 0
+    try :
+        for run in range(runs):
+            sys.stdout = io.TextIOWrapper(io.BufferedWriter(CountingFile(os.devnull, 'w')), line_buffering = line_buffering)
+            CountingFile.write_count = 0
+            start = time.time()
+            print_function(*table_args)
+            sys.stdout.flush()
+            seconds_list.append(time.time() - start)
+            write_count = CountingFile.write_count
+            sys.stdout.close()
+    finally:
+        sys.stdout = saved_stdout
+    return min(seconds_list), write_count
+
+parser = argparse.ArgumentParser(prog='bench_render', description='Benchmark the table renderer')
+parser.add_argument('--intfs', type=int, default=768, help='Table rows. Default 768')
+parser.add_argument('--runs', type=int, default=20, help='Renders of each case. Best is reported. Default 20')
+args = parser.parse_args()
+
+type_line, counter_list = show_int_tabular.build_counter_list('type_link_stats', True)
+column_names_list, column_widths_list, default_intf_dict = show_int_tabular.build_columns(counter_list)
+random.seed(1)
+output_table_list = [['fc%d/%d' % (intf_num // 48 + 1, intf_num % 48 + 1)] + [str(random.choice([0, 0, 0, random.randint(1, 10 ** 9)])) for column_width in column_widths_list[1:]]
+                     for intf_num in range(args.intfs)]
+for col_values in output_table_list:
+    for column_num, var_value in enumerate(col_values):
+        column_widths_list[column_num] = max(column_widths_list[column_num], len(var_value))
+table_args = ['2026/01/01 00:00:00 ' + type_line, column_names_list, column_widths_list, output_table_list, show_int_tabular.create_intf_table([]), 0,
+              argparse.Namespace(include_description = False), None]
+
+print('%d rows x %d columns' % (args.intfs, len(column_widths_list)))
+print('%-11s %-6s %10s %8s' % ('Renderer', 'stdout', 'ms', 'writes'))
+for renderer_name, print_function in [['per line', print_table_per_line], ['print_table', show_int_tabular.print_table]]:
+    for buffering_name, line_buffering in [['tty', True], ['pipe', False]]:
+        seconds, write_count = run_renderer(print_function, table_args, line_buffering, args.runs)
+        print('%-11s %-6s %10.2f %8d' % (renderer_name, buffering_name, seconds * 1000, write_count))
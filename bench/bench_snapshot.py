@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+#
+# Benchmark saving and loading the --snapshot counter store
+#
+# Usage: python bench/bench_snapshot.py [--intfs 768] [--counters 30] [--runs 20]
+#
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, bench_dir)
+sys.path.insert(0, os.path.dirname(bench_dir))
+import show_int_tabular
+
+parser = argparse.ArgumentParser(prog='bench_snapshot', description='Benchmark saving and loading a counter snapshot')
+parser.add_argument('--intfs', type=int, default=768, help='Number of interfaces. Default 768')
+parser.add_argument('--counters', type=int, default=30, help='Number of counters per interface. Default 30')
+parser.add_argument('--runs', type=int, default=20, help='Runs of each case. Best run is reported. Default 20')
+args = parser.parse_args()
+
+intf_list = ['fc%d/%d' % (intf_num // 48 + 1, intf_num % 48 + 1) for intf_num in range(args.intfs)]
+var_list = ['intf_counter_%d' % var_num for var_num in range(args.counters)]
+intf_table = show_int_tabular.create_intf_table(var_list)
+for intf in intf_list:
+    for var_name in var_list:
+        show_int_tabular.set_intf_value(intf_table, intf, var_name, random.randint(0, 2 ** 48))
+
+snapshot_name = os.path.join(tempfile.mkdtemp(), 'snapshot')
+save_time_list = []
+load_time_list = []
+for run in range(args.runs):
+    start = time.time()
+    show_int_tabular.save_snapshot(snapshot_name, time.time(), intf_list, var_list, intf_table)
+    save_time_list.append(time.time() - start)
+    start = time.time()
+    snapshot_time, snapshot_table = show_int_tabular.load_snapshot(snapshot_name)
+    load_time_list.append(time.time() - start)
+if snapshot_table != intf_table:
+    print('Loaded snapshot does not match saved counters')
+    sys.exit(1)
+print('%d interfaces x %d counters: %d bytes' % (args.intfs, args.counters, os.path.getsize(snapshot_name)))
+print('save: %.2f ms' % (min(save_time_list) * 1000))
+print('load: %.2f ms' % (min(load_time_list) * 1000))
+os.remove(snapshot_name)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+#
+# Benchmark parsing show interface counters detailed output a chunk and an interface block at a time vs a list of
+# all its lines
+#
+# The output of a generated switch is parsed into an interface table three ways:
+#
+#   list of lines   the whole output split into a list of lines first, as the parsers did before
+#   output          the whole output, split a chunk at a time by iter_lines()
+#   stream          lines read from a file while they are parsed, as from a transport that streams the output
+#
+# The peak memory of the parse is measured with tracemalloc (the output itself is allocated before the
+# measurement, except for the stream) and the time in separate runs without tracemalloc.
+#
+# Usage: python bench/bench_stream.py [--intfs 768] [--runs 5]
+#
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, bench_dir)
+sys.path.insert(0, os.path.dirname(bench_dir))
+import gen_outputs
+import show_int_tabular
+
+def parse_counters(get_output, counter_list):
+    intf_table = show_int_tabular.create_intf_table(show_int_tabular.intf_info_var_list)
+    counter_index_dict = show_int_tabular.compile_counter_list(counter_list, intf_table)
+    intf_list = []
+    output = get_output()
+    show_int_tabular.parse_show_int_counters(output, counter_index_dict, False, intf_table, intf_list)
+    if hasattr(output, 'close'):
+        output.close()
+    return intf_table
+
+parser = argparse.ArgumentParser(prog='bench_stream', description='Benchmark streaming parsing of show interface counters detailed output')
+parser.add_argument('--intfs', type=int, default=768, help='Interfaces of the generated switch. Default 768')
+parser.add_argument('--runs', type=int, default=5, help='Runs of each case. Best run is reported. Default 5')
+args = parser.parse_args()
+
+output = gen_outputs.gen_counters_new(gen_outputs.get_intf_list(args.intfs), random.Random(1))
+counter_list = show_int_tabular.merge_counter_lists([show_int_tabular.build_counter_list(stat_type, True)[1]
+                                                     for stat_type in ['type_link_stats', 'type_congestion_stats', 'type_general_stats']])
+temp_dir = tempfile.mkdtemp()
+try :
+    output_name = os.path.join(temp_dir, 'counters')
+    output_handle = open(output_name, 'w')
+    output_handle.write(output)
+    output_handle.close()
+    case_list = [
+        ['list of lines', lambda: output.splitlines()],
+        ['output', lambda: output],
+        ['stream', lambda: open(output_name)],
+    ]
+    print('%d interfaces, %d lines, %d KB of output' % (args.intfs, output.count('\n') + 1, len(output) // 1024))
+    print('%-14s %12s %10s' % ('Input', 'peak KB', 'ms'))
+    table_list = []
+    for case_name, get_output in case_list:
+        tracemalloc.start()
+        table_list.append(parse_counters(get_output, counter_list))
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        seconds_list = []
+        for run in range(args.runs):
+            start = time.time()
+            parse_counters(get_output, counter_list)
+            seconds_list.append(time.time() - start)
+        print('%-14s %12.1f %10.2f' % (case_name, peak_bytes / 1024.0, min(seconds_list) * 1000))
+    if [intf_table for intf_table in table_list if intf_table != table_list[0]]:
+        print('The interface tables are not the same')
+        sys.exit(1)
+finally:
+    shutil.rmtree(temp_dir)
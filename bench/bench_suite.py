@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+#
+# Benchmark suite: show_int_tabular.py on synthetic switches of several sizes, both counter formats and each stat type
+#
+# The outputs are generated with gen_outputs.py and replayed with the stand-in cli module (no latency), so the
+# times are only the work done by the script. For each case it reports:
+#
+#   parse lines/s  lines of show command output parsed per second (in process)
+#   render rows/s  table rows built and printed per second (in process)
+#   peak MB        peak resident memory of a run of the script (separate process, Linux /proc)
+#   e2e s          time of a run of the script including the interpreter start (separate process)
+#
+# --save writes the results to a JSON file and --compare fails (exit code 1) if a case is more than --threshold
+# percent worse than the saved results, so performance changes can be gated on a normal Linux box.
+#
+# Usage: python bench/bench_suite.py [--intfs 48,192,768] [--formats new,old] [--runs 3] [--save FILE] [--compare FILE]
+#
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+script = os.path.join(os.path.dirname(bench_dir), 'show_int_tabular.py')
+os.environ['CLI_LATENCY'] = '0'
+sys.path.insert(0, bench_dir)
+sys.path.insert(0, os.path.dirname(bench_dir))
+import gen_outputs
+import replay
+import show_int_tabular
+
+stat_type_dict = {
+    'link': ['--link-stats'],
+    'congestion': ['--congestion-stats'],
+    'general': ['--general-stats'],
+    'sfp': ['--sfp-stats'],
+    'sfp-detail': ['--sfp-detail-stats'],
+    'brief': ['--brief'],
+}
+
+parse_function_list = ['parse_show_int_counters', 'parse_show_int_brief', 'parse_show_topology', 'parse_show_flogi_database',
+                       'parse_show_int_description', 'parse_show_version']
+render_function_list = ['build_table_rows', 'print_table']
+
+#
+# Wrap a function of show_int_tabular to add its time to timing_dict[name]. The lines of the output parsed by
+# parse functions and the rows built by build_table_rows are counted in timing_dict['lines'] and timing_dict['rows'].
+#
+def wrap_function(function_name, timing_name, timing_dict):
+    function = getattr(show_int_tabular, function_name)
+    def timed_function(*args, **kwargs):
+        start = time.time()
+        result = function(*args, **kwargs)
+        timing_dict[timing_name] += time.time() - start
+        if timing_name == 'parse' and isinstance(args[0], str):
+            timing_dict['lines'] += args[0].count('\n') + 1
+        elif function_name == 'build_table_rows':
+            timing_dict['rows'] += len(result)
+        return result
+    setattr(show_int_tabular, function_name, timed_function)
+    return function
+
+#
+# Run main() of show_int_tabular in this process with the output counted and discarded
+#
+# Returns {'parse': seconds, 'render': seconds, 'lines': lines parsed, 'rows': rows built}
+#
+def run_in_process(script_args):
+    timing_dict = {'parse': 0.0, 'render': 0.0, 'lines': 0, 'rows': 0}
+    function_dict = {}
+    for function_name in parse_function_list:
+        function_dict[function_name] = wrap_function(function_name, 'parse', timing_dict)
+    for function_name in render_function_list:
+        function_dict[function_name] = wrap_function(function_name, 'render', timing_dict)
+    try :
+        replay.run_main(script_args, replay.CountingOutput())
+    finally:
+        for function_name in function_dict:
+            setattr(show_int_tabular, function_name, function_dict[function_name])
+    return timing_dict
+
+#
+# Run show_int_tabular.py in its own process
+#
+# The peak memory is the VmHWM of the process when the script ends. ru_maxrss of the child can not be used
+# because it starts from the memory of this process when it forks.
+#
+run_script_code = """
+import runpy, sys
+peak_name = sys.argv.pop(1)
+sys.argv.pop(0)
+try :
+    runpy.run_path(sys.argv[0], run_name='__main__')
+finally:
+    status_handle = open('/proc/self/status')
+    peak_kb = [line.split()[1] for line in status_handle if line.startswith('VmHWM:')][0]
+    status_handle.close()
+    peak_handle = open(peak_name, 'w')
+    peak_handle.write(peak_kb)
+    peak_handle.close()
+"""
+
+#
+# Returns seconds, peak resident memory in MB
+#
+def run_process(script_args):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = bench_dir
+    peak_name = os.path.join(replay_base_dir, 'peak')
+    start = time.time()
+    status = subprocess.call([sys.executable, '-c', run_script_code, peak_name, script] + script_args, env=env, stdout=open(os.devnull, 'w'))
+    elapsed = time.time() - start
+    if status != 0:
+        print('show_int_tabular.py ' + ' '.join(script_args) + ' failed')
+        sys.exit(1)
+    peak_handle = open(peak_name)
+    peak_mb = int(peak_handle.read()) / 1024.0
+    peak_handle.close()
+    return elapsed, peak_mb
+
+#
+# Compare the results with the saved baseline
+#
+# Returns the list of regressions of more than threshold percent
+#
+def compare_results(result_dict, baseline_dict, threshold):
+    regression_list = []
+    for case in sorted(result_dict):
+        if case not in baseline_dict:
+            continue
+        for metric, higher_is_better in [['parse_lines_per_sec', True], ['render_rows_per_sec', True], ['peak_mb', False], ['e2e_sec', False]]:
+            value = result_dict[case][metric]
+            baseline_value = baseline_dict[case][metric]
+            if not baseline_value:
+                continue
+            change = (value - baseline_value) * 100.0 / baseline_value
+            if (higher_is_better and change < -threshold) or (not higher_is_better and change > threshold):
+                regression_list.append('%s %s: %.4g vs %.4g (%+.1f%%)' % (case, metric, value, baseline_value, change))
+    return regression_list
+
+parser = argparse.ArgumentParser(prog='bench_suite', description='Benchmark show_int_tabular.py on synthetic switches')
+parser.add_argument('--intfs', default='48,192,768', help='Comma separated numbers of interfaces. Default 48,192,768')
+parser.add_argument('--formats', default='new,old', help='Comma separated counter formats, new (NX-OS 8.4(2) and later) and/or old. Default new,old')
+parser.add_argument('--types', default=','.join(sorted(stat_type_dict)), help='Comma separated stat types. Default ' + ','.join(sorted(stat_type_dict)))
+parser.add_argument('--runs', type=int, default=3, help='Runs of each case. Best run is reported. Default 3')
+parser.add_argument('--save', help='Save the results to this JSON file')
+parser.add_argument('--compare', help='Compare the results with this JSON file saved by --save and exit with 1 if a case regressed')
+parser.add_argument('--threshold', type=float, default=10.0, help='Percent a result may be worse than --compare before it is a regression. Default 10')
+args = parser.parse_args()
+
+stat_type_list = args.types.split(',')
+for stat_type in stat_type_list:
+    if stat_type not in stat_type_dict:
+        print('Unknown stat type: ' + stat_type + ' (use ' + ', '.join(sorted(stat_type_dict)) + ')')
+        sys.exit(1)
+
+replay_base_dir = tempfile.mkdtemp()
+result_dict = {}
+print('%-5s %6s %-12s %14s %14s %8s %8s' % ('Fmt', 'Intfs', 'Type', 'parse lines/s', 'render rows/s', 'peak MB', 'e2e s'))
+try :
+    for counter_format in args.formats.split(','):
+        for intf_count in [int(intf_count) for intf_count in args.intfs.split(',')]:
+            replay_dir = os.path.join(replay_base_dir, '%s_%d' % (counter_format, intf_count))
+            gen_outputs.write_replay_dir(replay_dir, intf_count, counter_format == 'new')
+            os.environ['CLI_REPLAY_DIR'] = replay_dir
+            for stat_type in stat_type_list:
+                script_args = stat_type_dict[stat_type]
+                timing_list = [run_in_process(script_args) for run in range(args.runs)]
+                parse_timing_dict = min(timing_list, key=lambda timing_dict: timing_dict['parse'])
+                render_timing_dict = min(timing_list, key=lambda timing_dict: timing_dict['render'])
+                process_list = [run_process(script_args) for run in range(args.runs)]
+                case = '%s/%d/%s' % (counter_format, intf_count, stat_type)
+                result_dict[case] = {
+                    'parse_lines_per_sec': parse_timing_dict['lines'] / max(parse_timing_dict['parse'], 1e-9),
+                    'render_rows_per_sec': render_timing_dict['rows'] / max(render_timing_dict['render'], 1e-9),
+                    'peak_mb': min([peak_mb for elapsed, peak_mb in process_list]),
+                    'e2e_sec': min([elapsed for elapsed, peak_mb in process_list]),
+                }
+                print('%-5s %6d %-12s %14.0f %14.0f %8.1f %8.3f' % (counter_format, intf_count, stat_type, result_dict[case]['parse_lines_per_sec'],
+                                                                  result_dict[case]['render_rows_per_sec'], result_dict[case]['peak_mb'], result_dict[case]['e2e_sec']))
+finally:
+    shutil.rmtree(replay_base_dir)
+
+if args.save:
+    save_handle = open(args.save, 'w')
+    json.dump(result_dict, save_handle, indent=1, sort_keys=True)
+    save_handle.close()
+
+if args.compare:
+    compare_handle = open(args.compare)
+    baseline_dict = json.load(compare_handle)
+    compare_handle.close()
+    regression_list = compare_results(result_dict, baseline_dict, args.threshold)
+    if regression_list:
+        print('\nRegressions of more than %.0f%% vs %s:' % (args.threshold, args.compare))
+        for regression in regression_list:
+            print('  ' + regression)
+        sys.exit(1)
+    print('\nNo regressions of more than %.0f%% vs %s' % (args.threshold, args.compare))
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+#
+# Benchmark show_int_tabular.py --where vs displaying all the interfaces or --errorsonly
+#
+# Runs main() in process on a generated switch with the stand-in cli module (no latency). For each case it reports
+# the time of the run, the time of the build rows and render phases and the bytes written to stdout. --where drops
+# the interfaces that do not match once the outputs are parsed, so only the matching interfaces are built and rendered.
+#
+# Usage: python bench/bench_where.py [--intfs 768] [--runs 5]
+#
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+os.environ['CLI_LATENCY'] = '0'
+sys.path.insert(0, bench_dir)
+sys.path.insert(0, os.path.dirname(bench_dir))
+import gen_outputs
+import replay
+import show_int_tabular
+
+#
+# Returns seconds of the run, seconds of the build rows and render phases, bytes written
+#
+def run_case(script_args):
+    counting_output = replay.CountingOutput()
+    seconds = replay.run_main(script_args, counting_output)
+    phases = show_int_tabular.timing_dict['phases']
+    return seconds, phases['build_rows'] + phases['render'], counting_output.bytes
+
+parser = argparse.ArgumentParser(prog='bench_where', description='Benchmark show_int_tabular.py --where')
+parser.add_argument('--intfs', type=int, default=768, help='Interfaces of the generated switch. Default 768')
+parser.add_argument('--runs', type=int, default=5, help='Runs of each case. Best run is reported. Default 5')
+args = parser.parse_args()
+
+replay_dir = tempfile.mkdtemp()
+try :
+    gen_outputs.write_replay_dir(replay_dir, args.intfs)
+    os.environ['CLI_REPLAY_DIR'] = replay_dir
+    print('%d interfaces' % args.intfs)
+    print('%-66s %8s %14s %10s' % ('Case', 'run ms', 'rows+render ms', 'bytes'))
+    for case in [['--link-stats'], ['--link-stats', '--errorsonly'], ['--link-stats', '--where', 'invalid_crcs > 99000'],
+                 ['--congestion-stats', '--where', 'intf_txwait_1s1m1h72h.1m >= 5 or credit_loss > 0'],
+                 ['--sfp-stats'], ['--sfp-stats', '--where', 'sfp_rx_power < -12']]:
+        result_list = [run_case(case) for run in range(args.runs)]
+        print('%-66s %8.1f %14.2f %10d' % (' '.join(case), min([result[0] for result in result_list]) * 1000, min([result[1] for result in result_list]) * 1000, result_list[0][2]))
+finally:
+    shutil.rmtree(replay_dir)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+#
+# Capture the outputs of the show commands used by show_int_tabular.py on a switch for replay off the switch
+#
+# Copy this file and replay.py to bootflash and run on the switch:
+#
+#   python bootflash:capture_outputs.py replay_dir [--json]
+#
+# Then copy bootflash:replay_dir off the switch and run with it as CLI_REPLAY_DIR:
+#
+#   CLI_REPLAY_DIR=replay_dir PYTHONPATH=bench CLI_LATENCY=0 python show_int_tabular.py --brief
+#
+import sys
+sys.path.append('/isan/bin/cli-scripts/')
+import argparse
+import json
+import os
+
+import cli
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import replay
+
+capture_cmd_list = [
+    'show interface brief',
+    'show topology',
+    'show flogi database |  i \\[ p 1',
+    'show flogi database',
+    'show interface description',
+    'show version',
+    'show interface counters detailed',
+    'show interface  transceiver',
+    'show device-alias status',
+    'show device-alias database',
+]
+
+parser = argparse.ArgumentParser(prog='capture_outputs', description='Capture the show command outputs used by show_int_tabular.py for replay')
+parser.add_argument('replay_dir', help='Directory on bootflash for the captured outputs')
+parser.add_argument('--json', action="store_true", dest='use_json', help='Also capture the JSON output of each command')
+args = parser.parse_args()
+
+replay_dir = os.path.join('/bootflash', args.replay_dir)
+if not os.path.isdir(replay_dir):
+    os.makedirs(replay_dir)
+for cmd in capture_cmd_list:
+    output_list = [['.txt', cli.cli]]
+    if args.use_json:
+        output_list.append(['.json', cli.clid])
+    for extension, cli_function in output_list:
+        try :
+            output = cli_function(cmd)
+        except Exception as e:
+            print('Unable to capture "' + cmd + '"' + (' JSON' if extension == '.json' else '') + ': {}'.format(e))
+            continue
+        if not isinstance(output, str):
+            output = json.dumps(output)
+        replay_handle = open(os.path.join(replay_dir, replay.get_replay_file_name(cmd) + extension), 'w')
+        replay_handle.write(output)
+        replay_handle.close()
+        print('Captured "' + cmd + '"' + (' JSON' if extension == '.json' else '') + ': ' + str(len(output)) + ' bytes')
@@ -0,0 +1,53 @@
+#
+# Stand-in for the NX-OS cli module so show_int_tabular.py can be run off the switch
+#
+# Every command returns a small canned output after CLI_LATENCY seconds (default 0.5) to model the switch-side
+# latency of each show command. CLI_LATENCY_PER_LINE (default 0) adds seconds for each line of a replayed output to
+# model a switch that takes longer to build a longer output.
+#
+# With CLI_REPLAY_DIR set the outputs are replayed from the files in that directory instead (see replay.py).
+# A command without a replay file fails like an unknown command on the switch.
+#
+import json
+import os
+import time
+
+import replay
+
+cli_latency = float(os.environ.get('CLI_LATENCY', '0.5'))
+cli_latency_per_line = float(os.environ.get('CLI_LATENCY_PER_LINE', '0'))
+
+intf_list = ['fc1/1', 'fc1/2', 'fc1/3', 'fc1/4']
+
+cli_output_dict = {
+    'brief' : '\n'.join(['%-10s 1      auto   on      up               swl    F       32    --     edge' % intf for intf in intf_list]),
+    'topology' : '',
+    'flogi' : '\n'.join(['%-10s 1     0x01000%d  21:00:00:24:ff:00:00:0%d 20:00:00:24:ff:00:00:0%d\n                           [host%d_hba0]' % (intf, idx, idx, idx, idx) for idx, intf in enumerate(intf_list)]),
+    'description' : '\n'.join(['%-18s host%d port a' % (intf, idx) for idx, intf in enumerate(intf_list)]),
+    'version' : '  system:    version 8.4(2c)',
+    'counters' : '\n'.join([intf + '\n    Rx Invalid CRCs:                                       0' for intf in intf_list]),
+    'transceiver' : '\n'.join([intf + ' sfp is present\n    Name is CISCO-FINISAR' for intf in intf_list]),
+}
+
+def cli(cmd):
+    time.sleep(cli_latency)
+    replay_dir = os.environ.get('CLI_REPLAY_DIR')
+    if replay_dir:
+        output = replay.get_replay_output(replay_dir, cmd)
+        if output == None:
+            raise Exception('No replay output for "' + cmd + '" in ' + replay_dir)
+        time.sleep(cli_latency_per_line * output.count('\n'))
+        return output
+    for key in cli_output_dict:
+        if key in cmd:
+            return cli_output_dict[key]
+    return ''
+
+def clid(cmd):
+    time.sleep(cli_latency)
+    replay_dir = os.environ.get('CLI_REPLAY_DIR')
+    if replay_dir:
+        output = replay.get_replay_output(replay_dir, cmd, True)
+        if output != None:
+            return output
+    raise Exception('JSON output not available')
@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+#
+# Generate synthetic show command outputs of a large switch for replay (see replay.py)
+#
+# The counters are in the format before or after NX-OS 8.4(2). Ports are 48 per module (fc1/1-48, fc2/1-48, ...).
+# Every 24th port is a TE port in one of the port-channels, every 9th port is down and the others are F ports
+# with a FLOGI. Every 5th FLOGI has no device-alias.
+#
+# Usage: python bench/gen_outputs.py replay_dir [--intfs 768] [--format new|old] [--seed 1]
+#
+import argparse
+import os
+import random
+import sys
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, bench_dir)
+import replay
+
+port_channel_count = 2
+
+def get_intf_list(intf_count):
+    return ['fc%d/%d' % (intf_num // 48 + 1, intf_num % 48 + 1) for intf_num in range(intf_count)]
+
+def get_port_mode(intf_num):
+    if intf_num % 24 == 0:
+        return 'TE'
+    if intf_num % 9 == 4:
+        return '--'
+    return 'F'
+
+def get_pwwn(intf_num):
+    return '21:00:00:24:ff:%02x:%02x:%02x' % (intf_num >> 16, (intf_num >> 8) & 255, intf_num & 255)
+
+def get_counter(rand):
+    return str(rand.choice([0, 0, 0, rand.randint(0, 99999)]))
+
+def gen_counters_new(intf_list, rand):
+    line_list = []
+    for intf_num, intf in enumerate(intf_list):
+        if intf_num % 5:
+            txwait_line = '    Percentage TxWait for last 1s/1m/1h/72h:               %d%%/%d%%/0%%/0%%' % (rand.randint(0, 3), rand.randint(0, 9))
+        else:
+            txwait_line = '    Percentage TxWait not available for last 1s/1m/1h/72h: 0%/0%/0%/0%'
+        line_list += [
+            intf,
+            '    Rx 5 min rate bit/sec:                                  0',
+            '    Rx total frames:                                       %s' % get_counter(rand),
+            '    Tx total frames:                                       %s' % get_counter(rand),
+            '    Rx total multicast:                                    %s' % get_counter(rand),
+            '    Tx total multicast:                                    %s' % get_counter(rand),
+            '    Rx total broadcast:                                    %s' % get_counter(rand),
+            '    Tx total broadcast:                                    %s' % get_counter(rand),
+            '    Rx total unicast:                                      %s' % get_counter(rand),
+            '    Tx total unicast:                                      %s' % get_counter(rand),
+            '    Rx class-2 frames:                                     %s' % get_counter(rand),
+            '    Tx class-2 frames:                                     %s' % get_counter(rand),
+            '    Rx class-3 frames:                                     %s' % get_counter(rand),
+            '    Tx class-3 frames:                                     %s' % get_counter(rand),
+            '    Rx class-f frames:                                     %s' % get_counter(rand),
+            '    Tx class-f frames:                                     %s' % get_counter(rand),
+            '    Rx Link failures:                                      %s' % get_counter(rand),
+            '    Rx Sync losses:                                        %s' % get_counter(rand),
+            '    Rx Signal losses:                                      %s' % get_counter(rand),
+            '    Rx Invalid transmission words:                         %s' % get_counter(rand),
+            '    Rx Invalid CRCs:                                       %s' % get_counter(rand),
+            '    Rx Non-Operational Sequences(NOS):                     %s' % get_counter(rand),
+            '    Tx Non-Operational Sequences(NOS):                     %s' % get_counter(rand),
+            '    Rx Offline Sequences(OLS):                             %s' % get_counter(rand),
+            '    Tx Offline Sequences(OLS):                             %s' % get_counter(rand),
+            '    Rx Link Reset Responses(LRR):                          %s' % get_counter(rand),
+            '    Tx Link Reset Responses(LRR):                          %s' % get_counter(rand),
+            '    Rx FEC corrected blocks:                               %s' % get_counter(rand),
+            '    Rx FEC uncorrected blocks:                             %s' % get_counter(rand),
+            '    BB_SCs credit resend actions:                          %s' % get_counter(rand),
+            '    BB_SCr Tx credit increment actions:                    %s' % get_counter(rand),
+            '    Tx B2B credit transitions to zero:                     %s' % get_counter(rand),
+            '    Rx B2B credit transitions to zero:                     %s' % get_counter(rand),
+            '    TxWait 2.5us due to lack of transmit credits:          %s' % get_counter(rand),
+            txwait_line,
+            '    Tx Timeout discards:                                   %s' % get_counter(rand),
+            '    Tx Credit loss:                                        %s' % get_counter(rand),
+            '    Rx Link Reset(LR) while link is active:                %s' % get_counter(rand),
+            '    Tx Link Reset(LR) while link is active:                %s' % get_counter(rand),
+            '',
+        ]
+    return '\n'.join(line_list)
+
+def gen_counters_old(intf_list, rand):
+    line_list = []
+    for intf in intf_list:
+        line_list += [
+            intf,
+            '    5 minutes input rate 0 bits/sec, 0 bytes/sec, 0 frames/sec',
+            '    %s frames, %s bytes received' % (get_counter(rand), get_counter(rand)),
+            '    %s frames, %s bytes transmitted' % (get_counter(rand), get_counter(rand)),
+            '    %s class-2 frames, %s bytes received' % (get_counter(rand), get_counter(rand)),
+            '    %s class-2 frames, %s bytes transmitted' % (get_counter(rand), get_counter(rand)),
+            '    %s class-3 frames, %s bytes received' % (get_counter(rand), get_counter(rand)),
+            '    %s class-3 frames, %s bytes transmitted' % (get_counter(rand), get_counter(rand)),
+            '    %s class-f frames, %s bytes received' % (get_counter(rand), get_counter(rand)),
+            '    %s class-f frames, %s bytes transmitted' % (get_counter(rand), get_counter(rand)),
+            '    %s multicast packets received, %s transmitted' % (get_counter(rand), get_counter(rand)),
+            '    %s broadcast packets received, %s transmitted' % (get_counter(rand), get_counter(rand)),
+            '    %s unicast packets received, %s transmitted' % (get_counter(rand), get_counter(rand)),
+            '    %s link failures, %s sync losses, %s signal losses' % (get_counter(rand), get_counter(rand), get_counter(rand)),
+            '    %s invalid transmission words' % get_counter(rand),
+            '    %s invalid CRCs, %s delimiter errors' % (get_counter(rand), get_counter(rand)),
+            '    %s non-operational sequences received' % get_counter(rand),
+            '    %s non-operational sequences transmitted' % get_counter(rand),
+            '    %s Offline Sequence errors received' % get_counter(rand),
+            '    %s Offline Sequence errors transmitted' % get_counter(rand),
+            '    %s link reset responses received' % get_counter(rand),
+            '    %s link reset responses transmitted' % get_counter(rand),
+            '    %s fec corrected blocks' % get_counter(rand),
+            '    %s fec uncorrected blocks' % get_counter(rand),
+            '    %s BB_SCs credit resend actions, %s BB_SCr Tx credit increment actions' % (get_counter(rand), get_counter(rand)),
+            '    %s Transmit B2B credit transitions to zero' % get_counter(rand),
+            '    %s Receive B2B credit transitions to zero' % get_counter(rand),
+            '    %s 2.5us TxWait due to lack of transmit credits' % get_counter(rand),
+            '    Percentage TxWait not available for last 1s/1m/1h/72h: 0%/0%/0%/0%',
+            '    %s timeout discards, %s credit loss' % (get_counter(rand), get_counter(rand)),
+            '    %s link reset received while link is active' % get_counter(rand),
+            '    %s link reset transmitted while link is active' % get_counter(rand),
+            '',
+        ]
+    return '\n'.join(line_list)
+
+def gen_transceiver(intf_list, rand):
+    line_list = []
+    for intf_num, intf in enumerate(intf_list):
+        if intf_num % 7 == 3:
+            line_list.append('%s sfp not present' % intf)
+            continue
+        rx_power_alarm = rand.choice(['', '', '-', '--', '+'])
+        line_list += [
+            '%s sfp is present' % intf,
+            '    Name is CISCO-FINISAR',
+            '    Manufacturer\'s part number is FTLF8529P4BCV-C1',
+            '    Serial number is FNS%08d' % intf_num,
+            '    Cisco part number is 10-3206-01',
+            '    Cisco pid is DS-SFP-FC32G-%s' % ('L W' if intf_num % 11 == 0 else 'SW'),
+            '    Nominal bit rate is 28000 MBits/sec',
+            '    No tx fault, no rx loss, in sync state, diag mon type 104',
+            '    SFP Diagnostics Information:',
+            '    Temperature : %.2f C' % (30 + rand.random() * 10),
+            '    Voltage : 3.%02d V' % rand.randint(0, 99),
+            '    Current : 7.%02d mA' % rand.randint(0, 99),
+            '    Optical Tx Power : -2.%02d dBm' % rand.randint(0, 99),
+            ('    Optical Rx Power : -%d.%02d dBm %s' % (rand.randint(1, 15), rand.randint(0, 99), rx_power_alarm)).rstrip(),
+            '    Tx Fault count : 0',
+            '',
+        ]
+    return '\n'.join(line_list)
+
+def gen_brief(intf_list):
+    line_list = [
+        '',
+        '-------------------------------------------------------------------------------',
+        'Interface  Vsan   Admin  Admin   Status          SFP    Oper  Oper   Port     Logical',
+        '                  Mode   Trunk                          Mode  Speed  Channel  Type',
+        '                         Mode                                 (Gbps)',
+        '-------------------------------------------------------------------------------',
+    ]
+    for intf_num, intf in enumerate(intf_list):
+        port_mode = get_port_mode(intf_num)
+        if port_mode == 'TE':
+            line_list.append('%-10s 1      auto   on      trunking         swl    TE      32    %d     core' % (intf, 10 + (intf_num // 24) % port_channel_count))
+        elif port_mode == '--':
+            line_list.append('%-10s 1      auto   on      notConnected     swl    --      --    --     --' % intf)
+        else:
+            line_list.append('%-10s 1      auto   on      up               swl    F       32    --     edge' % intf)
+    line_list += [
+        '',
+        '-------------------------------------------------------------------------------',
+        'Interface    Vsan   Admin  Status   Oper   Oper   IP          Logical',
+        '-------------------------------------------------------------------------------',
+    ]
+    for port_channel_num in range(port_channel_count):
+        line_list.append('port-channel%d 1    on     trunking TE     64     --          core' % (10 + port_channel_num))
+    return '\n'.join(line_list)
+
+def gen_topology():
+    line_list = [
+        '',
+        'FC Topology for VSAN 1 :',
+        '--------------------------------------------------------------------------------',
+        '       Interface  Peer Domain Peer Interface     Peer IP Address(Switch Name)',
+        '--------------------------------------------------------------------------------',
+    ]
+    for port_channel_num in range(port_channel_count):
+        line_list.append('  port-channel%d 0xef(239)   port-channel%d  10.1.1.%d(sw%d)' % (10 + port_channel_num, 10 + port_channel_num, port_channel_num, port_channel_num))
+    return '\n'.join(line_list)
+
+#
+# Returns the show flogi database output and the show flogi database | i \[ p 1 output
+#
+def gen_flogi(intf_list):
+    line_list = [
+        '--------------------------------------------------------------------------------',
+        'INTERFACE        VSAN    FCID           PORT NAME               NODE NAME',
+        '--------------------------------------------------------------------------------',
+    ]
+    alias_line_list = []
+    flogi_count = 0
+    for intf_num, intf in enumerate(intf_list):
+        if get_port_mode(intf_num) != 'F':
+            continue
+        flogi_line = '%-10s 1     0x01%04x  %s %s' % (intf, intf_num, get_pwwn(intf_num), get_pwwn(intf_num).replace('21:', '20:', 1))
+        line_list.append(flogi_line)
+        flogi_count += 1
+        if flogi_count % 5:
+            line_list.append('                           [host%d_hba0]' % intf_num)
+            alias_line_list += line_list[-2:]
+    line_list += ['', 'Total number of flogi = %d.' % flogi_count]
+    return '\n'.join(line_list), '\n'.join(alias_line_list)
+
+#
+# Returns the show device-alias database and show device-alias status outputs
+#
+# The database has the aliases of the local FLOGIs and remote_alias_count aliases of devices on other switches
+#
+def gen_device_alias(intf_list, remote_alias_count):
+    line_list = []
+    flogi_count = 0
+    for intf_num, intf in enumerate(intf_list):
+        if get_port_mode(intf_num) != 'F':
+            continue
+        flogi_count += 1
+        if flogi_count % 5:
+            line_list.append('device-alias name host%d_hba0 pwwn %s' % (intf_num, get_pwwn(intf_num)))
+    for alias_num in range(remote_alias_count):
+        line_list.append('device-alias name remote%d_hba0 pwwn 10:00:00:00:c9:%02x:%02x:%02x' % (alias_num, alias_num >> 16, (alias_num >> 8) & 255, alias_num & 255))
+    alias_count = len(line_list)
+    line_list += ['', 'Total number of entries = %d' % alias_count]
+    status_line_list = [
+        'Fabric Distribution: Enabled',
+        'Database:- Device Aliases %d  Mode: Enhanced' % alias_count,
+        '           Checksum: 0x%032x' % alias_count,
+        'Locked By:- None',
+        'Pending Database:- Not Present',
+        '',
+        'Status of the last CFS operation issued from this switch:',
+        '==========================================================',
+        'Operation: Commit',
+        'Status: Success',
+    ]
+    return '\n'.join(line_list), '\n'.join(status_line_list)
+
+def gen_description(intf_list):
+    line_list = [
+        '',
+        '-------------------------------------------------------------------------------',
+        'Interface          Description',
+        '-------------------------------------------------------------------------------',
+    ]
+    for intf_num, intf in enumerate(intf_list):
+        line_list.append('%-18s %s' % (intf, 'host%d port a' % intf_num if intf_num % 3 else '--'))
+    for port_channel_num in range(port_channel_count):
+        line_list.append('Po%d               ISL to sw%d' % (10 + port_channel_num, port_channel_num))
+    return '\n'.join(line_list)
+
+#
+# Write the outputs of a switch with intf_count interfaces to replay_dir
+#
+# new_format True is the show interface counters detailed format of NX-OS 8.4(2) and later
+#
+def write_replay_dir(replay_dir, intf_count, new_format = True, seed = 1, remote_alias_count = 1000):
+    rand = random.Random(seed)
+    intf_list = get_intf_list(intf_count)
+    if not os.path.isdir(replay_dir):
+        os.makedirs(replay_dir)
+    flogi_output, flogi_alias_output = gen_flogi(intf_list)
+    device_alias_output, device_alias_status_output = gen_device_alias(intf_list, remote_alias_count)
+    output_dict = {
+        'show interface counters detailed': gen_counters_new(intf_list, rand) if new_format else gen_counters_old(intf_list, rand),
+        'show interface transceiver': gen_transceiver(intf_list, rand),
+        'show interface brief': gen_brief(intf_list),
+        'show topology': gen_topology(),
+        'show flogi database': flogi_output,
+        'show flogi database |  i \\[ p 1': flogi_alias_output,
+        'show device-alias database': device_alias_output,
+        'show device-alias status': device_alias_status_output,
+        'show interface description': gen_description(intf_list),
+        'show version': 'Cisco Nexus Operating System (NX-OS) Software\n  system:    version %s\n' % ('8.4(2c)' if new_format else '8.3(1)'),
+    }
+    for cmd in output_dict:
+        replay_handle = open(os.path.join(replay_dir, replay.get_replay_file_name(cmd) + '.txt'), 'w')
+        replay_handle.write(output_dict[cmd])
+        replay_handle.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='gen_outputs', description='Generate synthetic show command outputs for replay')
+    parser.add_argument('replay_dir', help='Directory for the generated outputs')
+    parser.add_argument('--intfs', type=int, default=768, help='Number of fc interfaces. Default 768')
+    parser.add_argument('--format', choices=['new', 'old'], default='new', help='show interface counters detailed format after (new) or before (old) NX-OS 8.4(2). Default new')
+    parser.add_argument('--aliases', type=int, default=1000, help='Number of device-aliases of devices on other switches. Default 1000')
+    parser.add_argument('--seed', type=int, default=1, help='Seed of the random counter values. Default 1')
+    args = parser.parse_args()
+    write_replay_dir(args.replay_dir, args.intfs, args.format == 'new', args.seed, args.aliases)
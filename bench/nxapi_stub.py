@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+#
+# Stub NX-API server to run show_int_fabric.py against replayed switches off the switch
+#
+# Each replay directory (see replay.py) is served as one switch on its own port, starting at --port. Requests are
+# JSON-RPC lists of cli_ascii commands as sent by show_int_fabric.py. A command without a replay file returns a
+# JSON-RPC error like an invalid command on the switch. Connections are kept open (HTTP/1.1 keep-alive).
+#
+# Usage: python bench/nxapi_stub.py [--port 8001] [--latency 0.5] replay_dir [replay_dir ...]
+#
+#   python bench/gen_outputs.py /tmp/sw1 --intfs 96
+#   python bench/nxapi_stub.py /tmp/sw1 /tmp/sw1 &
+#   SHOW_INT_FABRIC_PASSWORD=x python show_int_fabric.py --http sw1=localhost:8001 sw2=localhost:8002
+#
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+try :
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import replay
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+#
+# Returns a request handler class that replays the outputs in replay_dir
+#
+# latency is the seconds each command takes on the modeled switch, so a batch of commands takes the sum
+#
+def get_nxapi_handler(replay_dir, latency):
+    class NxapiHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            request_body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if self.path != '/ins' or self.headers.get('Authorization', '')[:6] != 'Basic ':
+                self.send_response(401 if self.path == '/ins' else 404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            request_list = json.loads(request_body.decode('utf-8'))
+            if isinstance(request_list, dict):
+                request_list = [request_list]
+            response_list = []
+            for request_entry in request_list:
+                time.sleep(latency)
+                output = None
+                if request_entry.get('method') == 'cli_ascii':
+                    output = replay.get_replay_output(replay_dir, request_entry['params']['cmd'])
+                if output == None:
+                    response_list.append({'jsonrpc': '2.0', 'error': {'code': -32602, 'message': 'Invalid params', 'data': {'msg': 'Invalid command'}}, 'id': request_entry.get('id')})
+                else:
+                    response_list.append({'jsonrpc': '2.0', 'result': {'msg': output}, 'id': request_entry.get('id')})
+            response_body = json.dumps(response_list if len(response_list) > 1 else response_list[0]).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json-rpc')
+            self.send_header('Content-Length', str(len(response_body)))
+            self.end_headers()
+            self.wfile.write(response_body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return NxapiHandler
+
+#
+# Start a stub server for each replay directory on port, port + 1, ...
+#
+# Returns the list of servers, each served by its own daemon thread
+#
+def start_stub_servers(replay_dir_list, port, latency):
+    server_list = []
+    for replay_num, replay_dir in enumerate(replay_dir_list):
+        server = ThreadingHTTPServer(('127.0.0.1', port + replay_num), get_nxapi_handler(replay_dir, latency))
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        server_list.append(server)
+    return server_list
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='nxapi_stub', description='Stub NX-API server that replays captured or generated show command outputs')
+    parser.add_argument('replay_dir', nargs='+', help='Replay directory of each switch')
+    parser.add_argument('--port', type=int, default=8001, help='Port of the first switch. Default 8001')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds each command takes. Default 0')
+    args = parser.parse_args()
+    start_stub_servers(args.replay_dir, args.port, args.latency)
+    for replay_num, replay_dir in enumerate(args.replay_dir):
+        print('Serving ' + replay_dir + ' on http://127.0.0.1:' + str(args.port + replay_num) + '/ins')
+    try :
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
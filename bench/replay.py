@@ -0,0 +1,125 @@
+#
+# Replay of captured show command outputs
+#
+# A replay directory has one file per command. The file name is the command in lower case with every run of
+# characters other than letters and digits replaced by '_', e.g.
+#
+#   show interface counters detailed   -> show_interface_counters_detailed.txt
+#   show flogi database |  i \[ p 1    -> show_flogi_database_i_p_1.txt
+#
+# The JSON output of a command (cli.clid) is in the same name with .json. The files can be captured on the
+# switch with capture_outputs.py or generated with gen_outputs.py.
+#
+# Commands for an interface range, e.g. show interface fc1/1-4,port-channel10 counters detailed, use the output
+# captured for all the interfaces (show interface counters detailed) filtered to the interfaces in the range.
+#
+# run_main runs main() of show_int_tabular in the process of a benchmark, with stdout written to a stand-in.
+#
+import os
+import re
+import sys
+import time
+
+#
+# Get the replay file name of a command without the .txt or .json extension
+#
+def get_replay_file_name(cmd):
+    return re.sub('[^a-z0-9]+', '_', cmd.lower()).strip('_')
+
+#
+# Expand an interface range like fc1/1-4,fc1/7,port-channel10 to a set of interface names
+#
+def expand_intf_range(intf_range):
+    intf_set = set()
+    for intf_range_entry in intf_range.split(','):
+        intf_range_entry = intf_range_entry.strip()
+        match = re.match(r'^(.*/)(\d+)-(\d+)$', intf_range_entry)
+        if match:
+            for port in range(int(match.group(2)), int(match.group(3)) + 1):
+                intf_set.add(match.group(1) + str(port))
+        elif intf_range_entry != '':
+            intf_set.add(intf_range_entry)
+    return intf_set
+
+def get_intf_name(tok):
+    if re.match(r'^Po\d+$', tok):
+        return 'port-channel' + tok[2:]
+    if re.match(r'^(fc|vfc|port-channel|san-port-channel)\d', tok):
+        return tok
+    return None
+
+#
+# Keep only the lines of the interfaces in intf_set
+#
+# A line that starts with an interface name starts the block of that interface. Indented lines belong to the
+# block of the last interface. Other lines (headings) are kept.
+#
+def filter_intf_output(output, intf_set):
+    line_list = []
+    keep = True
+    for line in output.splitlines(True):
+        line_toks = line.split()
+        if line_toks and not line[0].isspace():
+            intf = get_intf_name(line_toks[0])
+            keep = intf == None or intf in intf_set
+        if keep:
+            line_list.append(line)
+    return ''.join(line_list)
+
+#
+# Get the replayed output of a command
+#
+# Returns None if there is no output for the command in replay_dir
+#
+def get_replay_output(replay_dir, cmd, use_json = False):
+    extension = '.json' if use_json else '.txt'
+    replay_file_name = os.path.join(replay_dir, get_replay_file_name(cmd) + extension)
+    intf_set = None
+    if not os.path.exists(replay_file_name):
+        match = re.match(r'^show interface (\S+) +(\S.*)$', cmd)
+        if match == None or use_json:
+            return None
+        replay_file_name = os.path.join(replay_dir, get_replay_file_name('show interface ' + match.group(2)) + extension)
+        if not os.path.exists(replay_file_name):
+            return None
+        intf_set = expand_intf_range(match.group(1))
+    replay_handle = open(replay_file_name)
+    output = replay_handle.read()
+    replay_handle.close()
+    if intf_set != None:
+        output = filter_intf_output(output, intf_set)
+    return output
+
+#
+# Stand-in for stdout that records the time of the first write and counts the bytes written
+#
+class CountingOutput(object):
+    def __init__(self):
+        self.first_write_time = None
+        self.bytes = 0
+
+    def write(self, output):
+        if self.first_write_time == None:
+            self.first_write_time = time.time()
+        self.bytes += len(output)
+
+    def flush(self):
+        pass
+
+#
+# Run main() of show_int_tabular with script_args in this process and its stdout written to output
+#
+# The benchmark imports show_int_tabular first, so the import is not in the time of its first run.
+#
+# Returns seconds of the run
+#
+def run_main(script_args, output):
+    import show_int_tabular
+    saved_stdout = sys.stdout
+    sys.stdout = output
+    start = time.time()
+    try :
+        show_int_tabular.main(script_args)
+    finally:
+        sys.stdout = saved_stdout
+    return time.time() - start
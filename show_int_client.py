@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+
+#####################################################################################################################################################################
+# show_int_client: run show_int_tabular in the show_int_tabular.py --daemon
+#
+# Takes the same arguments as show_int_tabular.py. They are sent to the daemon over its Unix domain socket and the
+# output of the run is written to stdout and stderr as it arrives, with the exit status of the run as the exit status.
+# Only the modules needed to talk to the daemon are imported, so a run does not pay for starting show_int_tabular.py.
+#
+# If the daemon is not running the arguments are run by show_int_tabular.py in this process.
+#
+# Usage: python bootflash:show_int_client.py [show_int_tabular.py options]
+#
+#   The socket is /tmp/show_int_tabular.sock or SHOW_INT_TABULAR_SOCKET, the same as the --daemon socket.
+#####################################################################################################################################################################
+
+import os
+import socket
+import struct
+import sys
+
+#
+# The same as daemon_default_socket, daemon_request_header_format and daemon_frame_header_format of show_int_tabular.py
+#
+default_socket = '/tmp/show_int_tabular.sock'
+request_header_format = '<I'
+frame_header_format = '<cI'
+
+#
+# Read length bytes from the daemon, returns fewer if the daemon closed the connection
+#
+def read_daemon(daemon_socket, length):
+    data_list = []
+    while length > 0:
+        data = daemon_socket.recv(min(length, 65536))
+        if not data:
+            break
+        data_list.append(data)
+        length -= len(data)
+    return b''.join(data_list)
+
+#
+# Connect to the daemon, returns None if it is not running
+#
+def connect_daemon(socket_name):
+    daemon_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try :
+        daemon_socket.connect(socket_name)
+    except socket.error:
+        daemon_socket.close()
+        return None
+    return daemon_socket
+
+#
+# Send the arguments to the daemon and write the output of the run
+#
+# Returns the exit status of the run
+#
+def run_request(daemon_socket, argv):
+    request = '\0'.join(argv)
+    if not isinstance(request, bytes):
+        request = request.encode('utf-8')
+    daemon_socket.sendall(struct.pack(request_header_format, len(request)) + request)
+    output_dict = {b'o': getattr(sys.stdout, 'buffer', sys.stdout), b'e': getattr(sys.stderr, 'buffer', sys.stderr)}
+    frame_header_len = struct.calcsize(frame_header_format)
+    while True:
+        frame_header = read_daemon(daemon_socket, frame_header_len)
+        if len(frame_header) != frame_header_len:
+            sys.stderr.write('The daemon closed the connection\n')
+            return 1
+        frame_type, data_len = struct.unpack(frame_header_format, frame_header)
+        data = read_daemon(daemon_socket, data_len)
+        if frame_type == b'x':
+            return int(data)
+        output_dict[frame_type].write(data)
+        output_dict[frame_type].flush()
+
+def main():
+    daemon_socket = connect_daemon(os.environ.get('SHOW_INT_TABULAR_SOCKET', default_socket))
+    if daemon_socket == None:
+        import show_int_tabular
+        show_int_tabular.main()
+        return
+    try :
+        exit_status = run_request(daemon_socket, sys.argv[1:])
+    except KeyboardInterrupt:
+        exit_status = 1
+    daemon_socket.close()
+    sys.exit(exit_status)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,443 @@
+#!/usr/bin/env python
+
+#####################################################################################################################################################################
+# show_int_fabric: run the show_int_tabular tables for many MDS switches from off the switch
+#
+# The show command output of each switch is collected over NX-API (JSON-RPC, several commands per request) or SSH,
+# from many switches at the same time, and parsed with the counter_list templates of show_int_tabular.py. The
+# interfaces of all the switches are displayed in one fabric wide table per stat type, keyed by switch and interface.
+#
+# Usage: python show_int_fabric.py [options] switch [switch ...]
+#
+#   switch is host, host:port or name=host[:port]. The name (default the host) is displayed in the Switch Intf column.
+#####################################################################################################################################################################
+
+import sys
+import argparse
+import base64
+import getpass
+import json
+import os
+import socket
+import ssl
+import threading
+import datetime
+try :
+    import http.client as httplib
+except ImportError:
+    import httplib
+try :
+    import queue
+except ImportError:
+    import Queue as queue
+try :
+    import paramiko
+except ImportError:
+    paramiko = None
+
+import show_int_tabular
+
+#
+# Switches
+#
+# switch_dict = {'name': name displayed, 'host': host, 'port': port or None, 'pool': connection pool,
+#                'output_dict': {command: output}, 'error': first collection error or ''}
+#
+def parse_switch(switch_spec):
+    switch_toks = switch_spec.split('=', 1)
+    if len(switch_toks) == 2:
+        name, host = switch_toks
+    else:
+        name = host = switch_spec
+    port = None
+    if host.count(':') == 1:
+        host, port_str = host.split(':')
+        if not port_str.isdigit():
+            raise argparse.ArgumentTypeError('invalid switch: ' + switch_spec + ' (use host, host:port or name=host[:port])')
+        port = int(port_str)
+        if name == switch_spec:
+            name = host
+    return {'name': name, 'host': host, 'port': port, 'output_dict': {}, 'error': ''}
+
+def read_switch_file(switch_file_name):
+    switch_list = []
+    switch_file_handle = open(switch_file_name)
+    for line in switch_file_handle:
+        line = line.split('#')[0].strip()
+        if line != '':
+            switch_list.append(parse_switch(line))
+    switch_file_handle.close()
+    return switch_list
+
+#
+# NX-API transport
+#
+# All the commands of a batch are sent in one JSON-RPC request with the cli_ascii method, so the text output is
+# the same as on the switch CLI. The HTTP connection is kept open (keep-alive) and reused by the pool.
+#
+def connect_nxapi(switch_dict, args):
+    port = switch_dict['port'] or (80 if args.http else 443)
+    if args.http:
+        return httplib.HTTPConnection(switch_dict['host'], port, timeout = args.timeout)
+    if args.insecure:
+        ssl_context = ssl._create_unverified_context()
+    else:
+        ssl_context = ssl.create_default_context()
+    return httplib.HTTPSConnection(switch_dict['host'], port, timeout = args.timeout, context = ssl_context)
+
+def close_nxapi(connection):
+    connection.close()
+
+#
+# Returns the output of each command in cmd_list, None for commands that failed on the switch
+#
+def run_nxapi_commands(connection, switch_dict, cmd_list, args):
+    request_list = []
+    for cmd_num, cmd in enumerate(cmd_list):
+        request_list.append({'jsonrpc': '2.0', 'method': 'cli_ascii', 'params': {'cmd': cmd, 'version': 1}, 'id': cmd_num + 1})
+    auth = base64.b64encode((args.user + ':' + args.password).encode('utf-8')).decode('ascii')
+    headers = {'Content-Type': 'application/json-rpc', 'Authorization': 'Basic ' + auth}
+    connection.request('POST', '/ins', json.dumps(request_list), headers)
+    response = connection.getresponse()
+    response_body = response.read()
+    if response.status != 200:
+        raise Exception('NX-API returned HTTP ' + str(response.status) + ' ' + response.reason)
+    response_list = json.loads(response_body.decode('utf-8'))
+    if isinstance(response_list, dict):
+        response_list = [response_list]
+    output_list = [None] * len(cmd_list)
+    for response_entry in response_list:
+        cmd_num = response_entry.get('id', 0) - 1
+        if 0 <= cmd_num < len(cmd_list) and isinstance(response_entry.get('result'), dict):
+            output_list[cmd_num] = response_entry['result'].get('msg', '')
+    return output_list
+
+#
+# SSH transport (requires paramiko)
+#
+# Each command is run in its own channel of the SSH connection
+#
+def connect_ssh(switch_dict, args):
+    ssh_client = paramiko.SSHClient()
+    ssh_client.load_system_host_keys()
+    if args.insecure:
+        ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    ssh_client.connect(switch_dict['host'], port = switch_dict['port'] or 22, username = args.user, password = args.password,
+                       timeout = args.timeout, look_for_keys = False, allow_agent = False)
+    return ssh_client
+
+def close_ssh(ssh_client):
+    ssh_client.close()
+
+def run_ssh_commands(ssh_client, switch_dict, cmd_list, args):
+    output_list = []
+    for cmd in cmd_list:
+        stdin, stdout, stderr = ssh_client.exec_command(cmd, timeout = args.timeout)
+        output = stdout.read().decode('utf-8', 'replace')
+        if stdout.channel.recv_exit_status() != 0:
+            output = None
+        output_list.append(output)
+    return output_list
+
+#
+# transport_dict = {transport: [connect function, run commands function, close function]}
+#
+transport_dict = {
+    'nxapi': [connect_nxapi, run_nxapi_commands, close_nxapi],
+    'ssh': [connect_ssh, run_ssh_commands, close_ssh],
+}
+
+#
+# Connection pool of a switch
+#
+# Up to max connections are open at the same time. A connection is returned to the pool after each batch and
+# reused by the next batch of the switch.
+#
+def create_pool(max_connections):
+    return {'condition': threading.Condition(), 'idle': [], 'count': 0, 'max': max_connections}
+
+def get_connection(pool, switch_dict, args):
+    connect_function = transport_dict[args.transport][0]
+    pool['condition'].acquire()
+    try :
+        while not pool['idle'] and pool['count'] >= pool['max']:
+            pool['condition'].wait()
+        if pool['idle']:
+            return pool['idle'].pop()
+        pool['count'] += 1
+    finally:
+        pool['condition'].release()
+    try :
+        return connect_function(switch_dict, args)
+    except :
+        release_connection(pool, None, args)
+        raise
+
+#
+# Return a connection to the pool, connection None or broken True closes it
+#
+def release_connection(pool, connection, args, broken = False):
+    close_function = transport_dict[args.transport][2]
+    pool['condition'].acquire()
+    try :
+        if connection != None and not broken:
+            pool['idle'].append(connection)
+        else:
+            pool['count'] -= 1
+            if connection != None:
+                close_function(connection)
+        pool['condition'].notify()
+    finally:
+        pool['condition'].release()
+
+def close_pool(pool, args):
+    close_function = transport_dict[args.transport][2]
+    for connection in pool['idle']:
+        close_function(connection)
+    pool['idle'] = []
+
+#
+# Run one batch of commands on a switch and store the outputs in switch_dict['output_dict']
+#
+# A connection that fails is closed and the batch is tried once more on a new connection, e.g. when the switch
+# closed an idle keep-alive connection
+#
+def run_batch(switch_dict, cmd_list, args):
+    run_function = transport_dict[args.transport][1]
+    for attempt in [1, 2]:
+        connection = get_connection(switch_dict['pool'], switch_dict, args)
+        try :
+            output_list = run_function(connection, switch_dict, cmd_list, args)
+        except (socket.error, httplib.HTTPException, EOFError):
+            release_connection(switch_dict['pool'], connection, args, True)
+            if attempt == 2:
+                raise
+            continue
+        except :
+            release_connection(switch_dict['pool'], connection, args, True)
+            raise
+        release_connection(switch_dict['pool'], connection, args)
+        for cmd, output in zip(cmd_list, output_list):
+            switch_dict['output_dict'][cmd] = output
+        return
+
+#
+# Worker thread: run the batches in batch_queue until it is empty
+#
+def batch_worker(batch_queue, args):
+    while True:
+        try :
+            switch_dict, cmd_list = batch_queue.get_nowait()
+        except queue.Empty:
+            return
+        if switch_dict['error'] == '':
+            try :
+                run_batch(switch_dict, cmd_list, args)
+            except Exception as e:
+                switch_dict['error'] = str(e) or e.__class__.__name__
+
+#
+# Collect cmd_list from all the switches
+#
+# The commands of each switch are split into batches of args.batch commands. The batches of all the switches are
+# run by args.workers threads, with at most args.connections connections to each switch.
+#
+def collect_switches(switch_list, cmd_list, args):
+    batch_queue = queue.Queue()
+    for switch_dict in switch_list:
+        switch_dict['pool'] = create_pool(args.connections)
+    #
+    # The first batch of every switch is queued before the second batch of any switch so the workers do not all
+    # wait for the connections of one switch
+    #
+    for batch_start in range(0, len(cmd_list), args.batch):
+        for switch_dict in switch_list:
+            batch_queue.put([switch_dict, cmd_list[batch_start:batch_start + args.batch]])
+    thread_list = []
+    for worker_num in range(min(args.workers, batch_queue.qsize())):
+        thread = threading.Thread(target=batch_worker, args=(batch_queue, args))
+        thread.daemon = True
+        thread.start()
+        thread_list.append(thread)
+    for thread in thread_list:
+        thread.join()
+    for switch_dict in switch_list:
+        close_pool(switch_dict['pool'], args)
+
+#
+# Get the output of a command of a switch, print an error and return '' if the command failed
+#
+def get_switch_output(switch_dict, cmd):
+    output = switch_dict['output_dict'].get(cmd)
+    if output == None:
+        print('Error issuing ' + cmd + ' command on ' + switch_dict['name'] + '...')
+        return ''
+    return output
+
+#
+# Parse the outputs of a switch the same way as show_int_tabular.py does on the switch
+#
+# Returns intf_table, intf_list, max_descr_len
+#
+def parse_switch_outputs(switch_dict, cmd_dict, stat_type_list, port_type_filter, args):
+    intf_table = show_int_tabular.create_intf_table(show_int_tabular.intf_info_var_list)
+    intf_list = []
+    port_channel_dict = {}
+    max_descr_len = None
+    if port_type_filter or args.type_brief:
+        show_int_tabular.parse_show_int_brief(get_switch_output(switch_dict, cmd_dict['brief']), port_type_filter, args, intf_table, intf_list, port_channel_dict)
+        if 'topology' in cmd_dict:
+            show_int_tabular.set_topology(show_int_tabular.parse_show_topology(get_switch_output(switch_dict, cmd_dict['topology'])), intf_table, port_channel_dict)
+    if 'flogi' in cmd_dict:
+        show_int_tabular.set_flogi(show_int_tabular.parse_show_flogi_database(get_switch_output(switch_dict, cmd_dict['flogi'])), intf_table)
+    if 'description' in cmd_dict:
+        max_descr_len = show_int_tabular.set_descriptions(show_int_tabular.parse_show_int_description(get_switch_output(switch_dict, cmd_dict['description'])), port_type_filter, intf_table)
+    show_int_counter_detail_new = show_int_tabular.parse_show_version(get_switch_output(switch_dict, cmd_dict['version']))
+    if 'counters' in cmd_dict:
+        counter_list = show_int_tabular.merge_counter_lists([show_int_tabular.build_counter_list(stat_type, show_int_counter_detail_new)[1] for stat_type in stat_type_list])
+        column_names_list, column_widths_list, default_intf_dict = show_int_tabular.build_columns(counter_list)
+        counter_index_dict = show_int_tabular.compile_counter_list(counter_list, intf_table)
+        where_function = None
+        if args.where != None:
+            where_function = show_int_tabular.compile_where(args.where, intf_table)
+        counters_cmd = cmd_dict['counters']
+        show_int_tabular.parse_show_int_counters_outputs({(counters_cmd, False): get_switch_output(switch_dict, counters_cmd)}, [[counters_cmd, counters_cmd, '']],
+                                                         counter_index_dict, default_intf_dict, port_type_filter, intf_table, intf_list, 1, where_function)
+    return intf_table, intf_list, max_descr_len
+
+def main():
+    parser = argparse.ArgumentParser(prog='show_int_fabric', description='Collect the show_int_tabular tables from many MDS switches at the same time')
+    parser.add_argument('switch', nargs='*', type=parse_switch, help='Switch as host, host:port or name=host[:port]')
+    parser.add_argument('--switch-file', dest='switch_file', help='File with one switch per line, as host, host:port or name=host[:port]')
+    parser.add_argument('--general-stats', action="store_true", dest='type_general_stats', help = 'Display general statistics (non errors).')
+    parser.add_argument('--link-stats', action="store_true",  dest='type_link_stats', help = 'Display physical link statistics. Default')
+    parser.add_argument('--congestion-stats', action="store_true",  dest='type_congestion_stats', help = 'Display congestion statistics')
+    parser.add_argument('--transceiver-stats', action="store_true",  dest='type_sfp_stats', help = 'Display transceiver(SFP) statistics')
+    parser.add_argument('--sfp-stats', action="store_true",  dest='type_sfp_stats', help = 'Display transceiver(SFP) statistics')
+    parser.add_argument('--transceiver-detail-stats', action="store_true",  dest='type_sfp_detail_stats', help = 'Display transceiver(SFP) detailed statistics')
+    parser.add_argument('--sfp-detail-stats', action="store_true",  dest='type_sfp_detail_stats', help = 'Display transceiver(SFP) detailed statistics')
+    parser.add_argument('--all', action="store_true", dest='type_all', help = 'Display link, congestion and general statistics from one collection')
+    parser.add_argument('--wide', action="store_true", help = 'Display all the requested statistics types in one table')
+    parser.add_argument('--brief', action="store_true", dest='type_brief', help = 'Display interface brief values + description + peer pwwn + device-alias or switchname')
+    parser.add_argument('--e', action="store_true", dest='filter_e_port', help='Display only (T)E ports')
+    parser.add_argument('--f', action="store_true", dest='filter_f_port', help='Display only (T)F ports')
+    parser.add_argument('--np', action="store_true", dest='filter_np_port', help='Display only (T)NP ports')
+    parser.add_argument('--edge', action="store_true", dest='filter_edge_port', help='Display only logical-type edge ports')
+    parser.add_argument('--core', action="store_true", dest='filter_core_port', help='Display only logical-type core ports')
+    parser.add_argument('--errorsonly', action="store_true", dest='filter_errorsonly', help='Display only interfaces with non-zero counts.')
+    parser.add_argument('--where', type=show_int_tabular.parse_where, help='Display only the interfaces that match this expression of variable names, e.g. "intf_invalid_crcs > 100"')
+    parser.add_argument('--d', action="store_true", dest='include_description', help='Include port description if found')
+    parser.add_argument('--sort', help='Sort the interfaces of all the switches on this column, highest first. The column heading (e.g. "Invalid CRC") or variable name (e.g. invalid_crcs)')
+    parser.add_argument('--top', type=int, default=0, help='Display only the first TOP interfaces of --sort')
+    parser.add_argument('--reverse', action="store_true", help='Reverse the --sort order')
+    parser.add_argument('--transport', choices=sorted(transport_dict), default='nxapi', help='nxapi (NX-API JSON-RPC over HTTPS) or ssh (requires paramiko). Default nxapi')
+    parser.add_argument('--user', default=getpass.getuser(), help='Switch user name. Default the local user name')
+    parser.add_argument('--http', action="store_true", help='Use NX-API over HTTP instead of HTTPS')
+    parser.add_argument('--insecure', action="store_true", help='Do not verify the switch HTTPS certificate or SSH host key')
+    parser.add_argument('--workers', type=int, default=16, help='Batches of commands collected at the same time. Default 16')
+    parser.add_argument('--connections', type=int, default=2, help='Connections kept open to each switch. Default 2')
+    parser.add_argument('--batch', type=int, default=8, help='Commands sent in one NX-API request. Default 8')
+    parser.add_argument('--timeout', type=int, default=300, help='Seconds to wait for a switch to answer. Default 300')
+    parser.set_defaults(fc_interface='', interval=0, count=0, snapshot=None, query=None, query_stat='rate', outfile=None, appendfile=None, alias_index=None, exporter=None, output_format='table', per_module=False, parse_processes=None, daemon=None, columns=None, history_max_intfs=0)
+    args = parser.parse_args()
+
+    if not show_int_tabular.validateArgs(args):
+        sys.exit()
+    switch_list = list(args.switch)
+    if args.switch_file:
+        switch_list.extend(read_switch_file(args.switch_file))
+    if not switch_list:
+        print('Please enter at least one switch or --switch-file')
+        sys.exit(1)
+    if args.workers < 1 or args.connections < 1 or args.batch < 1:
+        print('--workers, --connections and --batch must be at least 1')
+        sys.exit(1)
+    if args.transport == 'ssh' and paramiko == None:
+        print('--transport ssh requires the paramiko module')
+        sys.exit(1)
+    args.password = os.environ.get('SHOW_INT_FABRIC_PASSWORD')
+    if args.password == None:
+        args.password = getpass.getpass('Password for ' + args.user + ': ')
+
+    stat_type_list = [stat_type for stat_type in ['type_link_stats', 'type_congestion_stats', 'type_general_stats', 'type_sfp_stats', 'type_sfp_detail_stats', 'type_brief'] if getattr(args, stat_type)]
+    port_type_filter = args.filter_e_port or args.filter_f_port or args.filter_np_port or args.filter_edge_port or args.filter_core_port
+
+    #
+    # Check the --where variables before collecting. The variables are the same for the counters formats before and
+    # after NX-OS 8.4(2).
+    #
+    if args.where != None:
+        where_table = show_int_tabular.create_intf_table(show_int_tabular.intf_info_var_list)
+        show_int_tabular.compile_counter_list(show_int_tabular.merge_counter_lists([show_int_tabular.build_counter_list(stat_type, True)[1] for stat_type in stat_type_list]), where_table)
+        if not show_int_tabular.check_where(where_table, args):
+            sys.exit(1)
+
+    #
+    # Commands for the requested type and filters. The counters are collected for all the interfaces, with a
+    # port type filter only the interfaces that match it are parsed.
+    #
+    # cmd_dict = {output: command}
+    #
+    cmd_dict = {'version': 'show version'}
+    if args.type_link_stats or args.type_congestion_stats or args.type_general_stats:
+        cmd_dict['counters'] = 'show interface counters detailed'
+    elif args.type_sfp_stats or args.type_sfp_detail_stats:
+        cmd_dict['counters'] = 'show interface transceiver'
+    if port_type_filter or args.type_brief:
+        cmd_dict['brief'] = 'show interface brief'
+    if (port_type_filter or args.type_brief) and (not port_type_filter or args.filter_e_port or args.filter_core_port):
+        cmd_dict['topology'] = 'show topology'
+    if args.type_brief:
+        cmd_dict['flogi'] = 'show flogi database'
+    if args.include_description or args.type_brief:
+        cmd_dict['description'] = 'show interface description'
+    #
+    # The counters command has the most output, so it is started first
+    #
+    cmd_list = [cmd_dict[output] for output in ['counters', 'brief', 'topology', 'flogi', 'description', 'version'] if output in cmd_dict]
+
+    collect_switches(switch_list, cmd_list, args)
+    current_datetime = datetime.datetime.today().strftime('%Y/%m/%d %H:%M:%S')
+
+    #
+    # Merge the interfaces of all the switches, keyed by 'switch interface'
+    #
+    fabric_table = show_int_tabular.create_intf_table(show_int_tabular.intf_info_var_list)
+    fabric_intf_list = []
+    max_descr_len = 0
+    for switch_dict in switch_list:
+        if switch_dict['error'] != '':
+            print('Error collecting from ' + switch_dict['name'] + ': ' + switch_dict['error'])
+            continue
+        intf_table, intf_list, switch_max_descr_len = parse_switch_outputs(switch_dict, cmd_dict, stat_type_list, port_type_filter, args)
+        show_int_tabular.add_intf_table_vars(fabric_table, intf_table['var_list'])
+        for intf in intf_list:
+            fabric_intf = switch_dict['name'] + ' ' + intf
+            row = intf_table['intf_index_dict'][intf]
+            for var_name, column in zip(intf_table['var_list'], intf_table['column_list']):
+                show_int_tabular.set_intf_value(fabric_table, fabric_intf, var_name, column[row])
+            fabric_intf_list.append(fabric_intf)
+        max_descr_len = max(max_descr_len, switch_max_descr_len or 0)
+
+    #
+    # Display one table per type for all the switches, the same as show_int_tabular.py
+    #
+    # The column headings and variables are the same for the counters formats before and after NX-OS 8.4(2)
+    #
+    table_list = [list(show_int_tabular.build_counter_list(stat_type, True)) for stat_type in stat_type_list]
+    counter_list = show_int_tabular.merge_counter_lists([table_entry[1] for table_entry in table_list])
+    if args.wide and len(table_list) > 1:
+        table_list = [[' + '.join([table_entry[0][:-1] for table_entry in table_list]) + ':', counter_list]]
+    column_names_list, column_widths_list, default_intf_dict = show_int_tabular.build_columns(counter_list)
+    if not show_int_tabular.check_sort_column(counter_list, column_names_list, args):
+        sys.exit(1)
+    if fabric_table['intf_names']:
+        for type_line, table_counter_list in table_list:
+            column_names_list, column_widths_list, table_default_intf_dict = show_int_tabular.build_columns(table_counter_list)
+            column_names_list[-1][0] = 'Switch Intf'
+            column_widths_list[0] = max(column_widths_list[0], len(column_names_list[-1][0]))
+            output_table_list = show_int_tabular.build_table_rows(table_counter_list, fabric_intf_list, fabric_table, column_widths_list, args)
+            show_int_tabular.print_table(current_datetime + ' ' + type_line, column_names_list, column_widths_list, output_table_list, fabric_table, max_descr_len, args, None)
+
+if __name__ == '__main__':
+    main()
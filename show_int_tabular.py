@@ -30,18 +30,70 @@
 import sys
 sys.path.append('/isan/bin/cli-scripts/')
 import argparse
+import array
+import csv
 import json
+import mmap
+import os
+import pstats
+import re
+import socket
+import struct
 import datetime
-import cli
+import cProfile
+import hashlib
+import heapq
+import threading
+import time
+import warnings
+#
+# The NX-OS cli module is only on the switch. Off the switch the parse and table functions are used by
+# show_int_fabric.py with the show command output of other switches.
+#
+try :
+    import cli
+except ImportError:
+    cli = None
+try :
+    import numpy
+except ImportError:
+    numpy = None
+try :
+    import multiprocessing
+except ImportError:
+    multiprocessing = None
+try :
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn, StreamRequestHandler, UnixStreamServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn, StreamRequestHandler, UnixStreamServer
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
 
 def validateArgs (args) : 
 
+   if args.type_all:
+       args.type_link_stats = True
+       args.type_congestion_stats = True
+       args.type_general_stats = True
+
    main_args_sum = int(args.type_link_stats) + int(args.type_congestion_stats) + int(args.type_general_stats) + int(args.type_sfp_stats) + int(args.type_sfp_detail_stats) + int(args.type_brief) 
-   if  main_args_sum == 0:
+   counter_args_sum = int(args.type_link_stats) + int(args.type_congestion_stats) + int(args.type_general_stats)
+   sfp_args_sum = int(args.type_sfp_stats) + int(args.type_sfp_detail_stats)
+   columns_source_list = []
+   if args.columns:
+       if main_args_sum:
+           print ("--columns can not be used with --general-stats, --link-stats, --congestion-stats, --transceiver(sfp)-stats, --transceiver(sfp)-detail-stats, --all or --brief")
+           return False
+       columns_source_list = get_columns_source_list(get_columns_var_list(args))
+   elif  main_args_sum == 0:
        args.type_link_stats = True
        #print('Defaulting to link stats')
-   elif  main_args_sum  > 1:
+   elif  main_args_sum  > 1 and main_args_sum != counter_args_sum and main_args_sum != sfp_args_sum:
         print ("\n Please choose a single type to display via --general-stats or --link-stats or --congestion-stats or --transceiver(sfp)-stats or --transceiver(sfp)-detail-stats or --brief\n")
+        print (" --general-stats, --link-stats and --congestion-stats (or --all) can be combined. --transceiver(sfp)-stats and --transceiver(sfp)-detail-stats can be combined.\n")
         return False
 
    if args.fc_interface :
@@ -53,6 +105,70 @@ def validateArgs (args) :
    else:
        intf_range = ''
        
+   if args.interval < 0 or args.count < 0:
+       print ("--interval and --count must be positive numbers")
+       return False
+
+   if args.count and not args.interval:
+       print ("--count requires --interval")
+       return False
+
+   if args.interval and not (args.type_link_stats or args.type_congestion_stats or args.type_general_stats or columns_source_list == ['counters']):
+       print ("--interval is only supported with --link-stats, --congestion-stats, --general-stats or --columns of their variables")
+       return False
+
+   if args.snapshot and not (args.type_link_stats or args.type_congestion_stats or args.type_general_stats or columns_source_list == ['counters']):
+       print ("--snapshot is only supported with --link-stats, --congestion-stats, --general-stats or --columns of their variables")
+       return False
+
+   if args.query_stat not in ['delta', 'rate', 'max'] and not (args.query_stat[:1] == 'p' and args.query_stat[1:].isdigit() and int(args.query_stat[1:]) <= 100):
+       print ("--query-stat must be delta, rate, max or a percentile like p95")
+       return False
+
+   if args.top < 0:
+       print ("--top must be a positive number")
+       return False
+
+   if args.history_max_intfs < 0:
+       print ("--history-max-intfs must be a positive number")
+       return False
+
+   if (args.top or args.reverse) and not args.sort:
+       print ("--top and --reverse require --sort")
+       return False
+
+   if args.alias_index and not (args.type_brief or (args.columns and 'device_alias_or_switchname' in args.columns)):
+       print ("--alias-index requires --brief or --columns with device_alias_or_switchname")
+       return False
+
+   if args.output_format != 'table' and (args.interval or args.snapshot or args.query):
+       print ("--format " + args.output_format + " can not be used with --interval, --snapshot or --query")
+       return False
+
+   if args.exporter != None and (args.interval or args.snapshot or args.history or args.query or args.sort or args.outfile or args.appendfile or args.columns):
+       print ("--exporter can not be used with --interval, --snapshot, --history, --query, --sort, --outfile, --appendfile or --columns")
+       return False
+
+   if args.daemon and (args.exporter != None or args.interval or args.query):
+       print ("--daemon can not be used with --exporter, --interval or --query")
+       return False
+
+   if args.where != None and (args.type_brief or args.interval or args.snapshot or args.query or args.exporter != None):
+       print ("--where can not be used with --brief, --interval, --snapshot, --query or --exporter")
+       return False
+
+   if args.per_module and (args.type_brief or args.exporter != None):
+       print ("--per-module can not be used with --brief or --exporter")
+       return False
+
+   if (args.where != None or args.per_module) and columns_source_list == ['brief']:
+       print ("--where and --per-module require --columns with a counters or transceiver variable")
+       return False
+
+   if args.parse_processes != None and args.parse_processes < 1:
+       print ("--parse-processes must be at least 1")
+       return False
+
    if args.outfile and args.appendfile:
        print ("Both --outfile and --appendfile are used. These are mutually exclusive arguments, only one can be used at a time.")
        return False
@@ -79,636 +195,462 @@ def check_intf_filter(intf, oper_mode, logical_type, args):
         include_intf = True
     #print('check_intf_filter: intf: ' + intf + ' oper_mode: ' + oper_mode + ' logical_type: ' + logical_type + ' include: ' + str(include_intf))
     return include_intf
-    
-##############################################################################
-# Main
-##############################################################################
-global intf_range
-# argument parsing
-parser = argparse.ArgumentParser(prog='show_int_tabular', description='show_int_tabular version v1.11')
-parser.add_argument('--version', action='version', help='version', version='%(prog)s v1.11')
-parser.add_argument('fc_interface', nargs='*', default = '', help='fc interface, port-channel interface, interface range or interface list')
-parser.add_argument('--general-stats', action="store_true", dest='type_general_stats', help = 'Display general statistics (non errors).')
-parser.add_argument('--link-stats', action="store_true",  dest='type_link_stats', help = 'Display physical link statistics. Default')
-parser.add_argument('--congestion-stats', action="store_true",  dest='type_congestion_stats', help = 'Display congestion statistics')
-parser.add_argument('--transceiver-stats', action="store_true",  dest='type_sfp_stats', help = 'Display transceiver(SFP) statistics')
-parser.add_argument('--sfp-stats', action="store_true",  dest='type_sfp_stats', help = 'Display transceiver(SFP) statistics')
-parser.add_argument('--transceiver-detail-stats', action="store_true",  dest='type_sfp_detail_stats', help = 'Display transceiver(SFP) detailed statistics')
-parser.add_argument('--sfp-detail-stats', action="store_true",  dest='type_sfp_detail_stats', help = 'Display transceiver(SFP) detailed statistics')
-parser.add_argument('--brief', action="store_true", dest='type_brief', help = 'Display interface brief values + description + peer pwwn + device-alias or switchname')
-parser.add_argument('--e', action="store_true", dest='filter_e_port', help='Display only (T)E ports in interface range or list')
-parser.add_argument('--f', action="store_true", dest='filter_f_port', help='Display only (T)F ports in interface range or list')
-parser.add_argument('--np', action="store_true", dest='filter_np_port', help='Display only (T)NP ports in interface range or list')
-parser.add_argument('--edge', action="store_true", dest='filter_edge_port', help='Display only logical-type edge ports in interface range or list')
-parser.add_argument('--core', action="store_true", dest='filter_core_port', help='Display only logical-type core ports in interface range or list')
-parser.add_argument('--errorsonly', action='store_true', dest='filter_errorsonly', help='Display only interfaces with non-zero counts.')
-parser.add_argument('--outfile', help='Write output to file on bootflash on switch. If file exists already it will be overwritten.')
-parser.add_argument('--appendfile', help='Append output to file on bootflash on switch. If file does not exist it will be created.')
-parser.add_argument('--d', action="store_true", dest='include_description', help='Include port description if found')
-
-#
-# Handle arguments
-#
-args = parser.parse_args()
-
-if not validateArgs (args) :
-    sys.exit() 
-
-#if not (args.type_link_stats or args.type_congestion_stats or args.type_general_stats):
-#    args.type_link_stats = True
-
-if len(args.fc_interface) > 0:
-    intf_range = args.fc_interface[0] + ' '
-else:
-    intf_range = ''
-
-#if args.filter_e_port == True:
-#print('args.filter_e_port: ' + str(args.filter_e_port))
-
-#
-# outfile
-#
-outfile_name = ''
-if args.outfile != None:
-    outfile_name = '/bootflash/' + args.outfile
-    try:
-        outfile_handle = open(outfile_name,'w')
-    except Exception as e:
-        print('Invalid filename: "' + outfile_name + '". Open failed with {}'.format(e))
-        sys.exit(1)
-    
+
 #
-# appendfile
+# Interface table where the variables of all the interfaces are stored, one list per variable
 #
-if args.appendfile != None:
-    outfile_name = '/bootflash/' + args.appendfile
-    try:
-        outfile_handle = open(outfile_name,'a')
-    except Exception as e:
-        print('Invalid filename: "' + outfile_name + '". Open failed with {}'.format(e))
-        sys.exit(1)
-    
-current_datetime = datetime.datetime.today().strftime('%Y/%m/%d %H:%M:%S')
-#print('Current date time: ' + current_datetime)
+# intf_table = {
+#               'var_list': [variable name, ...],
+#               'var_index_dict': {variable name: column number},
+#               'intf_names': [intf, ...],
+#               'intf_index_dict': {intf: row number},
+#               'column_list': [[value of row 0, value of row 1, ...], ...],
+#              }
+#
+# The schema (var_list) is built once: the show interface brief, flogi and description variables in
+# intf_info_var_list, then the variables of the counter_list of the requested types. The rows are the interfaces
+# in the order the show commands found them. intf_list, the interfaces to display, is kept separately.
+#
+# A value is None if the variable was not found for the interface (displayed as 'NF'). Counters are kept as ints.
+#
+intf_info_var_list = ['vsan', 'admin_mode', 'admin_trunk_mode', 'status', 'sfp', 'oper_mode', 'oper_speed', 'port_channel', 'logical_type', 'ip_addr',
+                      'device_alias_or_switchname', 'peer_pwwn', 'description']
+try :
+    integer_types = (int, long)
+except NameError:
+    integer_types = (int,)
+
+def create_intf_table(var_list):
+    intf_table = {'var_list': [], 'var_index_dict': {}, 'intf_names': [], 'intf_index_dict': {}, 'column_list': []}
+    add_intf_table_vars(intf_table, var_list)
+    return intf_table
 
 #
-# Initialize show_int_variables_dict where all variables are stored
-# Initialize  intf_list which is the list of interfaces to output
+# Add a column for each variable of var_list that is not in the interface table yet
 #
-global show_int_variables_dict
-show_int_variables_dict = {}
-intf_list = []
-port_channel_dict = {}
+def add_intf_table_vars(intf_table, var_list):
+    for var_name in var_list:
+        if var_name not in intf_table['var_index_dict']:
+            intf_table['var_index_dict'][var_name] = len(intf_table['var_list'])
+            intf_table['var_list'].append(var_name)
+            intf_table['column_list'].append([None] * len(intf_table['intf_names']))
+
 #
-# Issue show interface brief if any filter is specified or if type brief is requested
+# Get the row of an interface, adding it to the interface table if it is not there yet
 #
-# port_type_filter == True indicates one of the port types(e, f, np, core, edge) is requested
+def add_intf_table_row(intf_table, intf):
+    row = intf_table['intf_index_dict'].get(intf)
+    if row == None:
+        row = len(intf_table['intf_names'])
+        intf_table['intf_index_dict'][intf] = row
+        intf_table['intf_names'].append(intf)
+        for column in intf_table['column_list']:
+            column.append(None)
+    return row
+
 #
-# Build show_int_variables_dict with keys from show interface brief
+# Get the value of a variable of an interface, None if not found
 #
-if args.filter_e_port | args.filter_f_port | args.filter_np_port | args.filter_edge_port | args.filter_core_port:
-    port_type_filter = True
-else:
-    port_type_filter = False
-    
-if  port_type_filter | args.type_brief:
-    show_int_brief_cmd = 'show interface ' + str(intf_range) + 'brief'
-    try :
-        show_int_brief_str = cli.cli(show_int_brief_cmd)
-    except :
-        print('Error issuing ' + show_int_brief_cmd + ' command...')
-        pass
-    show_int_brief_dict = {}
-    show_int_brief_list = show_int_brief_str.splitlines()
-    #print('show_int_brief_list: ' + str(len(show_int_brief_list)) + ' bytes')
-    for line in show_int_brief_list:
-        #print('show interface brief line: ' + line)
-        line_toks = line.split()
-        #if len(line_toks) >= 1:
-            #print('line_toks[0]:' + line_toks[0])
-            #print("line.startswith('fc'): " + str(line.startswith('fc')))
-            #print('split: ' + str(line_toks[0].split('/')))
-        if (line.startswith('fc') and len(line_toks[0].split('/')) == 2):
-            intf = line_toks[0]
-            if not port_type_filter or check_intf_filter(intf, line_toks[6], line_toks[9], args):
-                intf_list.append(intf)
-                show_int_variables_dict[intf] = {}
-                show_int_variables_dict[intf]['vsan'] = line_toks[1]
-                show_int_variables_dict[intf]['admin_mode'] = line_toks[2]
-                show_int_variables_dict[intf]['admin_trunk_mode'] = line_toks[3]
-                show_int_variables_dict[intf]['status'] = line_toks[4]
-                show_int_variables_dict[intf]['sfp'] = line_toks[5]
-                show_int_variables_dict[intf]['oper_mode'] = line_toks[6]
-                show_int_variables_dict[intf]['oper_speed'] = line_toks[7]
-                show_int_variables_dict[intf]['port_channel'] = line_toks[8]
-                show_int_variables_dict[intf]['logical_type'] = line_toks[9]
-                #print('Adding intf: ' + intf + ' to show_int_variables_dict: oper_mode: ' + line_toks[6] + ' logical_type: ' + line_toks[9])
-                #
-                # Build port_channel_dict to include all interfaces that make up a PC
-                #
-                if show_int_variables_dict[intf]['port_channel'] != '--':
-                    port_channel = 'port-channel' + show_int_variables_dict[intf]['port_channel']
-                    if port_channel not in port_channel_dict:
-                        port_channel_dict[port_channel] = []
-                    port_channel_dict[port_channel].append(intf)
-        elif line.startswith('port-channel'):
-            intf = line_toks[0]
-            if not port_type_filter or check_intf_filter(intf, line_toks[4], line_toks[7], args):
-                intf_list.append(intf)
-                show_int_variables_dict[intf] = {}
-                show_int_variables_dict[intf]['vsan'] = line_toks[1]
-                show_int_variables_dict[intf]['admin_trunk_mode'] = line_toks[2]
-                show_int_variables_dict[intf]['status'] = line_toks[3]
-                show_int_variables_dict[intf]['oper_mode'] = line_toks[4]
-                show_int_variables_dict[intf]['oper_speed'] = line_toks[5]
-                show_int_variables_dict[intf]['ip_addr'] = line_toks[6]
-                show_int_variables_dict[intf]['logical_type'] = line_toks[7]
-                show_int_variables_dict[intf]['port_channel'] = '-'
-                
-                #print('Adding intf: ' + intf + ' to show_int_variables_dict: oper_mode: ' + line_toks[6] + ' logical_type: ' + line_toks[9])
-    #
-    # Determine adjacent switchname
-    #
-    if not port_type_filter or args.filter_e_port or args.filter_core_port:
-        port_channels_found_dict = {}
-        show_topo_cmd = 'show topology'
-        try :
-            show_topo_str = cli.cli(show_topo_cmd)
-        except :
-            print('Error issuing ' + show_topo_cmd + ' command...')
-            pass
-        show_topo_dict = {}
-        show_topo_list = show_topo_str.splitlines()
-        #
-        # Go through show topology... don't care about VSANs
-        #
-        for line in show_topo_list:
-            topo_toks = line.split()
-            if len(topo_toks) > 0 and (topo_toks[0].startswith('fc') or topo_toks[0].startswith('port-channel') or topo_toks[0].startswith('vfc')):
-                intf = topo_toks[0]
-                switchname = line.split('(')[2][:-1]
-                if intf in show_int_variables_dict:
-                    show_int_variables_dict[intf]['device_alias_or_switchname'] = switchname
-                if intf in port_channel_dict:
-                    if intf not in port_channels_found_dict:
-                        port_channels_found_dict[intf] = True                    
-                        for member_intf in port_channel_dict[intf]:
-                            if intf in show_int_variables_dict:
-                                show_int_variables_dict[member_intf]['device_alias_or_switchname'] = switchname
-                                #print('setting show_int_variables_dict[' + member_intf + "]['device_alias_or_switchname'] = " + switchname)
-else:
-    port_type_filter = False
-    
+def get_intf_value(intf_table, intf, var_name):
+    row = intf_table['intf_index_dict'].get(intf)
+    column_num = intf_table['var_index_dict'].get(var_name)
+    if row == None or column_num == None:
+        return None
+    return intf_table['column_list'][column_num][row]
+
 #
-# For type_brief only:
-# Add the following keys to show_int_variables_dict[intf]:
+# Set the value of a variable of an interface, adding the interface if it is not in the interface table yet
 #
-# show_int_variables_dict[intf]['peer_pwwn'] = Peer PWWN
-# show_int_variables_dict[intf]['device_alias_or_switchname'] = device-alias name (if any)
+def set_intf_value(intf_table, intf, var_name, var_value):
+    intf_table['column_list'][intf_table['var_index_dict'][var_name]][add_intf_table_row(intf_table, intf)] = var_value
+
 #
-# I could issue 'show device-alias database' and 'show interface' or 'show flogi database' and 'show interface description'
-# Since the 'show device-alias database' is fabric wide and could be 1000s of entries I will use 'show flogi database'
+# Set the values of variables of an interface
 #
-# 
-if args.type_brief:
-    try :
-        show_flogi_database_str = cli.cli('show flogi database |  i \[ p 1')
-    except :
-        print('Error issuing ' + '"show flogi database | \[" command...')
-        pass
-        
-    show_flogi_database_list = show_flogi_database_str.splitlines()
-    
-    pwwn = 'no_pwwn'
-    for line in show_flogi_database_list:
-        fd_toks = line.split()
-        if fd_toks[0].startswith('fc') or  fd_toks[0].startswith('port-channel'):
-            intf = fd_toks[0]
-            pwwn = fd_toks[3]
-            if intf in show_int_variables_dict and 'peer_pwwn' not in show_int_variables_dict[intf]:
-                show_int_variables_dict[intf]['peer_pwwn'] = pwwn
-        elif fd_toks[0][0] == '[':
-            device_alias = fd_toks[0][1:-1]
-            if intf in show_int_variables_dict and 'device_alias_or_switchname' not in show_int_variables_dict[intf]:
-                #print('Setting show_int_variables_dict [' + intf + "]['device_alias_or_switchname'] = " + device_alias)
-                show_int_variables_dict[intf]['device_alias_or_switchname'] = device_alias
+def set_intf_values(intf_table, intf, var_list, value_list):
+    row = add_intf_table_row(intf_table, intf)
+    for var_name, var_value in zip(var_list, value_list):
+        intf_table['column_list'][intf_table['var_index_dict'][var_name]][row] = var_value
 
 #
-# Issue show interface description command if include_description is specified or --brief specified
+# Convert a value of the show command output to the value stored in the interface table
 #
-# Add the following key to show_int_variables_dict[intf]:
-# show_int_variables_dict[intf]['description'] = first 64 bytes of switchport description
+# Decimal integers are stored as ints, unless they have leading zeros (e.g. serial numbers) so they are displayed
+# exactly as they were in the output
 #
-if args.include_description or args.type_brief:
-    show_int_brief_cmd = 'show interface ' + str(intf_range) + 'description'
-    try :
-        show_int_brief_str = cli.cli(show_int_brief_cmd)
-    except :
-        print('Error issuing ' + show_int_brief_cmd + ' command...')
-        pass
-    show_int_descr_list = show_int_brief_str.splitlines()
-    max_descr_len = len('Description')
-    for line in show_int_descr_list:
-        line_toks = line.split()
-        if len(line_toks) >= 2 and line_toks[0] != 'Interface':
-            intf = line_toks[0]
+def get_table_value(var_value):
+    if var_value.isdigit() and (var_value[0] != '0' or var_value == '0'):
+        return int(var_value)
+    return var_value
+
+#
+# Get the display value of a value of the interface table
+#
+def get_display_value(var_value):
+    if var_value == None:
+        return 'NF'
+    return str(var_value)
+
+#
+# Get the counter value of a value of the interface table, None if it is not a counter
+#
+def get_counter_int(var_value):
+    if isinstance(var_value, integer_types):
+        return var_value
+    if var_value != None and var_value.isdigit():
+        return int(var_value)
+    return None
+
+#
+# Compile counter_list into an index so each output line is only compared against the
+# pattern entries that can possibly match it
+#
+# A pattern entry can only match a line with one of its token counts and whose token at the
+# position of the first match keyword is that keyword, so the index is keyed on both:
+#
+# counter_index_dict = {
+#                       number of tokens on line: [[position of first keyword, {first keyword: [compiled entry, ...]}], ...],
+#                       ...
+#                      }
+#
+# compiled entry = [entry number, [[position, match keyword], ...], variable position, column of the variable in intf_table, append]
+#
+# The variables of counter_list are added to intf_table if they are not there yet
+#
+# Entry numbers keep the counter_list order when more than one entry matches the same line
+# (e.g. the LW PID entry appends to the value set by the PID entry before it)
+#
+def compile_counter_list(counter_list, intf_table):
+    counter_index_dict = {}
+    entry_num = 0
+    for line_entry in counter_list:
+        for counter_entry in line_entry[1]:
+            entry_num += 1
+            keyword_list = []
+            var_idx = -1
+            var_name = ''
+            var_append = False
+            for idx, pattern_entry in enumerate(counter_entry[1]):
+                if pattern_entry == '.':
+                    pass
+                elif pattern_entry.startswith('%') or pattern_entry.startswith('&'):
+                    var_idx = idx
+                    var_name = pattern_entry[1:]
+                    var_append = pattern_entry.startswith('&')
+                    add_intf_table_vars(intf_table, [var_name])
+                else:
+                    keyword_list.append([idx, pattern_entry])
             #
-            # port-channels are short names: Poxxx
+            # Entries without a match keyword never match (e.g. --brief columns)
             #
-            if intf.startswith('Po'):
-                intf = 'port-channel' + intf[2:]
-            if port_type_filter and intf not in show_int_variables_dict:
+            if not keyword_list or var_idx == -1:
                 continue
-            if intf not in show_int_variables_dict:
-                show_int_variables_dict[intf] = {}
-            description = ' '.join(line_toks[1:])[:65]
-            #print('Setting show_int_variables_dict[' + intf + "]['description'] = " + description)
-            show_int_variables_dict[intf]['description'] = description
-            max_descr_len = max(max_descr_len, len(description))
-#
-# Determine NX-OS version
-# At 8.4(2) the output of the "show interface counters details" command has completely changed
+            first_pos, first_keyword = keyword_list[0]
+            compiled_entry = [entry_num, keyword_list[1:], var_idx, intf_table['var_index_dict'][var_name], var_append]
+            for tok_count in line_entry[0]:
+                if keyword_list[-1][0] >= tok_count:
+                    continue
+                position_list = counter_index_dict.setdefault(tok_count, [])
+                for position_entry in position_list:
+                    if position_entry[0] == first_pos:
+                        break
+                else:
+                    position_entry = [first_pos, {}]
+                    position_list.append(position_entry)
+                position_entry[1].setdefault(first_keyword, []).append(compiled_entry)
+    return counter_index_dict
+
 #
-ver_maj = ''
-ver_min = ''
-show_int_counter_detail_new = False
-try :
-    show_ver_str = cli.cli('show version')
-except :
-    print('Error issuing "show version" command...')
-    pass
-show_ver_list = show_ver_str.splitlines()
-for ver_entry in show_ver_list:
-    ver_entry_toks = ver_entry.split()
-    if len(ver_entry_toks) >= 3 and ver_entry_toks[0] == 'system:' and ver_entry_toks[1] == 'version':
-        version = ver_entry_toks[2]
-        ver_maj_toks = version.split('.')
-        ver_maj = ver_maj_toks[0]
-        ver_min_toks = ver_maj_toks[1].split('(')
-        ver_min = ver_min_toks[0]
-        ver_maint_toks = ver_min_toks[1].split(')')
-        ver_maint = ver_maint_toks[0]
-        #print('ver_maj: ' + ver_maj + ' ver_min: ' + ver_min + ' ver_maint: ' + ver_maint)
-        if int(ver_maj) > 8 or (int(ver_maj) == 8 and (int(ver_min) > 4 or (int(ver_min) == 4 and ver_maint >= '2'))):
-            show_int_counter_detail_new = True
-
-
-#
-# If general-stats, link-stats or congestion-stats issue show interface counters detailed command
-#
-if args.type_link_stats or args.type_congestion_stats or args.type_general_stats:
-    show_int_str = ""  
-    #print('intf_range: ' + str(intf_range))
-    #print('show interface command: ' + 'show interface ' + str(intf_range) + ' counters detail')
-    show_int_cmd = 'show interface ' + str(intf_range) + 'counters detailed'
-    try :
-        show_int_str = cli.cli(show_int_cmd)
-    except :
-        print('Error issuing ' + show_int_cmd + ' command...')
-        pass
-    
-    show_int_list = show_int_str.splitlines()
-    intf = ''
-    #
-    # Counter_list = [
-    #                [[number of tokens on line], [[Heading, [%variable_name, match keyword 1, match keyword 2, ..., match keyword n]]]],
-    #                ...
-    #                ]
-    #
-    # --link-stats
-    #
-    if args.type_link_stats:
-        type_line = 'Link Stats:'
-        link_failures_col = ['Link','Failures']
-        sync_loss_col = ['Sync', 'Loss']
-        signal_loss_col = ['Signal','Loss']
-        invalid_words_col = ['Invalid','Words']
-        invalid_crcs_col = ['Invalid','CRCs']
-        nos_rx_col = ['NOS','Rx']
-        nos_tx_col = ['NOS','Tx']
-        ols_rx_col = ['OLS','Rx']
-        ols_tx_col = ['OLS','Tx']
-        lrr_rx_col = ['LRR','Rx']
-        lrr_tx_col = ['LRR','Tx']
-        fec_corrected_col = ['FEC','Corrected']
-        fec_uncorrected_col = ['FEC','Uncorrected']
-        bb_scs_col = ['','BB_SCs']
-        bb_scr_col = ['','BB_SCr']
-        
-        if show_int_counter_detail_new:
-            counter_list = [ 
-                            [[4], [[link_failures_col, ['Rx', 'Link', 'failures:', '%intf_link_failures:']]]],
-                            [[4], [[sync_loss_col, ['Rx', 'Sync' , 'losses:', '%intf_sync_losses']]]], 
-                            [[4], [[signal_loss_col, ['Rx', 'Signal', 'losses:', '%intf_sig_loss']]]],
-                            [[5], [[invalid_words_col, ['Rx', 'Invalid', 'transmission', 'words:', '%intf_invalid_tx_words']]]],
-                            [[4], [[invalid_crcs_col, ['Rx', 'Invalid', 'CRCs:', '%intf_invalid_crcs']]]],
-                            [[4], [[nos_rx_col, ['Rx', 'Non-Operational', 'Sequences(NOS):', '%intf_nos_rx']]]],
-                            [[4], [[nos_tx_col, ['Tx', 'Non-Operational', 'Sequences(NOS):', '%intf_nos_tx']]]],
-                            [[4], [[ols_rx_col, ['Rx', 'Offline', 'Sequences(OLS):', '%intf_ols_rx']]]],
-                            [[4], [[ols_tx_col, ['Tx', 'Offline', 'Sequences(OLS):', '%intf_ols_tx']]]],
-                            [[5], [[lrr_rx_col, ['Rx', 'Link', 'Reset', 'Responses(LRR):', '%intf_lrr_rx']]]],
-                            [[5], [[lrr_tx_col, ['Tx', 'Link', 'Reset', 'Responses(LRR):', '%intf_lrr_tx']]]],
-                            [[5], [[fec_corrected_col, ['Rx', 'FEC', 'corrected', 'blocks:', '%intf_fec_corrected']]]],
-                            [[5], [[fec_uncorrected_col, ['Rx', 'FEC', 'uncorrected', 'blocks:', '%intf_fec_uncorrected']]]],
-                            [[5], [[bb_scs_col, ['BB_SCs', 'credit', 'resend', 'actions:', '%intf_bbscs']]]], 
-                            [[6], [[bb_scr_col, ['BB_SCr', 'Tx', 'credit', 'increment', 'actions:', '%intf_bbscr']]]],
-                            ]
-        
-        else:
-            counter_list = [ 
-                            [[9], [[link_failures_col, ['%intf_link_failures', 'link', 'failures,']], [sync_loss_col, ['.', '.', '.', '%intf_sync_losses', 'sync' , 'losses,']], [signal_loss_col, ['.', '.', '.', '.', '.', '.','%intf_sig_loss', 'signal', 'losses']]]],
-                            [[4], [[invalid_words_col, ['%intf_invalid_tx_words', 'invalid', 'transmission', 'words']]]],
-                            [[6], [[invalid_crcs_col, ['%intf_invalid_crcs', 'invalid', 'CRCs,']]]],
-                            [[4], [[nos_rx_col, ['%intf_nos_rx', 'non-operational', 'sequences', 'received']]]],
-                            [[4], [[nos_tx_col, ['%intf_nos_tx', 'non-operational', 'sequences', 'transmitted']]]],
-                            [[5], [[ols_rx_col, ['%intf_ols_rx', 'Offline', 'Sequence', 'errors', 'received']]]],
-                            [[5], [[ols_tx_col, ['%intf_ols_tx', 'Offline', 'Sequence', 'errors', 'transmitted']]]],
-                            [[5], [[lrr_rx_col, ['%intf_lrr_rx', 'link', 'reset', 'responses', 'received']]]],
-                            [[5], [[lrr_tx_col, ['%intf_lrr_tx', 'link', 'reset', 'responses', 'transmitted']]]],
-                            [[4], [[fec_corrected_col, ['%intf_fec_corrected', 'fec', 'corrected', 'blocks']]]],
-                            [[4], [[fec_uncorrected_col, ['%intf_fec_uncorrected', 'fec', 'uncorrected', 'blocks']]]],
-                            [[11],[[bb_scs_col, ['%intf_bbscs', 'BB_SCs', 'credit', 'resend', 'actions,']], [bb_scr_col, ['.', '.', '.', '.', '.', '%intf_bbscr', 'BB_SCr', 'Tx', 'credit', 'increment', 'actions']]]],
-                            ]
-    #       
-    # --congestion-stats
-    #
-    elif args.type_congestion_stats:
-        type_line = 'Congestion Stats:'
-        tbbz_col = ['','TBBZ']
-        rbbz_col = ['','RBBZ']
-        txwait_col = ['','TxWait']
-        txwait_1s1m1h72h_col = ['TxWait % last', '1s/1m/1h/72h']
-        timeout_discards_col = ['Timeout','Discards']
-        credit_loss_col = ['Credit','Loss']
-        active_lr_rx_col = ['Active','LR Rx']
-        active_lr_tx_col = ['Active','LR Tx']
-        lrr_rx_col = ['LRR','Rx']
-        lrr_tx_col = ['LRR','Tx']
-        if show_int_counter_detail_new:
-            counter_list = [
-                            [[7], [[tbbz_col, ['Tx',  'B2B', 'credit', 'transitions', 'to', 'zero:', '%intf_tbbz']]]],
-                            [[7], [[rbbz_col, ['Rx', 'B2B', 'credit', 'transitions', 'to', 'zero:', '%intf_rbbz']]]],
-                            [[9], [[txwait_col, ['TxWait', '2.5us', 'due', 'to', 'lack', 'of', 'transmit', 'credits:', '%intf_txwait', ]]]],
-                            [[6], [[txwait_1s1m1h72h_col, ['Percentage', 'TxWait', 'for', 'last', '1s/1m/1h/72h:', '%intf_txwait_1s1m1h72h']]]],
-                            [[8], [['&', ['Percentage', 'TxWait', 'not', 'available', 'for', 'last', '1s/1m/1h/72h:', '%intf_txwait_1s1m1h72h']]]],
-                            [[4], [[timeout_discards_col, ['Tx', 'Timeout', 'discards:', '%intf_timeout_discards']]]], 
-                            [[4], [[credit_loss_col, ['Tx', 'Credit' , 'loss:', '%intf_credit_loss']]]],
-                            [[8], [[active_lr_rx_col, ['Rx', 'Link', 'Reset(LR)', 'while', 'link', 'is', 'active:', '%intf_lr_rx_act']]]],
-                            [[8], [[active_lr_tx_col, ['Tx', 'Link', 'Reset(LR)', 'while', 'link', 'is', 'active:', '%intf_lr_tx_act']]]],
-                            [[5], [[lrr_rx_col, ['Rx', 'Link', 'Reset', 'Responses(LRR):', '%intf_lrr_rx']]]],
-                            [[5], [[lrr_tx_col, ['Tx', 'Link', 'Reset', 'Responses(LRR):', '%intf_lrr_tx']]]],
-                           ]
-        else:
-            counter_list = [
-                            [[7], [[tbbz_col, ['%intf_tbbz', 'Transmit',  'B2B', 'credit', 'transitions', 'to', 'zero']]]],
-                            [[7], [[rbbz_col, ['%intf_rbbz', 'Receive', 'B2B', 'credit', 'transitions', 'to', 'zero']]]],
-                            [[9], [[txwait_col, ['%intf_txwait', '2.5us', 'TxWait', 'due', 'to', 'lack', 'of', 'transmit', 'credits']]]],
-                            [[8], [[txwait_1s1m1h72h_col, ['Percentage', 'TxWait', 'not', 'available', 'for', 'last', '1s/1m/1h/72h:', '%intf_txwait_1s1m1h72h']]]],
-                            [[6], [[timeout_discards_col, ['%intf_timeout_discards', 'timeout', 'discards,']], [credit_loss_col, ['.', '.', '.', '%intf_credit_loss', 'credit' , 'loss']]]],
-                            [[8], [[active_lr_rx_col, ['%intf_lr_rx_act', 'link', 'reset', 'received', 'while', 'link', 'is', 'active']]]],
-                            [[8], [[active_lr_tx_col, ['%intf_lr_tx_act', 'link', 'reset', 'transmitted', 'while', 'link', 'is', 'active']]]],
-                            [[5], [[lrr_rx_col, ['%intf_lrr_rx', 'link', 'reset', 'responses', 'received']]]],
-                            [[5], [[lrr_tx_col, ['%intf_lrr_tx', 'link', 'reset', 'responses', 'transmitted']]]],
-                           ]
-    #
-    # --general-stats
-    #  
+# Get the columns of intf_table the entries of counter_index_dict set
+#
+def get_counter_column_list(counter_index_dict):
+    column_num_set = set()
+    for position_list in counter_index_dict.values():
+        for first_pos, keyword_dict in position_list:
+            for compiled_entry_list in keyword_dict.values():
+                for compiled_entry in compiled_entry_list:
+                    column_num_set.add(compiled_entry[3])
+    return sorted(column_num_set)
+
+#
+# Match one line of output against counter_index_dict and set the values of the interface in row of the
+# column_list of the interface table
+#
+# Variable names prepended with '&' in counter_list mean append to the variable's value if found
+#
+def match_counter_line(toks, counter_index_dict, column_list, row):
+    position_list = counter_index_dict.get(len(toks))
+    if position_list is None:
+        return
+    if len(position_list) == 1:
+        candidate_list = position_list[0][1].get(toks[position_list[0][0]])
+        if candidate_list is None:
+            return
     else:
-        type_line = 'General Stats:'
-        frames_rx_col = ['Frames','Rx']
-        frames_tx_col = ['Frames','Tx']
-        c3_frames_rx_col = ['C3 Frames','Rx']
-        c3_frames_tx_col = ['C3 Frames','Tx']
-        c2_frames_rx_col = ['C2 Frames','Rx']
-        c2_frames_tx_col = ['C2 Frames','Tx']
-        cf_frames_rx_col = ['CF Frames','Rx']
-        cf_frames_tx_col = ['CF Frames','Tx']
-        mcast_frames_rx_col = ['Mcast','Frames Rx']
-        mcast_frames_tx_col = ['Mcast','Frames Tx']
-        bcast_frames_rx_col = ['Bcast','Frames Rx']
-        bcast_frames_tx_col = ['Bcast','Frames Tx']
-        ucast_frames_rx_col = ['Ucast','Frames Rx']
-        ucast_frames_tx_col = ['Ucast','Frames Tx']
-        if show_int_counter_detail_new:
-            counter_list = [
-                            [[4], [[frames_rx_col, ['Rx', 'total', 'frames:', '%intf_frames_received']]]], 
-                            [[4], [[frames_tx_col, ['Tx', 'total', 'frames:', '%intf_frames_transmitted',]]]],
-                            [[4], [[c3_frames_rx_col, ['Rx', 'class-3', 'frames:', '%intf_class_3_frames_received']]]],
-                            [[4], [[c3_frames_tx_col, ['Tx', 'class-3', 'frames:', '%intf_class_3_frames_transmitted']]]],
-                            [[4], [[c2_frames_rx_col, ['Rx', 'class-2', 'frames:', '%intf_class_2_frames_received']]]],
-                            [[4], [[c2_frames_tx_col, ['Tx', 'class-2', 'frames:', '%intf_class_2_frames_transmitted']]]],
-                            [[4], [[cf_frames_rx_col, ['Rx', 'class-f', 'frames:', '%intf_class_f_frames_received']]]],
-                            [[4], [[cf_frames_tx_col, ['Tx', 'class-f', 'frames:', '%intf_class_f_frames_transmitted']]]],
-                            [[4], [[mcast_frames_rx_col, ['Rx', 'total', 'multicast:', '%intf_multicast_frames_received',]]]], 
-                            [[4], [[mcast_frames_tx_col, ['Tx', 'total', 'multicast:', '%intf_multicast_frames_transmitted']]]],
-                            [[4], [[bcast_frames_rx_col, ['Rx', 'total', 'broadcast:', '%intf_broadcast_frames_received',]]]], 
-                            [[4], [[bcast_frames_tx_col, ['Tx', 'total', 'broadcast:', '%intf_broadcast_frames_transmitted']]]],
-                            [[4], [[ucast_frames_rx_col, ['Rx', 'total', 'unicast:', '%intf_unicast_frames_received',]]]], 
-                            [[4], [[ucast_frames_tx_col, ['Tx', 'total', 'unicast:', '%intf_unicast_frames_transmitted']]]],
-                           ]
+        candidate_list = []
+        for first_pos, keyword_dict in position_list:
+            candidate_list.extend(keyword_dict.get(toks[first_pos], []))
+        candidate_list.sort()
+    for entry_num, keyword_list, var_idx, column_num, var_append in candidate_list:
+        for idx, keyword in keyword_list:
+            if toks[idx] != keyword:
+                break
         else:
-            counter_list = [
-                            [[5], [[frames_rx_col, ['%intf_frames_received', 'frames,', '.', 'bytes', 'received']]]], 
-                            [[5], [[frames_tx_col, ['%intf_frames_transmitted', 'frames,', '.', 'bytes', 'transmitted']]]],
-                            [[6], [[c3_frames_rx_col, ['%intf_class_3_frames_received', 'class-3', 'frames,', '.', 'bytes', 'received']]]],
-                            [[6], [[c3_frames_tx_col, ['%intf_class_3_frames_transmitted', 'class-3', 'frames,', '.', 'bytes', 'transmitted']]]],
-                            [[6], [[c2_frames_rx_col, ['%intf_class_2_frames_received', 'class-2', 'frames,', '.', 'bytes', 'received']]]],
-                            [[6], [[c2_frames_tx_col, ['%intf_class_2_frames_transmitted', 'class-2', 'frames,', '.', 'bytes', 'transmitted']]]],
-                            [[6], [[cf_frames_rx_col, ['%intf_class_f_frames_received', 'class-f', 'frames,', '.', 'bytes', 'received']]]],
-                            [[6], [[cf_frames_tx_col, ['%intf_class_f_frames_transmitted', 'class-f', 'frames,', '.', 'bytes', 'transmitted']]]],
-                            [[6], [[mcast_frames_rx_col, ['%intf_multicast_frames_received', 'multicast', 'packets', 'received,']], [mcast_frames_tx_col, ['.', 'multicast', 'packets', '.', '%intf_multicast_frames_transmitted', 'transmitted']]]],
-                            [[6], [[bcast_frames_rx_col, ['%intf_broadcast_frames_received', 'broadcast', 'packets', 'received,']], [bcast_frames_tx_col, ['.', 'broadcast', 'packets', '.', '%intf_broadcast_frames_transmitted', 'transmitted']]]],
-                            [[6], [[ucast_frames_rx_col, ['%intf_unicast_frames_received', 'unicast', 'packets', 'received,']], [ucast_frames_tx_col, ['.', 'unicast', 'packets', '.', '%intf_unicast_frames_transmitted', 'transmitted']]]],
-                           ]
-      
+            if not var_append:
+                if len(toks) > var_idx:
+                    var_value = toks[var_idx]
+                    #
+                    # Same as get_table_value(), inline as it is done for every counter
+                    #
+                    if var_value.isdigit() and (var_value[0] != '0' or var_value == '0'):
+                        var_value = int(var_value)
+                    column_list[column_num][row] = var_value
+                else:
+                    column_list[column_num][row] = ''
+            elif len(toks) > var_idx:
+                var_value = column_list[column_num][row]
+                if var_value != None:
+                    column_list[column_num][row] = str(var_value) + toks[var_idx]
+                else:
+                    column_list[column_num][row] = toks[var_idx]
+
+#
+# Timing of the run for --timing
+#
+# timing_dict['commands'] = [[command, 'text' or 'json', seconds, bytes, lines, status], ...] for every command issued
+# timing_dict['phases'] = {phase: seconds} for the phases in timing_phase_list
+# timing_dict['blocks_reused'] = interface blocks that were the same as in the previous sample and not parsed again
+#
+# cli is the wall time of the commands (issued at the same time unless --serial), parse is the parsing of their
+# output and building of the counter lists, build_rows is building the table rows and column widths and render
+# is printing the tables.
+#
+timing_phase_list = ['cli', 'parse', 'build_rows', 'render']
+timing_dict = {}
+
+def reset_timing(argv = None):
+    timing_dict.clear()
+    timing_dict.update({'start': time.time(), 'args': sys.argv[1:] if argv == None else argv, 'commands': [], 'phases': dict.fromkeys(timing_phase_list, 0.0), 'intfs': 0, 'rows': 0, 'blocks_reused': 0})
+
+#
+# Add the time since start to a phase, returns the current time so it can be the start of the next phase
+#
+def add_phase_time(phase, start):
+    now = time.time()
+    timing_dict['phases'][phase] += now - start
+    return now
+
+def add_command_timing(cli_cmd, use_json, seconds, output, status):
+    if isinstance(output, str):
+        timing_dict['commands'].append([cli_cmd, 'json' if use_json else 'text', seconds, len(output), 0 if use_json else output.count('\n') + 1, status])
+    else:
+        timing_dict['commands'].append([cli_cmd, 'json' if use_json else 'text', seconds, 0, 0, status])
+
+#
+# Print the --timing report
+#
+def print_timing():
+    print('Timing:')
+    print('  %-4s %9s %10s %8s %-7s %s' % ('Type', 'Seconds', 'Bytes', 'Lines', 'Status', 'Command'))
+    for cli_cmd, output_type, seconds, output_len, line_count, status in timing_dict['commands']:
+        print('  %-4s %9.3f %10d %8d %-7s %s' % (output_type, seconds, output_len, line_count, status, cli_cmd))
+    print('  %-10s %9s' % ('Phase', 'Seconds'))
+    for phase in timing_phase_list:
+        print('  %-10s %9.3f' % (phase, timing_dict['phases'][phase]))
+    print('  %-10s %9.3f' % ('total', timing_dict['total']))
+    blocks_reused = ''
+    if timing_dict['blocks_reused']:
+        blocks_reused = ', ' + str(timing_dict['blocks_reused']) + ' unchanged interface blocks not parsed again'
+    print('  ' + str(sum([command_entry[4] for command_entry in timing_dict['commands']])) + ' lines, ' + str(timing_dict['intfs']) + ' interfaces, ' + str(timing_dict['rows']) + ' rows' + blocks_reused)
+
+#
+# Write the --timing report as JSON so it can be collected and trended
+#
+def save_timing(timing_name):
+    timing_handle = open(timing_name, 'w')
+    json.dump(timing_dict, timing_handle, sort_keys = True)
+    timing_handle.write('\n')
+    timing_handle.close()
+
+#
+# Save the --profile cProfile stats and a summary of the functions with the highest cumulative time
+#
+def save_profile(profiler, profile_name):
+    profiler.dump_stats(profile_name)
+    profile_handle = open(profile_name + '.txt', 'w')
+    pstats.Stats(profiler, stream = profile_handle).sort_stats('cumulative').print_stats(40)
+    profile_handle.close()
+    print('Profile saved to "' + profile_name + '" and "' + profile_name + '.txt"')
+
+#
+# Report the --timing and save the --profile at the end of the run
+#
+def end_timing(args, profiler):
+    timing_dict['total'] = time.time() - timing_dict['start']
+    if profiler != None:
+        profiler.disable()
+        save_profile(profiler, '/bootflash/' + args.profile)
+    if args.timing == '':
+        print_timing()
+    elif args.timing != None:
+        save_timing('/bootflash/' + args.timing)
+
+reset_timing()
+
 #
-# These are the same... just different names for the same output
+# Issue a CLI command and return its output
 #
-# --transceiver-stats
-# --sfp-stats
+# On failure print the same error as before and return empty output so the remaining
+# commands are still processed
 #
-elif args.type_sfp_stats | args.type_sfp_detail_stats:
-    show_int_str = ""  
-    #print('intf_range: ' + str(intf_range))
-    #print('show interface command: ' + 'show interface ' + str(intf_range) + ' transceiver')
-    show_int_cmd = 'show interface ' + str(intf_range) + ' transceiver'
+def issue_cli(cli_cmd, cmd_name = None):
+    if cmd_name == None:
+        cmd_name = cli_cmd
+    start = time.time()
     try :
-        show_int_str = cli.cli(show_int_cmd)
+        output = cli.cli(cli_cmd)
     except :
-        print('Error issuing ' + show_int_cmd + ' command...')
-        pass
-    
-    show_int_transceiver_dict = {}
-    
-    show_int_list = show_int_str.splitlines()
-    intf = ''
-    name_col = ['','Name']
-    pid_col = ['Cisco','PID']
-    serial_col = ['Serial','Number']
-    sync_col = ['','Sync?']
-    bit_rate_col = ['Nominal','Bit Rate']
-    temp_col = ['','Temp']
-    voltage_col = ['','Voltage']
-    current_col = ['','Current']
-    txpower_col = ['Tx','Power']
-    rxpower_col = ['Rx','Power']
-    txfault_col = ['Tx','Fault']
-    if args.type_sfp_stats:
-        
-        #
-        # '&' in column header indicates no column header
-        # '&' in front of variable name indicates append to variable name
-        #
-        # Counter_list = [
-        #                [number of tokens on line, [[Heading, [%variable_name, match keyword 1, match keyword 2, ..., match keyword n]]]],
-        #                ...
-        #                ]
-        #
-        # --transceiver-stats
-        #
-        type_line = 'Transceiver(SFP) Stats:'
-        counter_list = [ 
-                        [[3], [[name_col, ['Name', 'is', '%intf_sfp_name']]]],
-                        [[4,5], [[pid_col, ['Cisco', 'pid', 'is', '%intf_sfp_pid']]]],    # LW SFPs have a space in the PID: Cisco pid is DS-SFP-FC16G-SW - Need tokens either 4 or 5 because - See CSCvz53902
-                        [[5], [['&', ['Cisco', 'pid', 'is', '.', '&intf_sfp_pid']]]],     # LW SFPs have a space in the PID: Cisco pid is DS-SFP-FC16G-SW - This line appends the 'LW'
-                        [[13,14], [[sync_col, ['.', '.', '.', '.', '.', '%intf_sfp_sync', 'sync', 'exists,']], ['&', ['.', '.', '.', '.', '.', '.','&intf_sfp_sync', 'sync', 'exists,']], ['&', ['.', '.', '.', '.', '.', '.', '&intf_sfp_sync', 'sync', 'state,']]]],
-                        [[4,5], [[temp_col, ['Temperature', ':', '%intf_sfp_temp']], ['&', ['Temperature', ':', '.', '&intf_sfp_temp']], ['&', ['Temperature', ':', '.', '.', '&intf_sfp_temp']]]],
-                        [[4,5], [[voltage_col, ['Voltage', ':', '%intf_sfp_volt']], ['&', ['Voltage', ':', '.', '&intf_sfp_volt']], ['&', ['Voltage', ':', '.', '.', '&intf_sfp_volt']]]],
-                        [[4,5], [[current_col, ['Current', ':', '%intf_sfp_curr']], ['&', ['Current', ':', '.', '&intf_sfp_curr']], ['&', ['Current', ':', '.', '.', '&intf_sfp_curr']]]],
-                        [[6,7], [[txpower_col, ['Optical', 'Tx', 'Power', ':', '%intf_sfp_tx_power']], ['&', ['Optical', 'Tx', 'Power', ':', '.', '&intf_sfp_tx_power']], ['&', ['Optical', 'Tx', 'Power', ':', '.', '.', '&intf_sfp_tx_power']]]],
-                        [[6,7], [[rxpower_col, ['Optical', 'Rx', 'Power', ':', '%intf_sfp_rx_power']], ['&', ['Optical', 'Rx', 'Power', ':', '.', '&intf_sfp_rx_power']], ['&', ['Optical', 'Rx', 'Power', ':', '.', '.', '&intf_sfp_rx_power']]]],
-                        [[5], [[txfault_col, ['Tx', 'Fault', 'count', ':', '%intf_sfp_tx_fault']]]],
-                        
-                       ]
-    
-    #
-    # --transceiver-detail-stats
-    # --sfp-detail-stats
-    #         
-    else:
-        type_line = 'Transceiver(SFP) Detail Stats:'
-        counter_list = [ 
-                        [[3], [[name_col, ['Name', 'is', '%intf_sfp_name']]]],
-                        [[4,5], [[pid_col, ['Cisco', 'pid', 'is', '%intf_sfp_pid']]]],      # LW SFPs have a space in the PID: Cisco pid is DS-SFP-FC16G-SW - Need tokens either 4 or 5 because - See CSCvz53902
-                        [[5], [['&', ['Cisco', 'pid', 'is', '.', '&intf_sfp_pid']]]],     # LW SFPs have a space in the PID: Cisco pid is DS-SFP-FC16G-SW - This line appends the 'LW'
-                        [[4], [[serial_col, ['Serial', 'number', 'is', '%intf_sfp_sn']]]],
-                        [[13,14], [[sync_col, ['.', '.', '.', '.', '.', '%intf_sfp_sync', 'sync', 'exists,']], ['&', ['.', '.', '.', '.', '.', '.','&intf_sfp_sync', 'sync', 'exists,']], ['&', ['.', '.', '.', '.', '.', '.', '&intf_sfp_sync', 'sync', 'state,']]]],
-                        [[6], [[bit_rate_col, ['Nominal', 'bit', 'rate', 'is', '%intf_sfp_brate']], ['&', ['Nominal', 'bit', 'rate', 'is', '.', '&intf_sfp_brate']]]], 
-                        [[4,5], [[temp_col, ['Temperature', ':', '%intf_sfp_temp']], ['&', ['Temperature', ':', '.', '&intf_sfp_temp']], ['&', ['Temperature', ':', '.', '.', '&intf_sfp_temp']]]],
-                        [[4,5], [[voltage_col, ['Voltage', ':', '%intf_sfp_volt']], ['&', ['Voltage', ':', '.', '&intf_sfp_volt']], ['&', ['Voltage', ':', '.', '.', '&intf_sfp_volt']]]],
-                        [[4,5], [[current_col, ['Current', ':', '%intf_sfp_curr']], ['&', ['Current', ':', '.', '&intf_sfp_curr']], ['&', ['Current', ':', '.', '.', '&intf_sfp_curr']]]],
-                        [[6,7], [[txpower_col, ['Optical', 'Tx', 'Power', ':', '%intf_sfp_tx_power']], ['&', ['Optical', 'Tx', 'Power', ':', '.', '&intf_sfp_tx_power']], ['&', ['Optical', 'Tx', 'Power', ':', '.', '.', '&intf_sfp_tx_power']]]],
-                        [[6,7], [[rxpower_col, ['Optical', 'Rx', 'Power', ':', '%intf_sfp_rx_power']], ['&', ['Optical', 'Rx', 'Power', ':', '.', '&intf_sfp_rx_power']], ['&', ['Optical', 'Rx', 'Power', ':', '.', '.', '&intf_sfp_rx_power']]]],
-                        [[5], [[txfault_col, ['Tx', 'Fault', 'count', ':', '%intf_sfp_tx_fault']]]],
-                        
-                       ]
-
-#
-# --brief-stats
-#      
-else:
-    #print('Processing --brief-stats...')
-    type_line = 'Interface Brief + Device-alias + Peer PWWN + Description:'
-
-    vsan_col = ['VSAN']
-    admin_mode_col = ['Admin','Mode']
-    admin_trunk_mode_col = ['Admin','Trunk', 'Mode']
-    status_col = ['','Status']
-    sfp_col = ['','SFP']
-    oper_mode_col = ['Oper','Mode']
-    oper_speed_col = ['Oper', 'Speed', '(Gbps)']
-    port_channel_col = ['Port', 'Channel']
-    logical_type_col = ['logical', 'Type']
-    device_alias_or_switchname_col = ['Device-alias', 'Name or', 'Switchname']
-    peer_pwwn_col = ['F Port','Peer PWWN']
-    description_col = ['','Description']
-    
-    #
-    # This will build the columnd
-    #
-    counter_list = [ 
-                     [[0],[[vsan_col,['%vsan']]]],
-                     [[0],[[admin_mode_col,['%admin_mode']]]],
-                     [[0],[[admin_trunk_mode_col,['%admin_trunk_mode']]]],
-                     [[0],[[status_col,['%status']]]],
-                     [[0],[[sfp_col,['%sfp']]]],
-                     [[0],[[oper_mode_col ,['%oper_mode']]]],
-                     [[0],[[oper_speed_col,['%oper_speed']]]],
-                     [[0],[[port_channel_col,['%port_channel']]]],
-                     [[0],[[logical_type_col,['%logical_type']]]],
-                     [[0],[[device_alias_or_switchname_col, ['%device_alias_or_switchname']]]],
-                     [[0],[[peer_pwwn_col,['%peer_pwwn']]]],
-                     [[0],[[description_col,['%description']]]],
-                    ]
+        print('Error issuing ' + cmd_name + ' command...')
+        add_command_timing(cli_cmd, False, add_phase_time('cli', start) - start, '', 'error')
+        return ''
+    add_command_timing(cli_cmd, False, add_phase_time('cli', start) - start, output, 'ok')
+    return output
 
-    
-magnatude_list = [[1000000000000, 'TB'], [1000000000, 'GB'], [1000000, 'MB'], [1000,'KB'], [0, 'B']]
+#
+# Thread to issue one CLI command for run_cli_threads()
+#
+# cli_result = [output, exception, seconds, output before it is loaded as JSON]
+#
+def issue_cli_thread(cli_cmd, use_json, cli_result):
+    start = time.time()
+    try :
+        if use_json:
+            cli_result[3] = cli.clid(cli_cmd)
+            cli_result[2] = time.time() - start
+            cli_result[0] = json.loads(cli_result[3])
+        else:
+            cli_result[0] = cli.cli(cli_cmd)
+            cli_result[2] = time.time() - start
+            cli_result[3] = cli_result[0]
+    except Exception as e:
+        cli_result[1] = e
+        cli_result[2] = time.time() - start
 
 #
-# Build column list and initialize variables in default_intf_dict to 'NF'
+# Start a thread for each command and wait for them to complete
 #
-default_intf_dict = {}
+# Returns cli_result_list = [[output, exception, seconds, output before it is loaded as JSON], ...] with output
+# None for commands that did not complete in time
 #
-# Build column_names_list
-# Build column_widths_list
-# Initialize default variable name values to 'NF' in default_intf_dict
+def run_cli_threads(cli_cmd_list, cli_timeout, serial):
+    start = time.time()
+    thread_list = []
+    for cli_cmd, use_json in cli_cmd_list:
+        cli_result = [None, None, None, None]
+        thread = threading.Thread(target=issue_cli_thread, args=(cli_cmd, use_json, cli_result))
+        thread.daemon = True
+        thread_list.append([thread, cli_result])
+        if serial:
+            thread.start()
+            thread.join(cli_timeout)
+    if not serial:
+        for thread, cli_result in thread_list:
+            thread.start()
+        deadline = time.time() + cli_timeout
+        for thread, cli_result in thread_list:
+            thread.join(max(deadline - time.time(), 0))
+    cli_result_list = []
+    for (cli_cmd, use_json), (thread, cli_result) in zip(cli_cmd_list, thread_list):
+        if thread.is_alive():
+            cli_result_list.append([None, 'timeout', None, None])
+            add_command_timing(cli_cmd, use_json, cli_timeout, None, 'timeout')
+        else:
+            cli_result_list.append(cli_result)
+            add_command_timing(cli_cmd, use_json, cli_result[2], cli_result[3], 'ok' if cli_result[1] == None else 'error')
+    add_phase_time('cli', start)
+    return cli_result_list
+
 #
-# column_name_list[0] is the first row of column headers
-# column_name_list[1] is the second row of column headers
-# column_name_list[2] is the third row of column headers (optional)
+# Issue CLI commands
 #
-column_names_list = [[''],[''], ['Intf']]
-column_widths_list = [max(len(column_names_list[0][0]),len(column_names_list[1][0]))]
-column_name_rows = 2
-for line_entry in counter_list:
-    for counter_entry in line_entry[1]:
-        column_name = counter_entry[0]
-        if column_name != '&':
-            #
-            # Assume 3 rows of columns and adjust later if less
-            #
-            if len(column_name) == 1:
-                column_names_list[0].append('')
-                column_names_list[1].append('')
-                column_names_list[2].append(column_name[0])
-                column_widths_list.append(len(column_name[0]))
-            elif len(column_name) == 2:
-                column_names_list[0].append('')
-                column_names_list[1].append(column_name[0])
-                column_names_list[2].append(column_name[1])
-                column_widths_list.append(max(len(column_name[0]), len(column_name[1])))
-            else:
-                column_name_rows = 3
-                #print('Column_name: ' + str(column_name))
-                column_names_list[0].append(column_name[0])
-                column_names_list[1].append(column_name[1])
-                column_names_list[2].append(column_name[2])
-                column_widths_list.append(max(len(column_name[0]), len(column_name[1]), len(column_name[2])))
-            for pattern_entry in counter_entry[1]:
-                if pattern_entry[0:1] == '%':
-                    var_name = pattern_entry[1:]
-                    default_intf_dict[var_name] = 'NF'
-                    #print('Setting default value for: ' + var_name + ' NF')
-                    break
-                    
+# None of the show commands depend on each other's output so they are issued at the same time, one thread each,
+# unless serial is True. Each command gets cli_timeout seconds from the time it is issued.
+#
+# cli_cmd_list = [[command, command name for error message, JSON command or '' for text output only], ...]
+#
+# The JSON command is issued first. Commands with no JSON output are then issued again for their text output,
+# also at the same time.
+#
+# Returns cli_output_dict = {(command, False): text output, (JSON command, True): JSON output}
+#
+# A command that fails or times out prints the same error as issue_cli() and returns empty output
+# A JSON command that fails or times out returns None so the caller falls back to the text output
+#
+def issue_cli_commands(cli_cmd_list, cli_timeout, serial):
+    cli_output_dict = {}
+    json_cmd_list = [cli_cmd_entry for cli_cmd_entry in cli_cmd_list if cli_cmd_entry[2] != '']
+    cli_result_list = run_cli_threads([[json_cmd, True] for cli_cmd, cmd_name, json_cmd in json_cmd_list], cli_timeout, serial)
+    text_cmd_list = [cli_cmd_entry for cli_cmd_entry in cli_cmd_list if cli_cmd_entry[2] == '']
+    for cli_cmd_entry, cli_result in zip(json_cmd_list, cli_result_list):
+        cli_output_dict[(cli_cmd_entry[2], True)] = cli_result[0]
+        if cli_result[0] == None:
+            text_cmd_list.append(cli_cmd_entry)
+    #
+    # Keep the original command order so the error messages are always in the same order
+    #
+    text_cmd_list = [cli_cmd_entry for cli_cmd_entry in cli_cmd_list if cli_cmd_entry in text_cmd_list]
+    cli_result_list = run_cli_threads([[cli_cmd, False] for cli_cmd, cmd_name, json_cmd in text_cmd_list], cli_timeout, serial)
+    for cli_cmd_entry, cli_result in zip(text_cmd_list, cli_result_list):
+        cli_cmd, cmd_name, json_cmd = cli_cmd_entry
+        if cli_result[1] != None:
+            print('Error issuing ' + cmd_name + ' command...')
+            cli_output_dict[(cli_cmd, False)] = ''
+        else:
+            cli_output_dict[(cli_cmd, False)] = cli_result[0]
+    return cli_output_dict
+
+#
+# Get the text output of a command issued by issue_cli_commands()
 #
-# If only 2 rows of column names then 
+# The text output is not issued up front if JSON output was returned, so if the JSON output could not
+# be used the command is issued now
 #
-#print('column_names_list: ' + str(column_names_list))
-if column_name_rows < 3:
-    del column_names_list[0]
-#print('column_names_list: ' + str(column_names_list))                   
+def get_cli_output(cli_output_dict, cli_cmd, cmd_name = None):
+    if (cli_cmd, False) in cli_output_dict:
+        return cli_output_dict[(cli_cmd, False)]
+    return issue_cli(cli_cmd, cmd_name)
+
+#
+# Iterate over the lines of the output of a show command
 #
-# Go through show interface counters detailed output and build show_int_variables_dict dictionary for each interface
+# The output is split a chunk of about line_chunk_len characters at a time, so only the lines of one chunk are held
+# at once instead of a list of all the lines of the output. The output can also be any iterable of lines (e.g. a
+# file or a stream that is still receiving the output), their line endings are removed.
+#
+line_chunk_len = 65536
+
+def iter_lines(output):
+    if not hasattr(output, 'splitlines'):
+        for line in output:
+            yield line.rstrip('\r\n')
+        return
+    start = 0
+    while start < len(output):
+        end = output.find('\n', start + line_chunk_len)
+        if end == -1:
+            end = len(output)
+        for line in output[start:end].splitlines():
+            yield line
+        start = end + 1
+
 #
-# For type_brief the show_int_variables_dict dictionary is already built so skip this
+# Group the lines of show interface counters detailed or transceiver output into interface blocks
 #
-# If port_type_filter is TRUE then  show_int_variables_dict has already been initialized with the filtered interfaces
+# Yields [interface line, [lines of the interface]] for each interface. Lines before the first interface are skipped.
 #
-if not args.type_brief:
-    intf = ''
-    for line in show_int_list:
-        #print('show interface detail line: ' + line)
+def iter_intf_blocks(line_iter):
+    intf_block = None
+    for line in line_iter:
         if ((line.startswith('fc') and len(line[2:].split('/')) == 2) or 
              line.startswith('port-channel') or 
              line.startswith('fcip') or 
@@ -716,272 +658,3660 @@ if not args.type_brief:
              line.startswith('vfc') or 
              line.startswith('Ethernet') or
              line.startswith('vsan')):
-            #
-            # Found interface line
-            # This only supports fc and port-channels
-            #
-            if (line.startswith('fc') and len(line[2:].split('/')) == 2) or line.startswith('port-channel'):
-                intf = line.strip().split()[0]
-                #print('show interface intf: ' + intf)
-                if not port_type_filter and intf not in show_int_variables_dict:
-                    show_int_variables_dict[intf] = {}
-                    intf_list.append(intf)
-                elif intf not in intf_list:
-                    intf = ''
-            else:
-                intf = ''
-            #
-            # Special case for when SFP not present
-            #
-            if line.endswith('sfp not present'):
-                #print('Skipping intf: ' + intf + line)
-                intf = ''
+            if intf_block != None:
+                yield intf_block
+            intf_block = [line, []]
+        elif intf_block != None:
+            intf_block[1].append(line)
+    if intf_block != None:
+        yield intf_block
 
+#
+# Get the rows of a table in JSON output
+#
+# NX-OS JSON tables are {'TABLE_<name>': {'ROW_<name>': row or [row, ...]}} and can be nested inside the rows of
+# other tables (e.g. show topology has a table of interfaces per VSAN)
+#
+def get_json_rows(json_value, table_name):
+    row_list = []
+    if isinstance(json_value, dict):
+        for key, value in json_value.items():
+            if key == 'TABLE_' + table_name:
+                if isinstance(value, dict):
+                    rows = value.get('ROW_' + table_name, [])
+                    if isinstance(rows, dict):
+                        rows = [rows]
+                    row_list.extend(rows)
+            elif isinstance(value, (dict, list)):
+                row_list.extend(get_json_rows(value, table_name))
+    elif isinstance(json_value, list):
+        for entry in json_value:
+            row_list.extend(get_json_rows(entry, table_name))
+    return row_list
+
+#
+# Determine if the new format of the "show interface counters detailed" command is used from the NX-OS version
+# At 8.4(2) the output of the "show interface counters details" command has completely changed
+#
+def check_counter_detail_new(version):
+    ver_maj_toks = version.split('.')
+    ver_maj = ver_maj_toks[0]
+    ver_min_toks = ver_maj_toks[1].split('(')
+    ver_min = ver_min_toks[0]
+    ver_maint_toks = ver_min_toks[1].split(')')
+    ver_maint = ver_maint_toks[0]
+    #print('ver_maj: ' + ver_maj + ' ver_min: ' + ver_min + ' ver_maint: ' + ver_maint)
+    if int(ver_maj) > 8 or (int(ver_maj) == 8 and (int(ver_min) > 4 or (int(ver_min) == 4 and ver_maint >= '2'))):
+        return True
+    return False
+
+#
+# Parse show version output
+#
+def parse_show_version(show_ver_str):
+    show_int_counter_detail_new = False
+    for ver_entry in iter_lines(show_ver_str):
+        ver_entry_toks = ver_entry.split()
+        if len(ver_entry_toks) >= 3 and ver_entry_toks[0] == 'system:' and ver_entry_toks[1] == 'version':
+            show_int_counter_detail_new = check_counter_detail_new(ver_entry_toks[2])
+    return show_int_counter_detail_new
+
+#
+# Parse show version JSON output
+#
+# Returns None if the version is not found
+#
+def parse_show_version_json(show_ver_json):
+    if not isinstance(show_ver_json, dict) or 'sys_ver_str' not in show_ver_json:
+        return None
+    return check_counter_detail_new(str(show_ver_json['sys_ver_str']))
+
+#
+# Variables of the columns of show interface brief after the interface
+#
+brief_fc_var_list = ['vsan', 'admin_mode', 'admin_trunk_mode', 'status', 'sfp', 'oper_mode', 'oper_speed', 'port_channel', 'logical_type']
+brief_pc_var_list = ['vsan', 'admin_trunk_mode', 'status', 'oper_mode', 'oper_speed', 'ip_addr', 'logical_type']
+
+#
+# Parse show interface brief output
+#
+# Add the interfaces of show interface brief to intf_table with their show interface brief variables
+# Build port_channel_dict to include all interfaces that make up a PC
+#
+def parse_show_int_brief(show_int_brief_str, port_type_filter, args, intf_table, intf_list, port_channel_dict):
+    for line in iter_lines(show_int_brief_str):
+        #print('show interface brief line: ' + line)
+        line_toks = line.split()
+        #if len(line_toks) >= 1:
+            #print('line_toks[0]:' + line_toks[0])
+            #print("line.startswith('fc'): " + str(line.startswith('fc')))
+            #print('split: ' + str(line_toks[0].split('/')))
+        if (line.startswith('fc') and len(line_toks[0].split('/')) == 2):
+            intf = line_toks[0]
+            if not port_type_filter or check_intf_filter(intf, line_toks[6], line_toks[9], args):
+                intf_list.append(intf)
+                set_intf_values(intf_table, intf, brief_fc_var_list, line_toks[1:10])
+                #print('Adding intf: ' + intf + ' to intf_table: oper_mode: ' + line_toks[6] + ' logical_type: ' + line_toks[9])
+                #
+                # Build port_channel_dict to include all interfaces that make up a PC
+                #
+                if line_toks[8] != '--':
+                    port_channel = 'port-channel' + line_toks[8]
+                    if port_channel not in port_channel_dict:
+                        port_channel_dict[port_channel] = []
+                    port_channel_dict[port_channel].append(intf)
+        elif line.startswith('port-channel'):
+            intf = line_toks[0]
+            if not port_type_filter or check_intf_filter(intf, line_toks[4], line_toks[7], args):
+                intf_list.append(intf)
+                set_intf_values(intf_table, intf, brief_pc_var_list + ['port_channel'], line_toks[1:8] + ['-'])
+                
+                #print('Adding intf: ' + intf + ' to intf_table: oper_mode: ' + line_toks[4] + ' logical_type: ' + line_toks[7])
+
+#
+# Parse show interface brief JSON output
+#
+# json_brief_key_list = [[JSON key, variable name], ...]
+#
+# Returns False if the expected keys are not found so the text output is used instead
+#
+def parse_show_int_brief_json(show_int_brief_json, port_type_filter, args, intf_table, intf_list, port_channel_dict):
+    json_brief_fc_key_list = [['vsan_brief', 'vsan'], ['admin_mode', 'admin_mode'], ['admin_trunk_mode', 'admin_trunk_mode'], ['status', 'status'],
+                              ['fcot_info', 'sfp'], ['oper_mode', 'oper_mode'], ['oper_speed', 'oper_speed'], ['port_channel', 'port_channel'],
+                              ['logical_type', 'logical_type']]
+    json_brief_pc_key_list = [['vsan_brief', 'vsan'], ['admin_trunk_mode', 'admin_trunk_mode'], ['status', 'status'], ['oper_mode', 'oper_mode'],
+                              ['oper_speed', 'oper_speed'], ['ip_address', 'ip_addr'], ['logical_type', 'logical_type']]
+    brief_fc_rows = get_json_rows(show_int_brief_json, 'interface_brief_fc')
+    brief_pc_rows = get_json_rows(show_int_brief_json, 'interface_brief_portchannel')
+    if not brief_fc_rows and not brief_pc_rows:
+        return False
+    for row in brief_fc_rows:
+        if 'interface_fc' not in row or [key for key, var_name in json_brief_fc_key_list if key not in row]:
+            return False
+    for row in brief_pc_rows:
+        if 'interface_port_channel' not in row or [key for key, var_name in json_brief_pc_key_list if key not in row]:
+            return False
+    for row in brief_fc_rows:
+        intf = str(row['interface_fc'])
+        if not port_type_filter or check_intf_filter(intf, str(row['oper_mode']), str(row['logical_type']), args):
+            intf_list.append(intf)
+            set_intf_values(intf_table, intf, [var_name for key, var_name in json_brief_fc_key_list], [str(row[key]) for key, var_name in json_brief_fc_key_list])
+            if str(row['port_channel']) != '--':
+                port_channel = 'port-channel' + str(row['port_channel'])
+                if port_channel not in port_channel_dict:
+                    port_channel_dict[port_channel] = []
+                port_channel_dict[port_channel].append(intf)
+    for row in brief_pc_rows:
+        intf = str(row['interface_port_channel'])
+        if not port_type_filter or check_intf_filter(intf, str(row['oper_mode']), str(row['logical_type']), args):
+            intf_list.append(intf)
+            set_intf_values(intf_table, intf, [var_name for key, var_name in json_brief_pc_key_list] + ['port_channel'], [str(row[key]) for key, var_name in json_brief_pc_key_list] + ['-'])
+    return True
+
+#
+# Set the adjacent switchname of an interface and, for port-channels, of all its members
+#
+def set_adjacent_switchname(intf, switchname, intf_table, port_channel_dict, port_channels_found_dict):
+    if intf in intf_table['intf_index_dict']:
+        set_intf_value(intf_table, intf, 'device_alias_or_switchname', switchname)
+    if intf in port_channel_dict:
+        if intf not in port_channels_found_dict:
+            port_channels_found_dict[intf] = True                    
+            for member_intf in port_channel_dict[intf]:
+                if intf in intf_table['intf_index_dict']:
+                    set_intf_value(intf_table, member_intf, 'device_alias_or_switchname', switchname)
+                    #print('setting ' + member_intf + " 'device_alias_or_switchname' = " + switchname)
+
+#
+# Set the adjacent switchnames found in show topology
+#
+# topology_list = [[intf, switchname], ...]
+#
+def set_topology(topology_list, intf_table, port_channel_dict):
+    port_channels_found_dict = {}
+    for intf, switchname in topology_list:
+        set_adjacent_switchname(intf, switchname, intf_table, port_channel_dict, port_channels_found_dict)
+
+#
+# Parse show topology output to determine adjacent switchname
+#
+# Returns topology_list = [[intf, switchname], ...]
+#
+def parse_show_topology(show_topo_str):
+    topology_list = []
+    #
+    # Go through show topology... don't care about VSANs
+    #
+    for line in iter_lines(show_topo_str):
+        topo_toks = line.split()
+        if len(topo_toks) > 0 and (topo_toks[0].startswith('fc') or topo_toks[0].startswith('port-channel') or topo_toks[0].startswith('vfc')):
+            intf = topo_toks[0]
+            switchname = line.split('(')[2][:-1]
+            topology_list.append([intf, switchname])
+    return topology_list
+
+#
+# Parse show topology JSON output
+#
+# Returns topology_list or None if the expected keys are not found so the text output is used instead
+#
+def parse_show_topology_json(show_topo_json):
+    topo_rows = get_json_rows(show_topo_json, 'topology')
+    if not isinstance(show_topo_json, dict) or [row for row in topo_rows if 'interface' not in row or 'switch_name' not in row]:
+        return None
+    return [[str(row['interface']), str(row['switch_name'])] for row in topo_rows]
+
+#
+# Set the peer PWWNs and device-aliases found in show flogi database
+#
+# flogi_list = [[intf, pwwn, device-alias or ''], ...]
+#
+# Set the following variables of the interfaces in intf_table:
+#
+# 'peer_pwwn' = Peer PWWN
+# 'device_alias_or_switchname' = device-alias name (if any)
+#
+def set_flogi(flogi_list, intf_table):
+    for intf, pwwn, device_alias in flogi_list:
+        if intf not in intf_table['intf_index_dict']:
+            continue
+        if get_intf_value(intf_table, intf, 'peer_pwwn') == None:
+            set_intf_value(intf_table, intf, 'peer_pwwn', pwwn)
+        if device_alias != '' and get_intf_value(intf_table, intf, 'device_alias_or_switchname') == None:
+            #print('Setting ' + intf + " 'device_alias_or_switchname' = " + device_alias)
+            set_intf_value(intf_table, intf, 'device_alias_or_switchname', device_alias)
+
+#
+# Parse show flogi database | i \[ p 1 output
+#
+# The device-alias line follows the line of its FLOGI. The full show flogi database output (used with the
+# device-alias index) is parsed the same way, its heading and total lines are skipped.
+#
+# Returns flogi_list = [[intf, pwwn, device-alias or ''], ...]
+#
+def parse_show_flogi_database(show_flogi_database_str):
+    flogi_list = []
+    for line in iter_lines(show_flogi_database_str):
+        fd_toks = line.split()
+        if not fd_toks:
+            continue
+        if fd_toks[0].startswith('fc') or  fd_toks[0].startswith('port-channel'):
+            flogi_list.append([fd_toks[0], fd_toks[3], ''])
+        elif fd_toks[0][0] == '[' and flogi_list and flogi_list[-1][2] == '':
+            flogi_list[-1][2] = fd_toks[0][1:-1]
+    return flogi_list
+
+#
+# Parse show flogi database JSON output
+#
+# The device-alias is only in the JSON output when one is defined, so the rows must at least have the
+# device_alias key to be used instead of the text output. With check_device_alias False (the device-aliases
+# come from the device-alias index) only the interface and PWWN are needed.
+#
+# Returns flogi_list or None if the expected keys are not found so the text output is used instead
+#
+def parse_show_flogi_database_json(show_flogi_database_json, check_device_alias = True):
+    flogi_rows = get_json_rows(show_flogi_database_json, 'flogi_entry')
+    if not isinstance(show_flogi_database_json, dict) or [row for row in flogi_rows if 'interface' not in row or 'port_name' not in row]:
+        return None
+    if check_device_alias and flogi_rows and not [row for row in flogi_rows if 'device_alias' in row]:
+        return None
+    return [[str(row['interface']), str(row['port_name']), str(row.get('device_alias') or '')] for row in flogi_rows]
+
+#
+# Set the description of an interface
+#
+# port-channels are short names: Poxxx
+#
+# Returns the length of the description or 0 if not set
+#
+def set_intf_description(intf, description, port_type_filter, intf_table):
+    if intf.startswith('Po'):
+        intf = 'port-channel' + intf[2:]
+    if port_type_filter and intf not in intf_table['intf_index_dict']:
+        return 0
+    description = description[:65]
+    #print('Setting ' + intf + " 'description' = " + description)
+    set_intf_value(intf_table, intf, 'description', description)
+    return len(description)
+
+#
+# Set the descriptions found in show interface description
+#
+# description_list = [[intf, description], ...]
+#
+# Set the following variable of the interfaces in intf_table:
+# 'description' = first 64 bytes of switchport description
+#
+# Returns the maximum description length
+#
+def set_descriptions(description_list, port_type_filter, intf_table):
+    max_descr_len = len('Description')
+    for intf, description in description_list:
+        descr_len = set_intf_description(intf, description, port_type_filter, intf_table)
+        max_descr_len = max(max_descr_len, descr_len)
+    return max_descr_len
+
+#
+# Parse show interface description output
+#
+# Returns description_list = [[intf, description], ...]
+#
+def parse_show_int_description(show_int_descr_str):
+    description_list = []
+    for line in iter_lines(show_int_descr_str):
+        line_toks = line.split()
+        if len(line_toks) >= 2 and line_toks[0] != 'Interface':
+            description_list.append([line_toks[0], ' '.join(line_toks[1:])])
+    return description_list
+
+#
+# Parse show interface description JSON output
+#
+# Returns description_list or None if the expected keys are not found so the text output is used instead
+#
+def parse_show_int_description_json(show_int_descr_json):
+    descr_rows = get_json_rows(show_int_descr_json, 'interface')
+    if not descr_rows or [row for row in descr_rows if 'interface' not in row]:
+        return None
+    description_list = []
+    for row in descr_rows:
         #
-        # Process non interface name line
-        #
-        elif intf in show_int_variables_dict:
-            toks = line.split()
-            for line_entry in counter_list:
-                #
-                # Check if length matches
-                #
-                # print('intf: ' + intf + ' len(toks): ' + str(len(toks)) + ' line_entry[1]: ' + str(line_entry[1]) + ' line: ' + line)
-                #
-                # Allow two counts of tokens for '-' Warning and '--' Alarm which may or may not be present
-                #            
-                if len(toks) == line_entry[0][0] or (len(line_entry[0]) == 2 and len(toks) == line_entry[0][1]):
-                    #
-                    # Go through each pattern entry
-                    #
-                    idx = 0
-    
-                    for counter_entry in line_entry[1]:
-                        idx = 0
-                        #print('intf: ' + intf + ' counter_entry: ' + str(counter_entry))
-                        pattern_match = False
-                        for pattern_entry in counter_entry[1]:
-                            #if len(toks) >= idx:
-                            #    continue
-                            #print('intf: ' + intf + ' toks[' + str(idx) + ']: "' + toks[idx] + '" pattern_entry: "' + str(pattern_entry) + '"')
-                            if pattern_entry == '.':
-                                pass
-                            elif pattern_entry.startswith('%'):
-                                var_name = pattern_entry[1:]
-                                #print('Found var_name: ' + '%' + var_name)
-                                if len(toks) > idx:
-                                    var_value = toks[idx]
-                                    #print('Found var_value: ' + var_value)
-                                else:
-                                    var_value = ''
-                                #pattern_match = False
-                            #
-                            # Variable names prepended with '&' means append to variable var_value if not 'NF'
-                            #
-                            elif pattern_entry.startswith('&'):
-                                var_name = pattern_entry[1:]
-                                #print('Found var_name: ' + '&' + var_name)
-                                if len(toks) > idx:
-                                    if var_name in show_int_variables_dict[intf]:
-                                        var_value = show_int_variables_dict[intf][var_name]
-                                    else:
-                                        var_value = ''
-                                    if var_value != 'NF':
-                                        var_value = var_value + toks[idx]
-                                    else:
-                                        var_value = toks[idx]
-                                    #print('Found var_value: ' + var_value)
-                                #pattern_match = False
-                            elif toks[idx] == pattern_entry:
-                                #print('Found matching pattern entry: ' + pattern_entry)
-                                pattern_match = True
-                            else:
-                                pattern_match = False
-                                #print('Found non matching pattern entry: ' + pattern_entry + ' toks[' + str(idx) + ']: ' + toks[idx])
-                                break
-                            idx += 1
-                        #
-                        # If matching update dictionary
-                        #
-                        if pattern_match:
-                            show_int_variables_dict[intf][var_name] = var_value
-                            #print('Setting show_int_variables_dict[' + intf + '][' + var_name + ']: ' + show_int_variables_dict[intf][var_name]) 
-                        
-#print('show_int_variables_dict keys: ' + str(show_int_variables_dict.keys()))
-if show_int_variables_dict:
-    #
-    # Build table
-    #
-    # Initialize table with the two column headings
-    #
-    # For each counter, find pattern and set key name and values
-    # Append each variable value to col_values
-    # Once interface is completely processes add the row to the table
-    #
-    #output_table_list = [column_names_list[0],column_names_list[1]]
-    output_table_list = []
-    column_number_list = range(0,len(column_names_list[0]))
-    #
-    # Set columns to left justified
-    #	
-    #
-    # Build each row in table
-    #
-    for intf in intf_list:
-        #print('show_int_variables_dict[' + intf + ']: ' + str(show_int_variables_dict[intf]))
-        col_values = [intf]
-        intf_non_zero_count_found = False
-        #
-        # Build column values list
+        # Same as the text output: interfaces without a description are shown as '--'
         #
-        for line_entry in counter_list:
-            for counter_entry in line_entry[1]:
-                column_name = counter_entry[0]
-                #column_name_list.append(column_name)
-                if column_name == '&':
-                    continue
-                #print('counter_entry[1]: ' + str(counter_entry[1]))
+        description = ' '.join(str(row.get('description', '--')).split())
+        if description == '':
+            description = '--'
+        description_list.append([str(row['interface']), description])
+    return description_list
+
+#
+# Keep only the interfaces of intf_list that match where_function, the compiled --where predicate, in their order
+#
+def filter_where_intfs(where_function, intf_table, intf_list):
+    column_list = intf_table['column_list']
+    intf_index_dict = intf_table['intf_index_dict']
+    intf_list[:] = [intf for intf in intf_list if where_function(column_list, intf_index_dict[intf])]
+
+#
+# Check if an interface line in show interface counters detailed or transceiver output starts a new interface
+#
+# Returns the interface that the following lines belong to or '' if they should be skipped
+#
+def get_counter_intf(line, port_type_filter, intf_table, intf_list):
+    #
+    # Found interface line
+    # This only supports fc and port-channels
+    #
+    if (line.startswith('fc') and len(line[2:].split('/')) == 2) or line.startswith('port-channel'):
+        intf = line.strip().split()[0]
+        #print('show interface intf: ' + intf)
+        #
+        # The interface may already be in intf_table from show interface description
+        #
+        if not port_type_filter and intf not in intf_list:
+            add_intf_table_row(intf_table, intf)
+            intf_list.append(intf)
+        elif intf not in intf_list:
+            intf = ''
+    else:
+        intf = ''
+    return intf
+
+#
+# Go through show interface counters detailed or transceiver output and set the variables of each interface in intf_table
+#
+# The output is parsed an interface block at a time: lines -> interface blocks -> counter_list patterns -> the row of
+# the interface in intf_table. show_int_output is the output or an iterable of its lines.
+#
+# If port_type_filter is TRUE then intf_table and intf_list have already been initialized with the filtered interfaces
+#
+# When the same command is parsed sample after sample (watch mode, the exporter), block_cache_dict keeps the values
+# each interface block set with a fingerprint of the block, {intf: [fingerprint, [[column, value], ...]]}. A block
+# with the same fingerprint as in the previous sample gets those values without being matched again, so only the
+# blocks that changed (e.g. not the idle, admin down or SFP-less ports) are parsed. The fingerprint is the hash() of
+# the lines of the block.
+#
+def parse_show_int_counters(show_int_output, counter_index_dict, port_type_filter, intf_table, intf_list, block_cache_dict = None):
+    column_list = intf_table['column_list']
+    if block_cache_dict != None:
+        counter_column_list = get_counter_column_list(counter_index_dict)
+    for intf_line, line_list in iter_intf_blocks(iter_lines(show_int_output)):
+        #print('show interface detail line: ' + intf_line)
+        intf = get_counter_intf(intf_line, port_type_filter, intf_table, intf_list)
+        row = intf_table['intf_index_dict'].get(intf)
+        if row == None:
+            continue
+        #
+        # Special case for when SFP not present: the interface has no values
+        #
+        if intf_line.endswith('sfp not present'):
+            #print('Skipping intf: ' + intf + intf_line)
+            line_list = []
+        if block_cache_dict == None:
+            for line in line_list:
+                match_counter_line(line.split(), counter_index_dict, column_list, row)
+        else:
+            fingerprint = hash(tuple(line_list))
+            cache_entry = block_cache_dict.get(intf)
+            if cache_entry != None and cache_entry[0] == fingerprint:
+                for column_num, var_value in cache_entry[1]:
+                    column_list[column_num][row] = var_value
+                timing_dict['blocks_reused'] += 1
+            else:
+                prev_value_list = [column_list[column_num][row] for column_num in counter_column_list]
+                for line in line_list:
+                    match_counter_line(line.split(), counter_index_dict, column_list, row)
+                block_cache_dict[intf] = [fingerprint, [[column_num, column_list[column_num][row]] for column_num, prev_value in zip(counter_column_list, prev_value_list)
+                                                        if column_list[column_num][row] is not prev_value]]
+
+#
+# Variables in show interface counters detailed JSON output
+#
+# json_counter_key_dict = {
+#                          variable name: [JSON key, ...],
+#                          ...
+#                         }
+#
+# More than one JSON key is joined together as a percentage list (e.g. 0%/0%/0%/0%)
+#
+json_counter_key_dict = {
+    'intf_frames_received': ['rx_total_frames'],
+    'intf_frames_transmitted': ['tx_total_frames'],
+    'intf_class_3_frames_received': ['rx_class3_frames'],
+    'intf_class_3_frames_transmitted': ['tx_class3_frames'],
+    'intf_class_2_frames_received': ['rx_class2_frames'],
+    'intf_class_2_frames_transmitted': ['tx_class2_frames'],
+    'intf_class_f_frames_received': ['rx_classf_frames'],
+    'intf_class_f_frames_transmitted': ['tx_classf_frames'],
+    'intf_multicast_frames_received': ['rx_total_multicast'],
+    'intf_multicast_frames_transmitted': ['tx_total_multicast'],
+    'intf_broadcast_frames_received': ['rx_total_broadcast'],
+    'intf_broadcast_frames_transmitted': ['tx_total_broadcast'],
+    'intf_unicast_frames_received': ['rx_total_unicast'],
+    'intf_unicast_frames_transmitted': ['tx_total_unicast'],
+    'intf_link_failures': ['rx_link_failures'],
+    'intf_sync_losses': ['rx_sync_losses'],
+    'intf_sig_loss': ['rx_signal_losses'],
+    'intf_invalid_tx_words': ['rx_invalid_tx_words'],
+    'intf_invalid_crcs': ['rx_invalid_crcs'],
+    'intf_nos_rx': ['rx_nos'],
+    'intf_nos_tx': ['tx_nos'],
+    'intf_ols_rx': ['rx_ols'],
+    'intf_ols_tx': ['tx_ols'],
+    'intf_lrr_rx': ['rx_lrr'],
+    'intf_lrr_tx': ['tx_lrr'],
+    'intf_fec_corrected': ['rx_fec_corrected_blocks'],
+    'intf_fec_uncorrected': ['rx_fec_uncorrected_blocks'],
+    'intf_bbscs': ['bb_scs_credit_resend_actions'],
+    'intf_bbscr': ['bb_scr_tx_credit_increment_actions'],
+    'intf_tbbz': ['tx_b2b_credit_to_zero'],
+    'intf_rbbz': ['rx_b2b_credit_to_zero'],
+    'intf_txwait': ['tx_wait_unavailable_transmit_credits'],
+    'intf_txwait_1s1m1h72h': ['txwait_1s', 'txwait_1m', 'txwait_1h', 'txwait_72h'],
+    'intf_timeout_discards': ['tx_timeout_discards'],
+    'intf_credit_loss': ['tx_credit_loss'],
+    'intf_lr_rx_act': ['rx_link_reset_while_link_active'],
+    'intf_lr_tx_act': ['tx_link_reset_while_link_active'],
+}
+
+#
+# Parse show interface counters detailed JSON output
+#
+# Every variable in default_intf_dict must be found for the JSON output to be used, otherwise
+# returns False so the text output is used instead
+#
+def parse_show_int_counters_json(show_int_json, default_intf_dict, port_type_filter, intf_table, intf_list):
+    counter_rows = get_json_rows(show_int_json, 'interface')
+    if not counter_rows:
+        return False
+    for var_name in default_intf_dict:
+        if var_name not in json_counter_key_dict:
+            return False
+        for key in json_counter_key_dict[var_name]:
+            if not [row for row in counter_rows if key in row]:
+                return False
+    for row in counter_rows:
+        if 'interface' not in row:
+            continue
+        intf = get_counter_intf(str(row['interface']), port_type_filter, intf_table, intf_list)
+        if intf == '':
+            continue
+        for var_name in default_intf_dict:
+            key_list = json_counter_key_dict[var_name]
+            if [key for key in key_list if key not in row]:
+                continue
+            if len(key_list) == 1:
+                set_intf_value(intf_table, intf, var_name, get_table_value(str(row[key_list[0]])))
+            else:
+                set_intf_value(intf_table, intf, var_name, '/'.join([str(row[key]).rstrip('%') + '%' for key in key_list]))
+    return True
+
+#
+# Parse the output of one show interface counters or transceiver command into its own interface table
+#
+# Run in the processes of the parse pool, chunk_args = [output, counter_index_dict, var_list of the interface table]
+#
+# Returns chunk_table, chunk_intf_list
+#
+def parse_show_int_counters_chunk(chunk_args):
+    show_int_output, counter_index_dict, var_list = chunk_args
+    chunk_table = create_intf_table(var_list)
+    chunk_intf_list = []
+    parse_show_int_counters(show_int_output, counter_index_dict, False, chunk_table, chunk_intf_list)
+    return chunk_table, chunk_intf_list
+
+#
+# Merge the interfaces parsed by parse_show_int_counters_chunk() into intf_table and intf_list
+#
+# The same as parsing the output into intf_table: if port_type_filter is TRUE only the interfaces already in
+# intf_list are kept, otherwise new interfaces are added to the end of intf_list.
+#
+def merge_intf_table(intf_table, intf_list, chunk_table, chunk_intf_list, port_type_filter):
+    add_intf_table_vars(intf_table, chunk_table['var_list'])
+    column_pair_list = [[chunk_column, intf_table['column_list'][intf_table['var_index_dict'][var_name]]]
+                        for var_name, chunk_column in zip(chunk_table['var_list'], chunk_table['column_list'])]
+    for intf in chunk_intf_list:
+        if intf not in intf_list:
+            if port_type_filter:
+                continue
+            intf_list.append(intf)
+        chunk_row = chunk_table['intf_index_dict'][intf]
+        row = add_intf_table_row(intf_table, intf)
+        for chunk_column, column in column_pair_list:
+            if chunk_column[chunk_row] != None:
+                column[row] = chunk_column[chunk_row]
+
+#
+# Parse the text outputs of several commands at the same time in a pool of processes
+#
+# The pool is only used when there is more than one output and the outputs are at least parse_pool_min_len
+# characters, as starting the processes takes longer than parsing small outputs
+#
+# Returns {command: [chunk_table, chunk_intf_list]}, empty if the outputs are parsed in this process
+#
+parse_pool_min_len = 1000000
+
+def parse_show_int_counters_pool(cli_output_dict, show_int_cmd_list, counter_index_dict, intf_table, parse_processes):
+    show_int_cmd_list = [show_int_cmd for show_int_cmd, cmd_name, show_int_json_cmd in show_int_cmd_list
+                         if cli_output_dict.get((show_int_json_cmd, True)) == None and (show_int_cmd, False) in cli_output_dict]
+    output_list = [cli_output_dict[(show_int_cmd, False)] for show_int_cmd in show_int_cmd_list]
+    if multiprocessing == None or parse_processes < 2 or len(output_list) < 2 or sum([len(output) for output in output_list]) < parse_pool_min_len:
+        return {}
+    try :
+        pool = multiprocessing.Pool(min(parse_processes, len(output_list)))
+    except Exception:
+        return {}
+    try :
+        chunk_result_list = pool.map(parse_show_int_counters_chunk, [[output, counter_index_dict, intf_table['var_list']] for output in output_list])
+    finally:
+        pool.terminate()
+        pool.join()
+    return dict(zip(show_int_cmd_list, chunk_result_list))
+
+#
+# Parse the output of the show interface counters or transceiver commands in show_int_cmd_list
+#
+# show_int_cmd_list = [[command, command name for error message, JSON command or ''], ...] as issued by issue_cli_commands()
+#
+# The outputs are added to intf_table and intf_list in the order of show_int_cmd_list. With parse_processes more than
+# 1 the text outputs may be parsed in a pool of processes.
+#
+# where_function is the compiled --where predicate or None. It is checked once all the outputs are in intf_table, as
+# the variables of an interface may come from more than one output (e.g. --columns of counters and transceiver
+# variables), and the interfaces that do not match are removed from intf_list.
+#
+# block_cache_dict = {command: block_cache_dict of parse_show_int_counters()} keeps the parsed interface blocks of
+# each command from one sample to the next, or None. The outputs are not parsed in the pool when it is used.
+#
+def parse_show_int_counters_outputs(cli_output_dict, show_int_cmd_list, counter_index_dict, default_intf_dict, port_type_filter, intf_table, intf_list, parse_processes = 1, where_function = None, block_cache_dict = None):
+    if block_cache_dict != None:
+        parse_processes = 1
+    chunk_result_dict = parse_show_int_counters_pool(cli_output_dict, show_int_cmd_list, counter_index_dict, intf_table, parse_processes)
+    for show_int_cmd, cmd_name, show_int_json_cmd in show_int_cmd_list:
+        show_int_json = cli_output_dict.get((show_int_json_cmd, True))
+        if show_int_json != None and parse_show_int_counters_json(show_int_json, default_intf_dict, port_type_filter, intf_table, intf_list):
+            continue
+        if show_int_cmd in chunk_result_dict:
+            chunk_table, chunk_intf_list = chunk_result_dict[show_int_cmd]
+            merge_intf_table(intf_table, intf_list, chunk_table, chunk_intf_list, port_type_filter)
+        elif block_cache_dict != None:
+            parse_show_int_counters(get_cli_output(cli_output_dict, show_int_cmd), counter_index_dict, port_type_filter, intf_table, intf_list, block_cache_dict.setdefault(show_int_cmd, {}))
+        else:
+            parse_show_int_counters(get_cli_output(cli_output_dict, show_int_cmd), counter_index_dict, port_type_filter, intf_table, intf_list)
+    if where_function != None:
+        filter_where_intfs(where_function, intf_table, intf_list)
+
+#
+# Get the cli_cmd_list entry of the show interface counters or transceiver command for an interface range
+#
+# The transceiver values include units and alarm flags that are only in the text output
+#
+def get_show_int_cmd_entry(show_int_cmd_format, intf_range, args):
+    show_int_cmd = show_int_cmd_format.format(intf_range)
+    if show_int_cmd.endswith(' transceiver') or not args.use_json:
+        return [show_int_cmd, show_int_cmd, '']
+    return [show_int_cmd, show_int_cmd, show_int_cmd]
+
+#
+# Build compact interface ranges for the interfaces in intf_list, e.g. fc1/1-4,fc1/7,port-channel10
+#
+# Consecutive ports of a module are merged into one range. The ranges are split so no range string
+# is longer than max_intf_range_len and each range string can be used in its own command.
+#
+max_intf_range_len = 400
+
+def build_intf_range_list(intf_list):
+    port_range_list = []
+    for intf in intf_list:
+        intf_toks = intf.rsplit('/', 1)
+        if len(intf_toks) == 2 and intf_toks[1].isdigit():
+            port = int(intf_toks[1])
+            if port_range_list and port_range_list[-1][0] == intf_toks[0] and port_range_list[-1][2] == port - 1:
+                port_range_list[-1][2] = port
+            else:
+                port_range_list.append([intf_toks[0], port, port])
+        else:
+            port_range_list.append([intf, None, None])
+    intf_range_list = []
+    for intf_prefix, first_port, last_port in port_range_list:
+        if first_port == None:
+            intf_range = intf_prefix
+        elif first_port == last_port:
+            intf_range = intf_prefix + '/' + str(first_port)
+        else:
+            intf_range = intf_prefix + '/' + str(first_port) + '-' + str(last_port)
+        if intf_range_list and len(intf_range_list[-1]) + 1 + len(intf_range) <= max_intf_range_len:
+            intf_range_list[-1] += ',' + intf_range
+        else:
+            intf_range_list.append(intf_range)
+    return intf_range_list
+
+#
+# Sort key of a module, e.g. ['fc', 2] for fc2. The interfaces without a module ('') sort last.
+#
+def get_module_sort_key(module):
+    module_prefix = module.rstrip('0123456789')
+    if module == '':
+        return [1, '', 0]
+    if module_prefix == module:
+        return [0, module, 0]
+    return [0, module_prefix, int(module[len(module_prefix):])]
+
+#
+# Build the interface ranges of each module for --per-module, e.g. fc1/1-48, fc2/1-48, port-channel1,port-channel10
+#
+# The interfaces (or the entries of an interface range) are grouped by module, the part of the name before the last
+# '/'. Interfaces without a module (port-channels) are one more group. The groups are in the order the switch displays
+# the interfaces, fc1 before fc2 before fc10 and the port-channels last, so the merged outputs are in the same order
+# as the output of one command. A group is only split if its range is longer than max_intf_range_len.
+#
+def build_module_range_list(intf_list):
+    module_list = []
+    module_intf_dict = {}
+    for intf in intf_list:
+        module = intf.rsplit('/', 1)[0] if '/' in intf else ''
+        if module not in module_intf_dict:
+            module_intf_dict[module] = []
+            module_list.append(module)
+        module_intf_dict[module].append(intf)
+    module_range_list = []
+    for module in sorted(module_list, key = get_module_sort_key):
+        module_range_list.extend(build_intf_range_list(module_intf_dict[module]))
+    return module_range_list
+
+#
+# Get the number of CPUs, the default of --parse-processes
+#
+def get_cpu_count():
+    try :
+        return multiprocessing.cpu_count()
+    except (AttributeError, NotImplementedError):
+        return 1
+
+#
+# Build column list and initialize variables in default_intf_dict to 'NF'
+#
+# Returns column_names_list, column_widths_list, default_intf_dict
+#
+def build_columns(counter_list):
+    default_intf_dict = {}
+    #
+    # Build column_names_list
+    # Build column_widths_list
+    # Initialize default variable name values to 'NF' in default_intf_dict
+    #
+    # column_name_list[0] is the first row of column headers
+    # column_name_list[1] is the second row of column headers
+    # column_name_list[2] is the third row of column headers (optional)
+    #
+    column_names_list = [[''],[''], ['Intf']]
+    column_widths_list = [max(len(column_names_list[0][0]),len(column_names_list[1][0]),len(column_names_list[2][0]))]
+    column_name_rows = 2
+    for line_entry in counter_list:
+        for counter_entry in line_entry[1]:
+            column_name = counter_entry[0]
+            if column_name != '&':
+                #
+                # Assume 3 rows of columns and adjust later if less
+                #
+                if len(column_name) == 1:
+                    column_names_list[0].append('')
+                    column_names_list[1].append('')
+                    column_names_list[2].append(column_name[0])
+                    column_widths_list.append(len(column_name[0]))
+                elif len(column_name) == 2:
+                    column_names_list[0].append('')
+                    column_names_list[1].append(column_name[0])
+                    column_names_list[2].append(column_name[1])
+                    column_widths_list.append(max(len(column_name[0]), len(column_name[1])))
+                else:
+                    column_name_rows = 3
+                    #print('Column_name: ' + str(column_name))
+                    column_names_list[0].append(column_name[0])
+                    column_names_list[1].append(column_name[1])
+                    column_names_list[2].append(column_name[2])
+                    column_widths_list.append(max(len(column_name[0]), len(column_name[1]), len(column_name[2])))
                 for pattern_entry in counter_entry[1]:
                     if pattern_entry[0:1] == '%':
                         var_name = pattern_entry[1:]
-                        if intf not in show_int_variables_dict:
-                            print('Intf: ' + intf + ' not in show_int_variables_dict')
-                        if var_name not in show_int_variables_dict[intf]:
-                            show_int_variables_dict[intf][var_name] = 'NF'
-                            #print('Setting ' + var_name + ' to default NF')
-                        var_value = show_int_variables_dict[intf][var_name]
-                        #print('Intf: ' + intf + ' var_name: ' + var_name + ' var_value: ' + var_value)
-                        col_values.append(var_value)
-                        #
-                        # The check for if a value is an "error" is different for sfp stats
-                        #
-                        # Three checks
-                        # 1 - var_value is not equal to 'NF'
-                        # 2 - var_value contains a decimal point '.' and there is a trailing '-' or '+'
-                        # 3 - var_value is a decimal integer that is not zero
-                        # 4 - var_value is not 0%/0%/0%/0%
-                        #
-                        if args.type_sfp_stats or args.type_sfp_detail_stats:
-                            if var_value != 'NF' and ((var_value.find('.') != -1 and (var_value[-1:] == '-' or var_value[-1:] == '+')) or (var_value.isdigit() and var_value != '0')):
-                                intf_non_zero_count_found = True
-                        elif show_int_variables_dict[intf][var_name] != '0' and show_int_variables_dict[intf][var_name] != 'NF' and show_int_variables_dict[intf][var_name] != '0%/0%/0%/0%':
-                            intf_non_zero_count_found = True
+                        default_intf_dict[var_name] = 'NF'
+                        #print('Setting default value for: ' + var_name + ' NF')
                         break
-        if not args.filter_errorsonly or (args.filter_errorsonly and intf_non_zero_count_found):
-            output_table_list.append(col_values)
-            #
-            # Update column_widths_list with maximum length of each variable in that new column
-            #
-            for column_num in column_number_list:
-                #print('column_widths_list[column_num]: ' + str(column_widths_list[column_num]) + ' col_values[column_num]: ' + str(len(col_values[column_num])))
-                column_widths_list[column_num] = max(column_widths_list[column_num], len(col_values[column_num]))
-            
+                    
+    #
+    # If only 2 rows of column names then 
+    #
+    #print('column_names_list: ' + str(column_names_list))
+    if column_name_rows < 3:
+        del column_names_list[0]
+    #print('column_names_list: ' + str(column_names_list))                   
+    return column_names_list, column_widths_list, default_intf_dict
+
+#
+# Get the column number in the table rows of the --sort column
+#
+# The column can be given as its heading (e.g. 'Invalid CRC', 'TxWait % last 1s/1m/1h/72h') or as its
+# variable name with or without 'intf_' (e.g. invalid_crcs). Case and spaces are ignored.
+#
+# Returns None if counter_list has no such column
+#
+def get_sort_column_num(counter_list, sort_column):
+    sort_column = ''.join(sort_column.lower().split())
+    if sort_column == 'intf':
+        return 0
+    var_list = get_var_list(counter_list)
+    column_num = 0
+    for line_entry in counter_list:
+        for counter_entry in line_entry[1]:
+            column_name = counter_entry[0]
+            if column_name == '&':
+                continue
+            var_name = var_list[column_num].lower()
+            column_num += 1
+            if sort_column in [''.join(column_name).lower().replace(' ', ''), var_name, var_name[5:] if var_name[:5] == 'intf_' else var_name]:
+                return column_num
+    return None
+
+#
+# Check that the --sort column is in the table, print the columns if not
+#
+def check_sort_column(counter_list, column_names_list, args):
+    if args.sort and get_sort_column_num(counter_list, args.sort) == None:
+        print('--sort column "' + args.sort + '" not found. Columns are: ' + ', '.join(['"' + ' '.join([column_name for column_name in column_names if column_name != '']) + '"' for column_names in zip(*column_names_list)]))
+        return False
+    return True
+
+#
+# Select the table rows to display with --sort and --top
+#
+# Numbers (including transceiver values with units and warning/alarm flags) sort highest first, TxWait % last
+# 1s/1m/1h/72h sorts on the 1s percentage then 1m, 1h and 72h. Values that are not numbers (e.g. 'NF') sort last.
+# Columns without any number sort alphabetically. --reverse reverses the order.
+#
+# With --top only the top N rows are kept using a bounded heap
+#
+def sort_table_rows(output_table_list, column_num, args):
+    sort_key_list = []
+    numeric_found = False
+    for col_values in output_table_list:
+        var_value = col_values[column_num]
+        sort_key = get_percentage_values(var_value)
+        if sort_key == None:
+            numeric_value = get_numeric_value(var_value)
+            if numeric_value != None:
+                sort_key = [numeric_value]
+        if sort_key != None:
+            numeric_found = True
+        sort_key_list.append(sort_key)
+    if args.top:
+        row_count = min(args.top, len(output_table_list))
+    else:
+        row_count = len(output_table_list)
+    row_num_list = range(len(output_table_list))
+    if not numeric_found:
+        if args.reverse:
+            row_num_list = heapq.nlargest(row_count, row_num_list, key = lambda row_num: output_table_list[row_num][column_num])
+        else:
+            row_num_list = heapq.nsmallest(row_count, row_num_list, key = lambda row_num: output_table_list[row_num][column_num])
+    elif args.reverse:
+        row_num_list = heapq.nsmallest(row_count, row_num_list, key = lambda row_num: (sort_key_list[row_num] == None, sort_key_list[row_num]))
+    else:
+        row_num_list = heapq.nlargest(row_count, row_num_list, key = lambda row_num: (sort_key_list[row_num] != None, sort_key_list[row_num]))
+    return [output_table_list[row_num] for row_num in row_num_list]
+
+#
+# Build the row of an interface: the interface followed by the value of each column
+#
+# Returns col_values or None if --errorsonly is set and the interface has no non-zero count
+#
+def build_row(counter_list, intf, intf_table, args):
+    row = intf_table['intf_index_dict'].get(intf)
+    if row == None:
+        print('Intf: ' + intf + ' not in intf_table')
+    col_values = [intf]
+    intf_non_zero_count_found = False
+    #
+    # Build column values list
+    #
+    for line_entry in counter_list:
+        for counter_entry in line_entry[1]:
+            column_name = counter_entry[0]
+            #column_name_list.append(column_name)
+            if column_name == '&':
+                continue
+            #print('counter_entry[1]: ' + str(counter_entry[1]))
+            for pattern_entry in counter_entry[1]:
+                if pattern_entry[0:1] == '%':
+                    var_name = pattern_entry[1:]
+                    column_num = intf_table['var_index_dict'].get(var_name)
+                    if row == None or column_num == None:
+                        var_value = 'NF'
+                    else:
+                        var_value = get_display_value(intf_table['column_list'][column_num][row])
+                    #print('Intf: ' + intf + ' var_name: ' + var_name + ' var_value: ' + var_value)
+                    col_values.append(var_value)
+                    #
+                    # The check for if a value is an "error" is different for sfp stats
+                    #
+                    # Three checks
+                    # 1 - var_value is not equal to 'NF'
+                    # 2 - var_value contains a decimal point '.' and there is a trailing '-' or '+'
+                    # 3 - var_value is a decimal integer that is not zero
+                    # 4 - var_value is not 0%/0%/0%/0%
+                    #
+                    # The brief variables of --columns are not counts, so they are not checked
+                    #
+                    if var_name[:9] == 'intf_sfp_':
+                        if var_value != 'NF' and ((var_value.find('.') != -1 and (var_value[-1:] == '-' or var_value[-1:] == '+')) or (var_value.isdigit() and var_value != '0')):
+                            intf_non_zero_count_found = True
+                    elif var_name in intf_info_var_list and args.columns:
+                        pass
+                    elif var_value != '0' and var_value != 'NF' and var_value != '0%/0%/0%/0%':
+                        intf_non_zero_count_found = True
+                    break
+    if not args.filter_errorsonly or (args.filter_errorsonly and intf_non_zero_count_found):
+        return col_values
+    return None
+
+#
+# Build the table rows for the interfaces in intf_list
+#
+# Returns output_table_list and updates column_widths_list with the maximum length of each column
+#
+def build_table_rows(counter_list, intf_list, intf_table, column_widths_list, args):
+    #
+    # Build table
+    #
+    # For each counter, find pattern and set key name and values
+    # Append each variable value to col_values
+    # Once interface is completely processes add the row to the table
+    #
+    start = time.time()
+    output_table_list = []
+    #
+    # Build each row in table
+    #
+    # Without --errorsonly every interface has a row, so the values are converted a column at a time
+    #
+    if args.filter_errorsonly:
+        for intf in intf_list:
+            col_values = build_row(counter_list, intf, intf_table, args)
+            if col_values != None:
+                output_table_list.append(col_values)
+    else:
+        row_list = [intf_table['intf_index_dict'].get(intf) for intf in intf_list]
+        display_column_list = [intf_list]
+        for var_name in get_var_list(counter_list):
+            column_num = intf_table['var_index_dict'].get(var_name)
+            if column_num == None:
+                display_column_list.append(['NF'] * len(intf_list))
+                continue
+            column = intf_table['column_list'][column_num]
+            display_column_list.append(['NF' if row == None or column[row] == None else str(column[row]) for row in row_list])
+        output_table_list = [list(col_values) for col_values in zip(*display_column_list)]
+
+    #
+    # Sort and select the --top rows before the column widths so only the displayed rows are measured
+    #
+    if args.sort:
+        sort_column_num = get_sort_column_num(counter_list, args.sort)
+        if sort_column_num != None:
+            output_table_list = sort_table_rows(output_table_list, sort_column_num, args)
+
+    #
+    # Update column_widths_list with maximum length of each variable in each column
+    #
+    for column_num, column_values in enumerate(zip(*output_table_list)):
+        column_widths_list[column_num] = max(column_widths_list[column_num], max([len(var_value) for var_value in column_values]))
+
+    timing_dict['rows'] += len(output_table_list)
+    add_phase_time('build_rows', start)
+    return output_table_list
+
+#
+# Build the lines of a table
+#
+# Each header and data row is formatted with a format string built once from the column widths: the headings and
+# the interface are left justified and the data columns right justified
+#
+# Returns the list of lines
+#
+def build_table_lines(clock_type_line, column_names_list, column_widths_list, output_table_list, intf_table, max_descr_len, args):
+    #
+    # Create header_trailer and seperator lines
+    #
+    header_trailer = ' ' + ''.join([''.ljust(column_width + 1, '-') + '-+' for column_width in column_widths_list])
+    seperator = '+' + ''.join([''.ljust(column_width + 1, '-') + '-+' for column_width in column_widths_list])
+    #
+    # Add Description if requested
+    #
+    header_format = ''.join(['| %-' + str(column_width + 1) + 's' for column_width in column_widths_list])
+    row_format = '| %-' + str(column_widths_list[0] + 1) + 's' + ''.join(['| %' + str(column_width) + 's ' for column_width in column_widths_list[1:]])
+    if args.include_description:
+        header_trailer += ''.ljust(max_descr_len + 1, '-') + '-+'
+        seperator += ''.ljust(max_descr_len + 1, '-') + '-+'
+        descr_format = '| %-' + str(max_descr_len + 1) + 's'
+        header_format += descr_format
+        row_format += descr_format
+    header_format += '|'
+    row_format += '|'
+    header_trailer = header_trailer[:-1]
+
+    table_line_list = [clock_type_line, header_trailer]
+    #
+    # 2 or 3 header lines - the Description heading is on the second line
+    #
+    for row_num in range(len(column_names_list)):
+        header_values = column_names_list[row_num]
+        if args.include_description:
+            header_values = header_values + ['Description' if row_num == 1 else '']
+        table_line_list.append(header_format % tuple(header_values))
+    table_line_list.append(seperator)
+    #
+    # Interface data lines
+    #
+    if args.include_description:
+        for col_values in output_table_list:
+            table_line_list.append(row_format % tuple(col_values + [get_intf_value(intf_table, col_values[0], 'description')]))
+    else:
+        for col_values in output_table_list:
+            table_line_list.append(row_format % tuple(col_values))
+    table_line_list.append(header_trailer)
+    return table_line_list
+
+#
+# Print the table to stdout or to the outfile if outfile_handle is set
+#
+# The table is written with one write. The outfile has the same table as stdout followed by an empty line.
+#
+def print_table(clock_type_line, column_names_list, column_widths_list, output_table_list, intf_table, max_descr_len, args, outfile_handle):
+    start = time.time()
+    table_line_list = build_table_lines(clock_type_line, column_names_list, column_widths_list, output_table_list, intf_table, max_descr_len, args)
+    if outfile_handle == None:
+        sys.stdout.write('\n'.join(table_line_list) + '\n')
+    else:
+        outfile_handle.write('\n'.join(table_line_list) + '\n\n')
+    add_phase_time('render', start)
+
+#
+# Convert a variable value for --format jsonl or json
+#
+# Integers and decimal numbers without units are numbers and 'NF' is null. Other values (e.g. transceiver values
+# with units and alarm flags, TxWait % last 1s/1m/1h/72h) are kept as strings.
+#
+def get_record_value(var_value):
+    if var_value == 'NF':
+        return None
+    if var_value == '' or var_value.strip('-.0123456789') != '':
+        return var_value
+    try :
+        return int(var_value)
+    except ValueError:
+        pass
+    try :
+        return float(var_value)
+    except ValueError:
+        return var_value
+
+#
+# Get the JSON of a variable value for --format jsonl or json
+#
+# json.dumps() is only used for strings, numbers are formatted directly as they are most of the values
+#
+def get_record_json(var_value):
+    record_value = get_record_value(var_value)
+    if record_value == None:
+        return 'null'
+    if isinstance(record_value, str):
+        return json.dumps(record_value)
+    return str(record_value)
+
+#
+# Write a record per interface with --format csv, jsonl or json
+#
+# The records are written as each interface's row is built, without the column width pass of the table. With
+# --sort all the rows are built and sorted first. The keys are the variable names of counter_list, after the
+# time and intf keys, followed by description with --d. CSV has a header line with the keys and 'NF' values empty.
+# JSON is one object with the time, type and a list of the interface records.
+#
+def write_records(type_line, current_datetime, counter_list, intf_list, intf_table, args, outfile_handle):
+    if outfile_handle == None:
+        outfile_handle = sys.stdout
+    key_list = ['time', 'intf'] + get_var_list(counter_list)
+    include_description = args.include_description and 'description' not in key_list
+    if include_description:
+        key_list.append('description')
+    if args.sort:
+        output_table_list = build_table_rows(counter_list, intf_list, intf_table, [0] * (len(key_list) - 1 - int(include_description)), args)
+    start = time.time()
+    if not args.sort:
+        output_table_list = (build_row(counter_list, intf, intf_table, args) for intf in intf_list)
+    if args.output_format == 'csv':
+        csv_writer = csv.writer(outfile_handle, lineterminator = '\n')
+        csv_writer.writerow(key_list)
+    elif args.output_format == 'json':
+        outfile_handle.write('{"time": ' + json.dumps(current_datetime) + ', "type": ' + json.dumps(type_line.rstrip(':')) + ', "interfaces": [')
+        json_time = None
+        record_sep = '\n'
+    else:
+        json_time = '"time": ' + json.dumps(current_datetime) + ', '
+    key_json_list = [json.dumps(key) + ': ' for key in key_list]
+    row_count = 0
+    for col_values in output_table_list:
+        if col_values == None:
+            continue
+        if include_description:
+            description = get_intf_value(intf_table, col_values[0], 'description')
+            col_values = col_values + [description if description != None else '']
+        if args.output_format == 'csv':
+            csv_writer.writerow([current_datetime] + ['' if var_value == 'NF' else var_value for var_value in col_values])
+        else:
+            record = '{' + (json_time or '') + ', '.join([key_json + get_record_json(var_value) for key_json, var_value in zip(key_json_list[1:], col_values)]) + '}'
+            if args.output_format == 'json':
+                outfile_handle.write(record_sep + record)
+                record_sep = ',\n'
+            else:
+                outfile_handle.write(record + '\n')
+        row_count += 1
+    if args.output_format == 'json':
+        outfile_handle.write('\n]}\n')
+    if not args.sort:
+        timing_dict['rows'] += row_count
+    add_phase_time('render', start)
+
+#
+# Get the variables that are counters, so have a delta and per second rate in watch mode
+#
+# A variable is a counter if it is a decimal integer for at least one interface
+# (e.g. not the TxWait % last 1s/1m/1h/72h percentages)
+#
+def get_rate_var_list(default_intf_dict, intf_table):
+    rate_var_list = []
+    for var_name in default_intf_dict:
+        column_num = intf_table['var_index_dict'].get(var_name)
+        if column_num == None:
+            continue
+        for var_value in intf_table['column_list'][column_num]:
+            if get_counter_int(var_value) != None:
+                rate_var_list.append(var_name)
+                break
+    return rate_var_list
+
+#
+# Build the counter_list for watch mode
+#
+# Each counter column shows the delta since the previous sample and is followed by a column with its per second rate
+#
+def build_watch_counter_list(counter_list, rate_var_list):
+    watch_counter_list = []
+    for line_entry in counter_list:
+        for counter_entry in line_entry[1]:
+            column_name = counter_entry[0]
+            if column_name == '&':
+                continue
+            for pattern_entry in counter_entry[1]:
+                if pattern_entry[0:1] == '%':
+                    var_name = pattern_entry[1:]
+                    break
+            watch_line_entry = [[0], [[column_name, ['%' + var_name]]]]
+            if var_name in rate_var_list:
+                rate_column_name = column_name[:-1] + [column_name[-1] + '/s']
+                watch_line_entry[1].append([rate_column_name, ['%' + var_name + '/s']])
+            watch_counter_list.append(watch_line_entry)
+    return watch_counter_list
+
+#
+# Build the interface table for watch mode from two samples
+#
+# var_name = delta since the previous sample
+# var_name + '/s' = per second rate since the previous sample
+#
+# A counter lower than in the previous sample was cleared so the delta is the new value
+# Interfaces or counters not in the previous sample have no delta ('NF')
+# Variables that are not counters show the value of the new sample
+#
+def build_watch_table(prev_table, intf_table, intf_list, default_intf_dict, rate_var_list, elapsed):
+    watch_table = create_intf_table(['description'] + list(default_intf_dict) + [var_name + '/s' for var_name in rate_var_list])
+    for intf in intf_list:
+        description = get_intf_value(intf_table, intf, 'description')
+        if description != None:
+            set_intf_value(watch_table, intf, 'description', description)
+        else:
+            add_intf_table_row(watch_table, intf)
+        for var_name in default_intf_dict:
+            var_value = get_intf_value(intf_table, intf, var_name)
+            if var_name not in rate_var_list:
+                set_intf_value(watch_table, intf, var_name, var_value)
+                continue
+            counter = get_counter_int(var_value)
+            prev_counter = get_counter_int(get_intf_value(prev_table, intf, var_name))
+            if counter != None and prev_counter != None:
+                delta = counter - prev_counter
+                if delta < 0:
+                    delta = counter
+                set_intf_value(watch_table, intf, var_name, delta)
+                if delta == 0:
+                    set_intf_value(watch_table, intf, var_name + '/s', '0')
+                else:
+                    set_intf_value(watch_table, intf, var_name + '/s', '%.1f' % (delta / float(elapsed)))
+            else:
+                set_intf_value(watch_table, intf, var_name, var_value)
+    return watch_table
+
+#
+# Print the delta and per second rate of the counters between two samples
+#
+def print_delta_table(type_line, delta_line, watch_counter_list, intf_list, prev_table, intf_table, default_intf_dict, rate_var_list, elapsed, max_descr_len, args, outfile_handle):
+    watch_table = build_watch_table(prev_table, intf_table, intf_list, default_intf_dict, rate_var_list, elapsed)
+    watch_column_names_list, watch_column_widths_list, watch_default_intf_dict = build_columns(watch_counter_list)
+    output_table_list = build_table_rows(watch_counter_list, intf_list, watch_table, watch_column_widths_list, args)
+    clock_type_line = datetime.datetime.today().strftime('%Y/%m/%d %H:%M:%S') + ' ' + type_line[:-1] + ' delta and rate ' + delta_line + ':'
+    print_table(clock_type_line, watch_column_names_list, watch_column_widths_list, output_table_list, watch_table, max_descr_len, args, outfile_handle)
+
+#
+# Snapshot of the counters saved after each run so the next run can display the delta since this run
+#
+# File format (little endian):
+#
+# header   = magic 'SITS', version (uint16), counter size in bytes (uint16), sample time (double),
+#            number of interfaces (uint32), number of variables (uint32), length of names (uint32)
+# names    = interface names '\n' separated, '\0', variable names '\n' separated (utf-8)
+# counters = number of interfaces x number of variables unsigned integers, one row per interface in names order
+#
+# Values that are not counters (e.g. 'NF') are stored as snapshot_missing
+#
+snapshot_magic = b'SITS'
+snapshot_version = 1
+snapshot_header_format = '<4sHHdIII'
+try :
+    array.array('Q')
+    snapshot_typecode = 'Q'
+except ValueError:
+    snapshot_typecode = 'L'
+snapshot_missing = 256 ** array.array(snapshot_typecode).itemsize - 1
+
+#
+# Save a snapshot of the counters in var_list for the interfaces in intf_list
+#
+# The snapshot is written to a temporary file and renamed so an interrupted run never leaves a partial snapshot
+#
+def save_snapshot(snapshot_name, sample_time, intf_list, var_list, intf_table):
+    counter_array = array.array(snapshot_typecode)
+    column_list = [intf_table['column_list'][intf_table['var_index_dict'][var_name]] if var_name in intf_table['var_index_dict'] else None for var_name in var_list]
+    for intf in intf_list:
+        row = intf_table['intf_index_dict'].get(intf)
+        for column in column_list:
+            counter = get_counter_int(column[row]) if row != None and column != None else None
+            if counter != None and counter < snapshot_missing:
+                counter_array.append(counter)
+            else:
+                counter_array.append(snapshot_missing)
+    if sys.byteorder != 'little':
+        counter_array.byteswap()
+    names = ('\n'.join(intf_list) + '\0' + '\n'.join(var_list)).encode('utf-8')
+    header = struct.pack(snapshot_header_format, snapshot_magic, snapshot_version, counter_array.itemsize, sample_time, len(intf_list), len(var_list), len(names))
+    snapshot_handle = open(snapshot_name + '.tmp', 'wb')
+    snapshot_handle.write(header)
+    snapshot_handle.write(names)
+    snapshot_handle.write(counter_array.tostring() if not hasattr(counter_array, 'tobytes') else counter_array.tobytes())
+    snapshot_handle.close()
+    os.rename(snapshot_name + '.tmp', snapshot_name)
+
+#
+# Load a snapshot saved by save_snapshot()
+#
+# Returns sample time, snapshot_table with the counters of the snapshot as an interface table
+# Returns None, an empty interface table if there is no snapshot or it can not be used (e.g. saved by another version of this script)
+#
+def load_snapshot(snapshot_name):
+    try :
+        snapshot_handle = open(snapshot_name, 'rb')
+        snapshot_bytes = snapshot_handle.read()
+        snapshot_handle.close()
+    except (IOError, OSError):
+        return None, create_intf_table([])
+    header_len = struct.calcsize(snapshot_header_format)
+    if len(snapshot_bytes) < header_len:
+        return None, create_intf_table([])
+    magic, version, itemsize, sample_time, intf_count, var_count, names_len = struct.unpack(snapshot_header_format, snapshot_bytes[:header_len])
+    counter_array = array.array(snapshot_typecode)
+    if magic != snapshot_magic or version != snapshot_version or itemsize != counter_array.itemsize:
+        return None, create_intf_table([])
+    if len(snapshot_bytes) != header_len + names_len + intf_count * var_count * itemsize:
+        return None, create_intf_table([])
+    intf_names, var_names = snapshot_bytes[header_len:header_len + names_len].decode('utf-8').split('\0')
+    intf_list = intf_names.split('\n') if intf_count else []
+    var_list = var_names.split('\n') if var_count else []
+    if hasattr(counter_array, 'frombytes'):
+        counter_array.frombytes(snapshot_bytes[header_len + names_len:])
+    else:
+        counter_array.fromstring(snapshot_bytes[header_len + names_len:])
+    if sys.byteorder != 'little':
+        counter_array.byteswap()
+    #
+    # The snapshot rows are one column of the interface table each
+    #
+    snapshot_table = create_intf_table([])
+    for row, intf in enumerate(intf_list):
+        snapshot_table['intf_index_dict'][intf] = row
+    snapshot_table['intf_names'] = intf_list
+    for column_num, var_name in enumerate(var_list):
+        snapshot_table['var_index_dict'][var_name] = column_num
+        snapshot_table['var_list'].append(var_name)
+        snapshot_table['column_list'].append([None if counter == snapshot_missing else counter for counter in counter_array[column_num::var_count]])
+    return sample_time, snapshot_table
+
+#
+# Cache of the parsed output of the show commands that change far less often than the counters
+#
+# The cache is a JSON file on bootflash:
+#
+# {'version': cache_version, 'hits': total hits, 'misses': total misses,
+#  'entries': {source: {'key': command or boot time, 'time': time cached, 'value': parsed output}}}
+#
+# source is one of cache_default_ttl_dict or 'version'. The version entry is kept until the switch reboots, the
+# others until they are older than their TTL. An entry is only used if its key matches (e.g. the same interface
+# range for show interface description).
+#
+cache_version = 1
+cache_default_ttl_dict = {'topology': 600, 'flogi': 300, 'description': 3600}
+
+#
+# Convert a --cache-ttl value like topology=10m,flogi=5m,description=1h to {source: seconds}
+#
+# Sources that are not given keep their default TTL
+#
+def parse_cache_ttl(cache_ttl):
+    cache_ttl_dict = dict(cache_default_ttl_dict)
+    for cache_ttl_entry in cache_ttl.split(','):
+        cache_ttl_toks = cache_ttl_entry.split('=')
+        if len(cache_ttl_toks) != 2 or cache_ttl_toks[0] not in cache_default_ttl_dict:
+            raise argparse.ArgumentTypeError('invalid cache TTL: ' + cache_ttl_entry + ' (use ' + ', '.join(['%s=%ds' % (source, cache_default_ttl_dict[source]) for source in sorted(cache_default_ttl_dict)]) + ')')
+        if cache_ttl_toks[1] in ['0', '0s']:
+            cache_ttl_dict[cache_ttl_toks[0]] = 0
+        else:
+            cache_ttl_dict[cache_ttl_toks[0]] = parse_duration(cache_ttl_toks[1])
+    return cache_ttl_dict
+
+#
+# Get the time the switch booted, used as the key of the version entry
+#
+# Returns None if it is not known so the version is not cached
+#
+def get_boot_time():
+    try :
+        stat_handle = open('/proc/stat')
+        stat_lines = stat_handle.read().splitlines()
+        stat_handle.close()
+    except (IOError, OSError):
+        return None
+    for line in stat_lines:
+        line_toks = line.split()
+        if len(line_toks) == 2 and line_toks[0] == 'btime':
+            return line_toks[1]
+    return None
+
+#
+# Load the cache, returns an empty cache if there is none or it can not be used
+#
+def load_cache(cache_name):
+    cache_dict = {'version': cache_version, 'hits': 0, 'misses': 0, 'entries': {}}
+    try :
+        cache_handle = open(cache_name)
+        loaded_cache_dict = json.load(cache_handle)
+        cache_handle.close()
+    except (IOError, OSError, ValueError):
+        return cache_dict
+    if isinstance(loaded_cache_dict, dict) and loaded_cache_dict.get('version') == cache_version:
+        cache_dict.update(loaded_cache_dict)
+    return cache_dict
+
+#
+# Get the parsed output of a source from the cache
+#
+# ttl is None for entries that are kept until the key changes
+#
+# Returns None on a miss. Hits and misses are counted in cache_dict['hits'] and cache_dict['misses'].
+#
+def get_cache_entry(cache_dict, source, key, ttl, refresh):
+    cache_entry = cache_dict['entries'].get(source)
+    if refresh or key == None or cache_entry == None or cache_entry.get('key') != key or (ttl != None and time.time() - cache_entry.get('time', 0) >= ttl):
+        cache_dict['misses'] += 1
+        return None
+    cache_dict['hits'] += 1
+    return cache_entry['value']
+
+def set_cache_entry(cache_dict, source, key, value):
+    if key != None:
+        cache_dict['entries'][source] = {'key': key, 'time': time.time(), 'value': value}
+
+#
+# Save the cache to a temporary file and rename it so an interrupted run never leaves a partial cache
+#
+def save_cache(cache_name, cache_dict):
+    cache_handle = open(cache_name + '.tmp', 'w')
+    json.dump(cache_dict, cache_handle)
+    cache_handle.close()
+    os.rename(cache_name + '.tmp', cache_name)
+
+#
+# Device-alias index: PWWN -> device-alias name hash table on bootflash
+#
+# header = magic 'SITA', version (uint16), reserved (uint16), number of slots (uint32), number of aliases (uint32),
+#          length of names (uint32), SHA-1 of the show device-alias status fingerprint (20 bytes)
+# slots  = number of slots x [PWWN (uint64, 0 is an empty slot), offset in names (uint32), length of name (uint32)]
+# names  = device-alias names (utf-8)
+#
+# The slot of a PWWN is found with get_alias_index_slot() and linear probing, so a lookup only reads the few slots
+# it needs from the mmap and the index is not loaded as a whole. The index is rebuilt from show device-alias database
+# only when the show device-alias status fingerprint changes.
+#
+alias_index_magic = b'SITA'
+alias_index_version = 1
+alias_index_header_format = '<4sHHIII20s'
+alias_index_slot_format = '<QII'
+
+#
+# Get the fingerprint of the device-alias database from show device-alias status
+#
+# The number of aliases, mode, checksum (if shown) and time of the last action (e.g. a commit) change when the
+# database changes
+#
+# Returns None if the output has no database line so the index is always rebuilt
+#
+def get_device_alias_fingerprint(show_da_status_str):
+    fingerprint_list = []
+    for line in iter_lines(show_da_status_str):
+        line = line.strip()
+        if line.startswith('Database:-') or line.startswith('Checksum') or line.startswith('Last Action Time Stamp'):
+            fingerprint_list.append(' '.join(line.split()))
+    if not [fingerprint for fingerprint in fingerprint_list if fingerprint.startswith('Database:-')]:
+        return None
+    return hashlib.sha1('\n'.join(fingerprint_list).encode('utf-8')).digest()
+
+#
+# Parse show device-alias database output
+#
+# device-alias name host1_hba0 pwwn 21:00:00:24:ff:00:00:01
+#
+# Returns alias_list = [[pwwn, device-alias], ...]
+#
+def parse_show_device_alias_database(show_da_database_str):
+    alias_list = []
+    for line in iter_lines(show_da_database_str):
+        da_toks = line.split()
+        if len(da_toks) == 5 and da_toks[0] == 'device-alias' and da_toks[1] == 'name' and da_toks[3] == 'pwwn':
+            alias_list.append([da_toks[4], da_toks[2]])
+    return alias_list
+
+#
+# Parse show device-alias database JSON output
+#
+# Returns alias_list or None if the expected keys are not found so the text output is used instead
+#
+def parse_show_device_alias_database_json(show_da_database_json):
+    alias_rows = get_json_rows(show_da_database_json, 'device_alias_database')
+    if not isinstance(show_da_database_json, dict) or [row for row in alias_rows if 'dev_alias_name' not in row or 'pwwn' not in row]:
+        return None
+    return [[str(row['pwwn']), str(row['dev_alias_name'])] for row in alias_rows]
+
+def get_pwwn_value(pwwn):
+    try :
+        return int(pwwn.replace(':', ''), 16)
+    except ValueError:
+        return 0
+
+#
+# Get the first slot to probe for a PWWN. The PWWN is multiplied by a large odd constant so PWWNs that only differ
+# in a few bits (e.g. the HBAs of one vendor) are spread over the table
+#
+def get_alias_index_slot(pwwn_value, slot_count):
+    return (((pwwn_value * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32) % slot_count
+
+#
+# Save the device-alias index for alias_list
+#
+# The table has 1.5 slots per alias. The index is written to a temporary file and renamed so an interrupted run
+# never leaves a partial index.
+#
+def save_alias_index(alias_index_name, fingerprint, alias_list):
+    slot_count = len(alias_list) * 3 // 2 + 1
+    slot_list = [None] * slot_count
+    names_list = []
+    names_len = 0
+    alias_count = 0
+    for pwwn, device_alias in alias_list:
+        pwwn_value = get_pwwn_value(pwwn)
+        if pwwn_value == 0:
+            continue
+        slot = get_alias_index_slot(pwwn_value, slot_count)
+        while slot_list[slot] != None and slot_list[slot][0] != pwwn_value:
+            slot = (slot + 1) % slot_count
+        if slot_list[slot] == None:
+            alias_count += 1
+        name = device_alias.encode('utf-8')
+        slot_list[slot] = [pwwn_value, names_len, len(name)]
+        names_list.append(name)
+        names_len += len(name)
+    alias_index_handle = open(alias_index_name + '.tmp', 'wb')
+    alias_index_handle.write(struct.pack(alias_index_header_format, alias_index_magic, alias_index_version, 0, slot_count, alias_count, names_len, fingerprint or b''))
+    empty_slot = struct.pack(alias_index_slot_format, 0, 0, 0)
+    alias_index_handle.write(b''.join([empty_slot if slot_entry == None else struct.pack(alias_index_slot_format, *slot_entry) for slot_entry in slot_list]))
+    alias_index_handle.write(b''.join(names_list))
+    alias_index_handle.close()
+    os.rename(alias_index_name + '.tmp', alias_index_name)
+
+#
+# Open a device-alias index saved by save_alias_index()
+#
+# Returns alias_index_dict = {'mmap': mmap of the file, 'fingerprint': fingerprint, 'slot_count': number of slots, ...}
+# Returns None if there is no index or it can not be used (e.g. saved by another version of this script)
+#
+def open_alias_index(alias_index_name):
+    try :
+        alias_index_handle = open(alias_index_name, 'rb')
+    except (IOError, OSError):
+        return None
+    header_len = struct.calcsize(alias_index_header_format)
+    slot_len = struct.calcsize(alias_index_slot_format)
+    header_bytes = alias_index_handle.read(header_len)
+    if len(header_bytes) != header_len:
+        alias_index_handle.close()
+        return None
+    magic, version, reserved, slot_count, alias_count, names_len, fingerprint = struct.unpack(alias_index_header_format, header_bytes)
+    alias_index_handle.seek(0, 2)
+    if magic != alias_index_magic or version != alias_index_version or slot_count == 0 or alias_index_handle.tell() != header_len + slot_count * slot_len + names_len:
+        alias_index_handle.close()
+        return None
+    alias_index_mmap = mmap.mmap(alias_index_handle.fileno(), 0, access = mmap.ACCESS_READ)
+    alias_index_handle.close()
+    return {'mmap': alias_index_mmap, 'fingerprint': fingerprint, 'slot_count': slot_count, 'alias_count': alias_count,
+            'slots_offset': header_len, 'slot_len': slot_len, 'names_offset': header_len + slot_count * slot_len}
+
+def close_alias_index(alias_index_dict):
+    alias_index_dict['mmap'].close()
+
+#
+# Look up the device-alias of a PWWN in the device-alias index
+#
+# Returns the device-alias or '' if the PWWN has none
+#
+def lookup_alias_index(alias_index_dict, pwwn):
+    pwwn_value = get_pwwn_value(pwwn)
+    if pwwn_value == 0:
+        return ''
+    slot_count = alias_index_dict['slot_count']
+    slot = get_alias_index_slot(pwwn_value, slot_count)
+    for probe in range(slot_count):
+        slot_pwwn_value, name_offset, name_len = struct.unpack_from(alias_index_slot_format, alias_index_dict['mmap'], alias_index_dict['slots_offset'] + slot * alias_index_dict['slot_len'])
+        if slot_pwwn_value == pwwn_value:
+            name_offset += alias_index_dict['names_offset']
+            return alias_index_dict['mmap'][name_offset:name_offset + name_len].decode('utf-8')
+        if slot_pwwn_value == 0:
+            return ''
+        slot = (slot + 1) % slot_count
+    return ''
+
+#
+# Get the variable names of the columns in counter_list in column order
+#
+def get_var_list(counter_list):
+    var_list = []
+    for line_entry in counter_list:
+        for counter_entry in line_entry[1]:
+            if counter_entry[0] == '&':
+                continue
+            for pattern_entry in counter_entry[1]:
+                if pattern_entry[0:1] == '%':
+                    var_list.append(pattern_entry[1:])
+                    break
+    return var_list
+
+#
+# Convert a variable value to a number
+#
+# Counters are integers. Transceiver values have units (e.g. '-2.84dBm') and may have a trailing
+# '-' or '--' warning/alarm low or '+' or '++' warning/alarm high flag.
+#
+# Returns an int or float, or None if the value is not a number (e.g. 'NF', serial numbers)
+#
+def get_numeric_value(var_value):
+    var_value = var_value.rstrip('+-')
+    idx = len(var_value)
+    while idx > 0 and not var_value[idx - 1].isdigit():
+        idx -= 1
+    var_value = var_value[:idx]
+    if var_value == '':
+        return None
+    try :
+        return int(var_value)
+    except ValueError:
+        pass
+    try :
+        return float(var_value)
+    except ValueError:
+        return None
+
+#
+# Convert a TxWait % last 1s/1m/1h/72h value (e.g. '0%/1%/3%/0%') to a list of 4 ints
+#
+# Returns None if the value is not a list of percentages
+#
+txwait_percentage_list = ['1s', '1m', '1h', '72h']
+
+def get_percentage_values(var_value):
+    percentage_toks = var_value.split('/')
+    if len(percentage_toks) != len(txwait_percentage_list):
+        return None
+    percentage_list = []
+    for percentage_tok in percentage_toks:
+        if not percentage_tok.endswith('%') or not percentage_tok[:-1].isdigit():
+            return None
+        percentage_list.append(int(percentage_tok[:-1]))
+    return percentage_list
+
+#
+# --where: a predicate on the variables of each interface, e.g. "intf_invalid_crcs > 100 or intf_txwait_1s1m1h72h.1m >= 5"
+#
+# expression = condition, conditions joined by and / or (and first), not and parentheses
+# condition  = operand <, <=, >, >=, == (or =) or != operand, or an operand that is true if it is not 'NF', 0 or ''
+# operand    = variable name (with or without 'intf_'), number or quoted string
+#
+# Counters and transceiver values (without their units and warning/alarm flags, e.g. -11.66 for -11.66dBm+) are
+# numbers. A TxWait % last 1s/1m/1h/72h variable is compared on one of its percentages with .1s, .1m, .1h or .72h.
+# A comparison with a variable that was not found ('NF') is false. A number and a string are compared as strings.
+#
+# parse_where() parses the expression once, when the arguments are parsed, into
+#
+# where_tree = ['or', where_tree, where_tree] | ['and', where_tree, where_tree] | ['not', where_tree] |
+#              ['compare', operator, operand, operand] | ['true', operand]
+# operand    = ['var', variable name, index in txwait_percentage_list or None] | ['value', number or string]
+#
+# and compile_where() compiles it into a function of the column_list and row of an interface in the interface table
+#
+where_token_re = re.compile(r'\s*(?:(-?\d+(?:\.\d+)?)(?![\w.])|(\'[^\']*\'|"[^"]*")|(<=|>=|==|!=|<|>|=|\(|\))|([A-Za-z_]\w*(?:\.\w+)?))')
+where_operator_dict = {
+    '<': lambda left, right: left < right,
+    '<=': lambda left, right: left <= right,
+    '>': lambda left, right: left > right,
+    '>=': lambda left, right: left >= right,
+    '==': lambda left, right: left == right,
+    '!=': lambda left, right: left != right,
+}
+
+#
+# Split a --where expression into tokens, [['number', 'string', 'operator' or 'word', token], ...]
+#
+def get_where_tokens(where):
+    token_list = []
+    pos = 0
+    where = where.rstrip()
+    while pos < len(where):
+        match = where_token_re.match(where, pos)
+        if match == None:
+            raise argparse.ArgumentTypeError('invalid --where expression at: ' + where[pos:].strip())
+        for token_type, token in zip(['number', 'string', 'operator', 'word'], match.groups()):
+            if token != None:
+                token_list.append([token_type, token])
+        pos = match.end()
+    return token_list
+
+def parse_where_operand(token_list, pos):
+    if pos >= len(token_list):
+        raise argparse.ArgumentTypeError('invalid --where expression: missing operand at the end')
+    token_type, token = token_list[pos]
+    if token_type == 'number':
+        return ['value', float(token) if '.' in token else int(token)], pos + 1
+    if token_type == 'string':
+        return ['value', token[1:-1]], pos + 1
+    if token_type == 'word' and token.lower() not in ['and', 'or', 'not']:
+        var_name, percentage_idx = token.lower(), None
+        if '.' in var_name:
+            var_name, percentage = var_name.split('.')
+            if percentage not in txwait_percentage_list:
+                raise argparse.ArgumentTypeError('invalid --where variable: ' + token + ' (use .' + ', .'.join(txwait_percentage_list) + ')')
+            percentage_idx = txwait_percentage_list.index(percentage)
+        return ['var', var_name, percentage_idx], pos + 1
+    raise argparse.ArgumentTypeError('invalid --where expression at: ' + ' '.join([token for token_type, token in token_list[pos:]]))
+
+def parse_where_condition(token_list, pos):
+    if pos < len(token_list) and token_list[pos][1].lower() == 'not':
+        where_tree, pos = parse_where_condition(token_list, pos + 1)
+        return ['not', where_tree], pos
+    if pos < len(token_list) and token_list[pos][1] == '(':
+        where_tree, pos = parse_where_or(token_list, pos + 1)
+        if pos >= len(token_list) or token_list[pos][1] != ')':
+            raise argparse.ArgumentTypeError('invalid --where expression: missing )')
+        return where_tree, pos + 1
+    left_operand, pos = parse_where_operand(token_list, pos)
+    if pos < len(token_list) and token_list[pos][0] == 'operator' and token_list[pos][1] not in ['(', ')']:
+        operator = token_list[pos][1]
+        if operator == '=':
+            operator = '=='
+        right_operand, pos = parse_where_operand(token_list, pos + 1)
+        return ['compare', operator, left_operand, right_operand], pos
+    return ['true', left_operand], pos
+
+def parse_where_and(token_list, pos):
+    where_tree, pos = parse_where_condition(token_list, pos)
+    while pos < len(token_list) and token_list[pos][1].lower() == 'and':
+        right_tree, pos = parse_where_condition(token_list, pos + 1)
+        where_tree = ['and', where_tree, right_tree]
+    return where_tree, pos
+
+def parse_where_or(token_list, pos):
+    where_tree, pos = parse_where_and(token_list, pos)
+    while pos < len(token_list) and token_list[pos][1].lower() == 'or':
+        right_tree, pos = parse_where_and(token_list, pos + 1)
+        where_tree = ['or', where_tree, right_tree]
+    return where_tree, pos
+
+#
+# Parse a --where expression, returns where_tree
+#
+def parse_where(where):
+    token_list = get_where_tokens(where)
+    if not token_list:
+        raise argparse.ArgumentTypeError('invalid --where expression: empty')
+    where_tree, pos = parse_where_or(token_list, 0)
+    if pos != len(token_list):
+        raise argparse.ArgumentTypeError('invalid --where expression at: ' + ' '.join([token for token_type, token in token_list[pos:]]))
+    return where_tree
+
+#
+# Get the variable names of the operands of where_tree
+#
+def get_where_var_list(where_tree):
+    if where_tree[0] == 'compare':
+        operand_list = where_tree[2:]
+    elif where_tree[0] == 'true':
+        operand_list = where_tree[1:]
+    else:
+        return [var_name for sub_tree in where_tree[1:] for var_name in get_where_var_list(sub_tree)]
+    return [operand[1] for operand in operand_list if operand[0] == 'var']
+
+#
+# Get the variable of the interface table for a --where variable name, with or without 'intf_'
+#
+# Returns None if the interface table has no such variable
+#
+def get_where_table_var(var_name, intf_table):
+    for table_var_name in [var_name, 'intf_' + var_name]:
+        if table_var_name in intf_table['var_index_dict']:
+            return table_var_name
+    return None
+
+#
+# Check that the --where variables are in the interface table, print the variables if not
+#
+def check_where(intf_table, args):
+    for var_name in get_where_var_list(args.where):
+        if get_where_table_var(var_name, intf_table) == None:
+            print('--where variable "' + var_name + '" not found. Variables are: ' + ', '.join(intf_table['var_list']))
+            return False
+    return True
+
+#
+# Values of the interface table as they are compared by --where
+#
+where_number_types = integer_types + (float,)
+
+def get_where_value(var_value):
+    if var_value == None or isinstance(var_value, integer_types):
+        return var_value
+    numeric_value = get_numeric_value(var_value)
+    if numeric_value == None:
+        return var_value
+    return numeric_value
+
+def get_where_percentage(var_value, percentage_idx):
+    if var_value == None:
+        return None
+    percentage_list = get_percentage_values(str(var_value))
+    if percentage_list == None:
+        return None
+    return percentage_list[percentage_idx]
+
+def compare_where_values(operator_function, left_value, right_value):
+    if left_value == None or right_value == None:
+        return False
+    if isinstance(left_value, where_number_types) != isinstance(right_value, where_number_types):
+        return operator_function(str(left_value), str(right_value))
+    return operator_function(left_value, right_value)
+
+def is_where_true(var_value):
+    return var_value != None and var_value != 0 and var_value != ''
+
+#
+# Get the Python source of where_tree
+#
+def get_where_source(where_tree, intf_table):
+    where_type = where_tree[0]
+    if where_type in ['or', 'and']:
+        return '(' + get_where_source(where_tree[1], intf_table) + ' ' + where_type + ' ' + get_where_source(where_tree[2], intf_table) + ')'
+    if where_type == 'not':
+        return '(not ' + get_where_source(where_tree[1], intf_table) + ')'
+    operand_source_list = []
+    for operand in where_tree[2:] if where_type == 'compare' else where_tree[1:]:
+        if operand[0] == 'value':
+            operand_source_list.append(repr(operand[1]))
+            continue
+        column_num = intf_table['var_index_dict'][get_where_table_var(operand[1], intf_table)]
+        if operand[2] == None:
+            operand_source_list.append('get_where_value(column_list[%d][row])' % column_num)
+        else:
+            operand_source_list.append('get_where_percentage(column_list[%d][row], %d)' % (column_num, operand[2]))
+    if where_type == 'compare':
+        return 'compare_where_values(where_operator_dict[%r], %s, %s)' % (where_tree[1], operand_source_list[0], operand_source_list[1])
+    return 'is_where_true(' + operand_source_list[0] + ')'
+
+#
+# Compile where_tree into a function(column_list, row) that returns True if the interface in row matches
+#
+# The column numbers of the variables are resolved once, so the variables must be in intf_table (see check_where())
+#
+def compile_where(where_tree, intf_table):
+    where_globals = {'get_where_value': get_where_value, 'get_where_percentage': get_where_percentage, 'compare_where_values': compare_where_values,
+                     'is_where_true': is_where_true, 'where_operator_dict': where_operator_dict}
+    return eval(compile('lambda column_list, row: ' + get_where_source(where_tree, intf_table), '<--where>', 'eval'), where_globals)
+
+#
+# Convert a duration like 30s, 15m, 72h or 7d (or a number of seconds) to seconds
+#
+def parse_duration(duration):
+    duration_unit_dict = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+    try :
+        if duration[-1:] in duration_unit_dict:
+            seconds = int(duration[:-1]) * duration_unit_dict[duration[-1:]]
+        else:
+            seconds = int(duration)
+    except ValueError:
+        raise argparse.ArgumentTypeError('invalid duration: ' + duration + ' (use a number of seconds or a number followed by s, m, h or d)')
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError('invalid duration: ' + duration)
+    return seconds
+
+#
+# History of samples in a fixed size ring buffer file on bootflash, accessed with mmap
+#
+# File format (little endian):
+#
+# header    = magic 'SITH', version (uint16), reserved (uint16), number of samples (uint32), number of interfaces (uint32),
+#             number of columns (uint32), next sample slot (uint32), resolution in seconds (uint32), last sample time (double)
+# columns   = number of columns x [column name (48 bytes), scale (uint32)]
+# intfs     = number of interfaces x interface name (32 bytes), empty names are free entries
+# samples   = number of samples x number of interfaces x record
+#
+# record    = sample time (double), interface entry (uint32), reserved (uint32), number of columns x value (int64)
+#
+# Each sample uses one slot of number of interfaces records and overwrites the oldest sample once all slots are used
+# so the file size never changes. Records of unused interface entries have interface entry history_no_intf.
+#
+# A column is one variable of default_intf_dict with a number value. Values with decimals are stored multiplied by
+# the column scale. TxWait % last 1s/1m/1h/72h is stored as 4 columns (e.g. intf_txwait_1s1m1h72h.1m).
+# Values that are not numbers (e.g. 'NF') are stored as history_missing.
+#
+history_magic = b'SITH'
+history_version = 1
+history_header_format = '<4sHHIIIIId'
+history_column_format = '<48sI'
+history_intf_format = '<32s'
+history_record_header_format = '<dII'
+history_missing = -2 ** 63
+history_no_intf = 2 ** 32 - 1
+history_decimal_scale = 1000
+
+#
+# Get the history columns for the variables with number values
+#
+# history_col_list = [[column name, variable name, index in TxWait percentages or -1, scale], ...]
+#
+def get_history_col_list(var_list, intf_table):
+    history_col_list = []
+    for var_name in var_list:
+        if var_name not in intf_table['var_index_dict']:
+            continue
+        var_value_list = [get_display_value(var_value) for var_value in intf_table['column_list'][intf_table['var_index_dict'][var_name]]]
+        if [var_value for var_value in var_value_list if get_percentage_values(var_value) != None]:
+            for idx, percentage_name in enumerate(txwait_percentage_list):
+                history_col_list.append([var_name + '.' + percentage_name, var_name, idx, 1])
+            continue
+        numeric_value_list = [get_numeric_value(var_value) for var_value in var_value_list]
+        numeric_value_list = [numeric_value for numeric_value in numeric_value_list if numeric_value != None]
+        if [numeric_value for numeric_value in numeric_value_list if isinstance(numeric_value, float)]:
+            history_col_list.append([var_name, var_name, -1, history_decimal_scale])
+        elif numeric_value_list:
+            history_col_list.append([var_name, var_name, -1, 1])
+    return history_col_list
+
+#
+# Get the offsets of the parts of a history file
+#
+def get_history_layout(history_dict):
+    header_len = struct.calcsize(history_header_format)
+    history_dict['intfs_offset'] = header_len + len(history_dict['col_list']) * struct.calcsize(history_column_format)
+    samples_offset = history_dict['intfs_offset'] + history_dict['max_intfs'] * struct.calcsize(history_intf_format)
+    history_dict['samples_offset'] = (samples_offset + 7) // 8 * 8
+    history_dict['record_format'] = history_record_header_format + str(len(history_dict['col_list'])) + 'q'
+    history_dict['record_len'] = struct.calcsize(history_dict['record_format'])
+    history_dict['file_len'] = history_dict['samples_offset'] + history_dict['num_samples'] * history_dict['max_intfs'] * history_dict['record_len']
+
+#
+# Open a history file
+#
+# history_dict = {'handle', 'mmap', 'num_samples', 'max_intfs', 'col_list', 'next_slot', 'resolution', 'last_sample_time',
+#                 'intf_index_dict', 'intfs_offset', 'samples_offset', 'record_format', 'record_len', 'file_len'}
+#
+# history_dict['col_list'] = [[column name, scale], ...]
+# history_dict['intf_index_dict'] = {intf: interface entry}
+#
+# Returns None with an error message if the file is not a history file
+#
+def open_history(history_name, writable = False):
+    try :
+        if writable:
+            history_handle = open(history_name, 'r+b')
+        else:
+            history_handle = open(history_name, 'rb')
+    except (IOError, OSError) as e:
+        return None, 'Open failed with {}'.format(e)
+    header_bytes = history_handle.read(struct.calcsize(history_header_format))
+    if len(header_bytes) != struct.calcsize(history_header_format):
+        history_handle.close()
+        return None, 'Not a history file'
+    magic, version, reserved, num_samples, max_intfs, num_cols, next_slot, resolution, last_sample_time = struct.unpack(history_header_format, header_bytes)
+    if magic != history_magic or version != history_version:
+        history_handle.close()
+        return None, 'Not a history file or created by another version of this script'
+    history_dict = {'handle': history_handle, 'num_samples': num_samples, 'max_intfs': max_intfs, 'next_slot': next_slot,
+                    'resolution': resolution, 'last_sample_time': last_sample_time, 'col_list': [], 'intfs_not_recorded': 0, 'intfs_not_recorded_warned': 0}
+    for col_num in range(num_cols):
+        col_name, scale = struct.unpack(history_column_format, history_handle.read(struct.calcsize(history_column_format)))
+        history_dict['col_list'].append([col_name.rstrip(b'\0').decode('utf-8'), scale])
+    get_history_layout(history_dict)
+    history_handle.seek(0, 2)
+    if history_handle.tell() != history_dict['file_len']:
+        history_handle.close()
+        return None, 'History file is truncated'
+    if writable:
+        history_dict['mmap'] = mmap.mmap(history_handle.fileno(), history_dict['file_len'])
+    else:
+        history_dict['mmap'] = mmap.mmap(history_handle.fileno(), history_dict['file_len'], access = mmap.ACCESS_READ)
+    history_dict['intf_index_dict'] = {}
+    intf_len = struct.calcsize(history_intf_format)
+    for intf_idx in range(max_intfs):
+        offset = history_dict['intfs_offset'] + intf_idx * intf_len
+        intf = history_dict['mmap'][offset:offset + intf_len].rstrip(b'\0').decode('utf-8')
+        if intf != '':
+            history_dict['intf_index_dict'][intf] = intf_idx
+    return history_dict, ''
+
+#
+# Create a history file sized for num_samples samples of max_intfs interfaces
+#
+def create_history(history_name, history_col_list, max_intfs, num_samples, resolution):
+    history_dict = {'num_samples': num_samples, 'max_intfs': max_intfs, 'col_list': [[col_entry[0], col_entry[3]] for col_entry in history_col_list]}
+    get_history_layout(history_dict)
+    history_handle = open(history_name, 'wb')
+    history_handle.write(struct.pack(history_header_format, history_magic, history_version, 0, num_samples, max_intfs, len(history_col_list), 0, resolution, 0))
+    for col_name, scale in history_dict['col_list']:
+        history_handle.write(struct.pack(history_column_format, col_name.encode('utf-8'), scale))
+    history_handle.truncate(history_dict['file_len'])
+    history_handle.close()
+
+#
+# Close a history file
+#
+def close_history(history_dict):
+    history_dict['mmap'].close()
+    history_dict['handle'].close()
+
+#
+# Write one sample to the next slot of a history file
+#
+# Interfaces not in the file yet use a free interface entry. Interfaces that do not fit are not recorded, their
+# number is history_dict['intfs_not_recorded'] for warn_history_intfs().
+#
+# Returns False if the sample was not written because it is less than the resolution after the last sample
+#
+def write_history_sample(history_dict, history_col_list, sample_time, intf_list, intf_table):
+    if sample_time - history_dict['last_sample_time'] < history_dict['resolution'] * 0.9:
+        return False
+    history_mmap = history_dict['mmap']
+    intf_len = struct.calcsize(history_intf_format)
+    slot_offset = history_dict['samples_offset'] + history_dict['next_slot'] * history_dict['max_intfs'] * history_dict['record_len']
+    record_list = [None] * history_dict['max_intfs']
+    intfs_not_recorded = 0
+    for intf in intf_list:
+        if intf not in history_dict['intf_index_dict']:
+            used_intf_idx_dict = dict.fromkeys(history_dict['intf_index_dict'].values())
+            free_intf_idx_list = [intf_idx for intf_idx in range(history_dict['max_intfs']) if intf_idx not in used_intf_idx_dict]
+            if not free_intf_idx_list:
+                intfs_not_recorded += 1
+                continue
+            history_dict['intf_index_dict'][intf] = free_intf_idx_list[0]
+            offset = history_dict['intfs_offset'] + free_intf_idx_list[0] * intf_len
+            history_mmap[offset:offset + intf_len] = struct.pack(history_intf_format, intf.encode('utf-8'))
+        intf_idx = history_dict['intf_index_dict'][intf]
+        value_list = []
+        for col_name, var_name, percentage_idx, scale in history_col_list:
+            var_value = get_intf_value(intf_table, intf, var_name)
+            if percentage_idx != -1:
+                numeric_value = get_percentage_values(get_display_value(var_value))
+                if numeric_value != None:
+                    numeric_value = numeric_value[percentage_idx]
+            elif isinstance(var_value, integer_types):
+                numeric_value = var_value
+            else:
+                numeric_value = get_numeric_value(get_display_value(var_value))
+            if numeric_value == None or not (history_missing < numeric_value * scale < -history_missing):
+                value_list.append(history_missing)
+            else:
+                value_list.append(int(round(numeric_value * scale)))
+        record_list[intf_idx] = struct.pack(history_dict['record_format'], sample_time, intf_idx, 0, *value_list)
+    empty_record = struct.pack(history_dict['record_format'], sample_time, history_no_intf, 0, *([history_missing] * len(history_col_list)))
+    history_mmap[slot_offset:slot_offset + history_dict['max_intfs'] * history_dict['record_len']] = b''.join([record if record != None else empty_record for record in record_list])
+    history_dict['next_slot'] = (history_dict['next_slot'] + 1) % history_dict['num_samples']
+    history_dict['last_sample_time'] = sample_time
+    history_dict['intfs_not_recorded'] = intfs_not_recorded
+    header_bytes = struct.pack(history_header_format, history_magic, history_version, 0, history_dict['num_samples'], history_dict['max_intfs'], len(history_col_list), history_dict['next_slot'], history_dict['resolution'], sample_time)
+    history_mmap[0:len(header_bytes)] = header_bytes
+    return True
+
+#
+# Open the --history file for writing, creating it if it does not exist
+#
+# The columns of an existing file must match the columns of this run
+#
+# A new file has room for max_intfs interfaces, or for the interfaces of intf_list if max_intfs is 0
+#
+# Returns None with an error message if the samples can not be recorded
+#
+def open_history_for_write(history_name, history_col_list, intf_list, retention, resolution, max_intfs = 0):
+    if not os.path.exists(history_name):
+        num_samples = max(retention // resolution, 1)
+        create_history(history_name, history_col_list, max(max_intfs or len(intf_list), 1), num_samples, resolution)
+    history_dict, error_str = open_history(history_name, True)
+    if history_dict == None:
+        return None, error_str
+    if [col_entry[0] for col_entry in history_dict['col_list']] != [col_entry[0] for col_entry in history_col_list]:
+        close_history(history_dict)
+        return None, 'History file has different counters. Use another file for each type of statistics'
+    return history_dict, ''
+
+#
+# Warn when interfaces did not fit in the history file, once for each number of interfaces not recorded
+#
+# The warning goes to stderr with --format so the records on stdout stay parseable
+#
+def warn_history_intfs(history_dict, history_name, args):
+    intfs_not_recorded = history_dict['intfs_not_recorded']
+    if intfs_not_recorded == 0 or intfs_not_recorded == history_dict['intfs_not_recorded_warned']:
+        return
+    history_dict['intfs_not_recorded_warned'] = intfs_not_recorded
+    warning_line = ('History file "' + history_name + '" has room for ' + str(history_dict['max_intfs']) + ' interfaces, ' + str(intfs_not_recorded) +
+                    ' interfaces not recorded. Create a new file with --history-max-intfs')
+    if args.output_format == 'table':
+        print(warning_line)
+    else:
+        sys.stderr.write(warning_line + '\n')
+
+#
+# Query the samples recorded in a history file
+#
+# For counters the query stat is computed from the delta between consecutive samples, counters lower than in the
+# previous sample were cleared so the delta is the new value:
+#
+# delta = sum of the deltas in the window
+# rate  = delta / time between the first and the last sample in the window
+# max   = highest per second rate between two consecutive samples
+# pNN   = NNth percentile of the per second rates between two consecutive samples (e.g. p95)
+#
+# For values that are not counters (transceiver values, TxWait percentages) delta and rate are the last value,
+# max and pNN are computed from the values.
+#
+# The query is computed for all interfaces of a column at once, with numpy if it is installed and with the
+# array module otherwise.
+#
+# Returns sample_time_list = [sample time, ...] of the samples in the window in time order
+# Returns query_value_list[col_num][intf entry] = value or None if not found
+#
+history_typecode = 'q'
+try :
+    array.array(history_typecode)
+except ValueError:
+    history_typecode = 'l'
+
+def is_history_counter(col_entry):
+    return col_entry[1] == 1 and col_entry[0].find('.') == -1
+
+def get_percentile(sorted_value_list, percent):
+    position = (len(sorted_value_list) - 1) * percent / 100.0
+    idx = int(position)
+    if idx + 1 >= len(sorted_value_list):
+        return sorted_value_list[idx]
+    return sorted_value_list[idx] + (sorted_value_list[idx + 1] - sorted_value_list[idx]) * (position - idx)
+
+def get_percentile_numpy(value_array, percent):
+    sorted_array = numpy.ascontiguousarray(value_array.T)
+    sorted_array.sort(axis = 1)
+    count_array = (~numpy.isnan(sorted_array)).sum(axis = 1)
+    position_array = numpy.maximum(count_array - 1, 0) * (percent / 100.0)
+    low_array = position_array.astype(int)
+    high_array = numpy.minimum(low_array + 1, numpy.maximum(count_array - 1, 0))
+    row_array = numpy.arange(len(sorted_array))
+    low_value_array = sorted_array[row_array, low_array]
+    return low_value_array + (sorted_array[row_array, high_array] - low_value_array) * (position_array - low_array)
+
+#
+# Get the samples recorded in the history file from window_start on, [[sample time, offset of its slot], ...] oldest first
+#
+def get_history_window_slots(history_dict, window_start):
+    slot_len = history_dict['max_intfs'] * history_dict['record_len']
+    slot_time_list = []
+    for slot_num in range(history_dict['num_samples']):
+        offset = history_dict['samples_offset'] + slot_num * slot_len
+        slot_time = struct.unpack('<d', history_dict['mmap'][offset:offset + 8])[0]
+        if slot_time >= window_start:
+            slot_time_list.append([slot_time, offset])
+    slot_time_list.sort()
+    return slot_time_list
+
+#
+# The query functions return sample_time_list and query_value_list = [[value of each interface or None], ...] per
+# column. A delta or rate needs two samples, so with fewer than two samples in the window every value is None.
+#
+def query_history_numpy(history_dict, window_start, query_stat):
+    num_cols = len(history_dict['col_list'])
+    max_intfs = history_dict['max_intfs']
+    record_dtype = numpy.dtype([('time', '<f8'), ('intf', '<u4'), ('reserved', '<u4'), ('values', '<i8', (num_cols,))])
+    record_array = numpy.frombuffer(history_dict['mmap'], dtype = record_dtype, count = history_dict['num_samples'] * max_intfs, offset = history_dict['samples_offset']).reshape(history_dict['num_samples'], max_intfs)
+    slot_time_array = record_array['time'][:, 0]
+    slot_array = numpy.nonzero(slot_time_array >= window_start)[0]
+    slot_array = slot_array[numpy.argsort(slot_time_array[slot_array], kind = 'mergesort')]
+    sample_time_array = slot_time_array[slot_array]
+    if len(sample_time_array) < 2:
+        sample_time_list = sample_time_array.tolist()
+        del record_array, slot_time_array
+        return sample_time_list, [[None] * max_intfs for col_num in range(num_cols)]
+    query_value_list = []
+    for col_num, col_entry in enumerate(history_dict['col_list']):
+        value_array = record_array['values'][slot_array, :, col_num]
+        missing_array = value_array == history_missing
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            if is_history_counter(col_entry):
+                invalid_array = missing_array[1:] | missing_array[:-1]
+                delta_array = value_array[1:] - value_array[:-1]
+                delta_array = numpy.where(delta_array < 0, value_array[1:], delta_array)
+                delta_array[invalid_array] = 0
+                found_array = ~invalid_array.all(axis = 0)
+                if query_stat == 'delta':
+                    result_array = delta_array.sum(axis = 0).astype(float)
+                elif query_stat == 'rate':
+                    result_array = delta_array.sum(axis = 0) / float(max(sample_time_array[-1] - sample_time_array[0], 1e-9))
+                else:
+                    rate_array = delta_array / numpy.maximum(sample_time_array[1:] - sample_time_array[:-1], 1e-9)[:, None]
+                    rate_array[invalid_array] = numpy.nan
+                    if query_stat == 'max':
+                        result_array = numpy.nanmax(rate_array, axis = 0)
+                    else:
+                        result_array = get_percentile_numpy(rate_array, float(query_stat[1:]))
+            else:
+                float_array = value_array / float(col_entry[1])
+                float_array[missing_array] = numpy.nan
+                found_array = ~missing_array.all(axis = 0)
+                if query_stat == 'delta' or query_stat == 'rate':
+                    last_slot_array = len(slot_array) - 1 - numpy.argmax(~missing_array[::-1], axis = 0)
+                    result_array = float_array[last_slot_array, numpy.arange(max_intfs)]
+                elif query_stat == 'max':
+                    result_array = numpy.nanmax(float_array, axis = 0)
+                else:
+                    result_array = get_percentile_numpy(float_array, float(query_stat[1:]))
+        query_value_list.append([float(result) if found else None for result, found in zip(result_array.tolist(), found_array.tolist())])
+    sample_time_list = sample_time_array.tolist()
+    del record_array, slot_time_array
+    return sample_time_list, query_value_list
+
+def query_history_array(history_dict, window_start, query_stat):
+    num_cols = len(history_dict['col_list'])
+    max_intfs = history_dict['max_intfs']
+    slot_len = max_intfs * history_dict['record_len']
+    record_words = history_dict['record_len'] // 8
+    #
+    # Read the samples in the window, each as an array of the words of its records
+    #
+    slot_time_list = get_history_window_slots(history_dict, window_start)
+    if len(slot_time_list) < 2:
+        return [slot_time for slot_time, offset in slot_time_list], [[None] * max_intfs for col_num in range(num_cols)]
+    slot_array_list = []
+    for slot_time, offset in slot_time_list:
+        slot_array = array.array(history_typecode)
+        if hasattr(slot_array, 'frombytes'):
+            slot_array.frombytes(history_dict['mmap'][offset:offset + slot_len])
+        else:
+            slot_array.fromstring(history_dict['mmap'][offset:offset + slot_len])
+        if sys.byteorder != 'little':
+            slot_array.byteswap()
+        slot_array_list.append(slot_array)
+    sample_time_list = [slot_time for slot_time, offset in slot_time_list]
+    elapsed_list = [max(sample_time - prev_sample_time, 1e-9) for prev_sample_time, sample_time in zip(sample_time_list[:-1], sample_time_list[1:])]
+    query_value_list = []
+    for col_num, col_entry in enumerate(history_dict['col_list']):
+        #
+        # Column of all interfaces in each sample, then the samples of each interface
+        #
+        col_array_list = [slot_array[2 + col_num::record_words] for slot_array in slot_array_list]
+        query_values = []
+        if is_history_counter(col_entry):
+            delta_list_list = [[(value - prev_value if value >= prev_value else value) if value != history_missing and prev_value != history_missing else None for prev_value, value in zip(prev_col_array, col_array)] for prev_col_array, col_array in zip(col_array_list[:-1], col_array_list[1:])]
+            for intf_delta_list in zip(*delta_list_list):
+                if query_stat == 'delta' or query_stat == 'rate':
+                    found_delta_list = [delta for delta in intf_delta_list if delta != None]
+                    if not found_delta_list:
+                        query_values.append(None)
+                    elif query_stat == 'delta':
+                        query_values.append(float(sum(found_delta_list)))
+                    else:
+                        query_values.append(sum(found_delta_list) / float(max(sample_time_list[-1] - sample_time_list[0], 1e-9)))
+                else:
+                    rate_list = sorted([delta / elapsed for delta, elapsed in zip(intf_delta_list, elapsed_list) if delta != None])
+                    if not rate_list:
+                        query_values.append(None)
+                    elif query_stat == 'max':
+                        query_values.append(rate_list[-1])
+                    else:
+                        query_values.append(get_percentile(rate_list, float(query_stat[1:])))
+        else:
+            for intf_value_list in zip(*col_array_list):
+                value_list = [value / float(col_entry[1]) for value in intf_value_list if value != history_missing]
+                if not value_list:
+                    query_values.append(None)
+                elif query_stat == 'delta' or query_stat == 'rate':
+                    query_values.append(value_list[-1])
+                elif query_stat == 'max':
+                    query_values.append(max(value_list))
+                else:
+                    query_values.append(get_percentile(sorted(value_list), float(query_stat[1:])))
+        if len(query_values) < max_intfs:
+            query_values = [None] * max_intfs
+        query_value_list.append(query_values)
+    return sample_time_list, query_value_list
+
+#
+# Format a query value for the table
+#
+def format_query_value(query_value, col_entry, query_stat):
+    if query_value == None:
+        return 'NF'
+    if is_history_counter(col_entry):
+        if query_stat == 'delta':
+            return str(int(query_value))
+        if query_value == 0:
+            return '0'
+        return '%.1f' % query_value
+    if col_entry[1] != 1:
+        return '%.2f' % query_value
+    if query_value == int(query_value):
+        return str(int(query_value))
+    return '%.1f' % query_value
+
+#
+# Display a table of the query stat over the last window seconds of a history file
+#
+def print_history_query(history_name, window, query_stat, args, outfile_handle):
+    history_dict, error_str = open_history(history_name)
+    if history_dict == None:
+        print('Unable to query history: "' + history_name + '". ' + error_str)
+        return
+    window_start = max(time.time() - window, 1e-9)
+    #
+    # A delta or rate needs two samples in the window
+    #
+    if len(get_history_window_slots(history_dict, window_start)) < 2:
+        close_history(history_dict)
+        print('Not enough samples in history: "' + history_name + '" for the last ' + str(window) + ' seconds')
+        return
+    if numpy != None:
+        sample_time_list, query_value_list = query_history_numpy(history_dict, window_start, query_stat)
+    else:
+        sample_time_list, query_value_list = query_history_array(history_dict, window_start, query_stat)
+    col_list = history_dict['col_list']
+    intf_index_list = sorted(history_dict['intf_index_dict'].items(), key = lambda intf_entry: intf_entry[1])
+    close_history(history_dict)
+    #
+    # Build a counter_list with one column per history column so the table is built like the other tables
+    #
+    query_counter_list = []
+    for col_entry in col_list:
+        if query_stat == 'delta' or query_stat == 'rate':
+            stat_name = query_stat.capitalize() if is_history_counter(col_entry) else 'Last'
+        else:
+            stat_name = query_stat.capitalize()
+        if query_stat != 'delta' and is_history_counter(col_entry):
+            stat_name += '/s'
+        col_name = col_entry[0][5:] if col_entry[0][:5] == 'intf_' else col_entry[0]
+        query_counter_list.append([[0], [[[stat_name, col_name], ['%' + col_entry[0]]]]])
+    query_table = create_intf_table(['description'] + [col_entry[0] for col_entry in col_list])
+    intf_list = []
+    for intf, intf_idx in intf_index_list:
+        intf_list.append(intf)
+        set_intf_value(query_table, intf, 'description', '')
+        for col_num, col_entry in enumerate(col_list):
+            set_intf_value(query_table, intf, col_entry[0], format_query_value(query_value_list[col_num][intf_idx], col_entry, query_stat))
+    query_column_names_list, query_column_widths_list, query_default_intf_dict = build_columns(query_counter_list)
+    if not check_sort_column(query_counter_list, query_column_names_list, args):
+        return
+    output_table_list = build_table_rows(query_counter_list, intf_list, query_table, query_column_widths_list, args)
+    first_datetime = datetime.datetime.fromtimestamp(sample_time_list[0]).strftime('%Y/%m/%d %H:%M:%S')
+    last_datetime = datetime.datetime.fromtimestamp(sample_time_list[-1]).strftime('%Y/%m/%d %H:%M:%S')
+    clock_type_line = datetime.datetime.today().strftime('%Y/%m/%d %H:%M:%S') + ' History ' + query_stat + ' of ' + str(len(sample_time_list)) + ' samples from ' + first_datetime + ' to ' + last_datetime + ':'
+    print_table(clock_type_line, query_column_names_list, query_column_widths_list, output_table_list, query_table, 0, args, outfile_handle)
+
+##############################################################################
+# Exporter
+##############################################################################
+#
+# --exporter serves the counters of all the interfaces as Prometheus metrics on http://address:port/metrics
+#
+# A scrape uses the sample collected by an earlier scrape if it is less than --exporter-refresh seconds old, so
+# scrapers that scrape at the same time or more often than --exporter-refresh share one collection. A scrape
+# that arrives while a collection is running waits for it and uses its sample.
+#
+# Each variable of the counters detailed and transceiver counter_lists is a metric named mds_<variable name>,
+# labeled with the interface, its VSAN, operational mode and logical type from show interface brief, and the
+# device-alias or switchname of the peer. Counters end in _total. The TxWait % last 1s/1m/1h/72h variable is one
+# metric with a window label. The SFP name, PID, serial number and sync state are the labels of mds_intf_sfp_info.
+#
+exporter_metric_prefix = 'mds_'
+exporter_counter_stat_type_list = ['type_link_stats', 'type_congestion_stats', 'type_general_stats']
+exporter_info_var_dict = {'intf_sfp_name': 'name', 'intf_sfp_pid': 'pid', 'intf_sfp_sn': 'sn', 'intf_sfp_sync': 'sync'}
+exporter_label_var_list = [['vsan', 'vsan'], ['oper_mode', 'oper_mode'], ['logical_type', 'logical_type'], ['device_alias_or_switchname', 'peer']]
+
+#
+# Build the metrics of the counters detailed and transceiver counter_lists
+#
+# Returns counter_list, metric_list = [[variable name, metric name, help, 'counter', 'percentage' or 'gauge'], ...]
+#
+def build_exporter_metrics(show_int_counter_detail_new):
+    counter_list = merge_counter_lists([build_counter_list(stat_type, show_int_counter_detail_new)[1] for stat_type in exporter_counter_stat_type_list])
+    counter_var_list = get_var_list(counter_list)
+    counter_list = merge_counter_lists([counter_list, build_counter_list('type_sfp_detail_stats', show_int_counter_detail_new)[1]])
+    metric_list = []
+    for line_entry in counter_list:
+        for counter_entry in line_entry[1]:
+            if counter_entry[0] == '&':
+                continue
+            var_name = [pattern_entry[1:] for pattern_entry in counter_entry[1] if pattern_entry[0:1] == '%'][0]
+            if var_name in exporter_info_var_dict or [metric_entry for metric_entry in metric_list if metric_entry[0] == var_name]:
+                continue
+            metric_help = ' '.join(counter_entry[0])
+            if var_name == 'intf_txwait_1s1m1h72h':
+                metric_list.append([var_name, exporter_metric_prefix + var_name + '_percent', metric_help, 'percentage'])
+            elif var_name in counter_var_list:
+                metric_list.append([var_name, exporter_metric_prefix + var_name + '_total', metric_help, 'counter'])
+            else:
+                metric_list.append([var_name, exporter_metric_prefix + var_name, metric_help, 'gauge'])
+    return counter_list, metric_list
+
+#
+# Escape a Prometheus label value, a value of the interface table that was not found is empty
+#
+def get_exporter_label_value(value):
+    if value == None:
+        return ''
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+#
+# Format the metrics of the interfaces in intf_list in the Prometheus text format
+#
+# Returns the metrics as a string
+#
+def format_exporter_metrics(metric_list, intf_list, intf_table):
+    label_dict = {}
+    for intf in intf_list:
+        label_dict[intf] = 'interface="' + get_exporter_label_value(intf) + '"' + ''.join([',' + label_name + '="' + get_exporter_label_value(get_intf_value(intf_table, intf, var_name)) + '"' for var_name, label_name in exporter_label_var_list])
+    metric_line_list = []
+    for var_name, metric_name, metric_help, metric_type in metric_list:
+        metric_line_list.append('# HELP ' + metric_name + ' ' + metric_help)
+        metric_line_list.append('# TYPE ' + metric_name + ' ' + ('counter' if metric_type == 'counter' else 'gauge'))
+        for intf in intf_list:
+            var_value = get_intf_value(intf_table, intf, var_name)
+            if var_value == None:
+                continue
+            if isinstance(var_value, integer_types):
+                if metric_type != 'percentage':
+                    metric_line_list.append(metric_name + '{' + label_dict[intf] + '} ' + str(var_value))
+            elif metric_type == 'percentage':
+                percentage_list = get_percentage_values(var_value)
+                if percentage_list == None:
+                    continue
+                for window, percentage in zip(txwait_percentage_list, percentage_list):
+                    metric_line_list.append(metric_name + '{' + label_dict[intf] + ',window="' + window + '"} ' + str(percentage))
+            else:
+                numeric_value = get_numeric_value(var_value)
+                if numeric_value != None:
+                    metric_line_list.append(metric_name + '{' + label_dict[intf] + '} ' + str(numeric_value))
+    metric_name = exporter_metric_prefix + 'intf_sfp_info'
+    metric_line_list.append('# HELP ' + metric_name + ' Transceiver(SFP) name, PID, serial number and sync state')
+    metric_line_list.append('# TYPE ' + metric_name + ' gauge')
+    for intf in intf_list:
+        if get_intf_value(intf_table, intf, 'intf_sfp_name') == None:
+            continue
+        metric_line_list.append(metric_name + '{' + label_dict[intf] + ''.join([',' + label_name + '="' + get_exporter_label_value(get_intf_value(intf_table, intf, var_name)) + '"' for var_name, label_name in sorted(exporter_info_var_dict.items())]) + '} 1')
+    return '\n'.join(metric_line_list) + '\n'
+
+#
+# Collect a sample of the counters of all the interfaces and format it as metrics
+#
+# The show commands are issued at the same time. show version is only issued by the first collection.
+#
+# Returns the metrics as a string or None if show interface brief or the counters could not be collected
+#
+def collect_exporter_metrics(exporter_dict, args):
+    intf_range = exporter_dict['intf_range']
+    port_type_filter = exporter_dict['port_type_filter']
+    show_int_brief_cmd = 'show interface ' + intf_range + 'brief'
+    show_topo_cmd = 'show topology'
+    show_flogi_database_cmd = 'show flogi database |  i \\[ p 1'
+    show_ver_cmd = 'show version'
+    show_int_cmd = 'show interface ' + intf_range + 'counters detailed'
+    show_int_sfp_cmd = 'show interface ' + intf_range + ' transceiver'
+    cli_cmd_list = [
+        [show_int_brief_cmd, show_int_brief_cmd, show_int_brief_cmd],
+        [show_topo_cmd, show_topo_cmd, show_topo_cmd],
+        [show_flogi_database_cmd, '"show flogi database | \\["', ''],
+        [show_int_cmd, show_int_cmd, show_int_cmd],
+        [show_int_sfp_cmd, show_int_sfp_cmd, ''],
+    ]
+    if exporter_dict['metric_list'] == None:
+        cli_cmd_list.append([show_ver_cmd, '"show version"', show_ver_cmd])
+    if not args.use_json:
+        for cli_cmd_entry in cli_cmd_list:
+            cli_cmd_entry[2] = ''
+    cli_output_dict = issue_cli_commands(cli_cmd_list, args.cli_timeout, args.serial)
+
+    if exporter_dict['metric_list'] == None:
+        show_int_counter_detail_new = None
+        show_ver_json = cli_output_dict.get((show_ver_cmd, True))
+        if show_ver_json != None:
+            show_int_counter_detail_new = parse_show_version_json(show_ver_json)
+        if show_int_counter_detail_new == None:
+            show_int_counter_detail_new = parse_show_version(get_cli_output(cli_output_dict, show_ver_cmd, '"show version"'))
+        counter_list, exporter_dict['metric_list'] = build_exporter_metrics(show_int_counter_detail_new)
+        exporter_dict['default_intf_dict'] = build_columns(counter_list)[2]
+        intf_table = create_intf_table(intf_info_var_list)
+        exporter_dict['counter_index_dict'] = compile_counter_list(counter_list, intf_table)
+        exporter_dict['var_list'] = intf_table['var_list']
+
+    intf_table = create_intf_table(exporter_dict['var_list'])
+    intf_list = []
+    port_channel_dict = {}
+    show_int_brief_json = cli_output_dict.get((show_int_brief_cmd, True))
+    if show_int_brief_json == None or not parse_show_int_brief_json(show_int_brief_json, port_type_filter, args, intf_table, intf_list, port_channel_dict):
+        parse_show_int_brief(get_cli_output(cli_output_dict, show_int_brief_cmd), port_type_filter, args, intf_table, intf_list, port_channel_dict)
+    topology_list = None
+    show_topo_json = cli_output_dict.get((show_topo_cmd, True))
+    if show_topo_json != None:
+        topology_list = parse_show_topology_json(show_topo_json)
+    if topology_list == None:
+        topology_list = parse_show_topology(get_cli_output(cli_output_dict, show_topo_cmd))
+    set_topology(topology_list, intf_table, port_channel_dict)
+    set_flogi(parse_show_flogi_database(get_cli_output(cli_output_dict, show_flogi_database_cmd)), intf_table)
+    #
+    # Only the interfaces of show interface brief are kept, as with a port type filter
+    #
+    parse_show_int_counters_outputs(cli_output_dict, [cli_cmd_list[3], cli_cmd_list[4]], exporter_dict['counter_index_dict'], exporter_dict['default_intf_dict'], True, intf_table, intf_list,
+                                    block_cache_dict = exporter_dict['block_cache_dict'])
+    if not intf_list or cli_output_dict.get((show_int_cmd, False)) == '':
+        return None
+    exporter_dict['intfs'] = len(intf_list)
+    return format_exporter_metrics(exporter_dict['metric_list'], intf_list, intf_table)
+
+#
+# Get the metrics for a scrape, collecting a new sample if the last one is --exporter-refresh seconds old
+#
+# A collection that fails keeps the metrics of the last sample, so the sample age metric shows how stale they are
+#
+def get_exporter_metrics(exporter_dict, args):
+    exporter_dict['lock'].acquire()
+    try :
+        exporter_dict['scrapes'] += 1
+        if time.time() - exporter_dict['collect_time'] >= args.exporter_refresh:
+            reset_timing()
+            collect_start = time.time()
+            try :
+                metrics = collect_exporter_metrics(exporter_dict, args)
+            except Exception as e:
+                print('Exporter collection failed with {}'.format(e))
+                metrics = None
+            exporter_dict['collect_time'] = time.time()
+            exporter_dict['collections'] += 1
+            exporter_dict['duration'] = exporter_dict['collect_time'] - collect_start
+            if metrics == None:
+                exporter_dict['errors'] += 1
+                exporter_dict['success'] = 0
+            else:
+                exporter_dict['metrics'] = metrics
+                exporter_dict['sample_time'] = collect_start
+                exporter_dict['success'] = 1
+        now = time.time()
+        exporter_metric_list = [
+            ['collections_total', 'counter', 'Collections of the show command outputs', exporter_dict['collections']],
+            ['collection_errors_total', 'counter', 'Collections that failed and kept the last sample', exporter_dict['errors']],
+            ['scrapes_total', 'counter', 'Scrapes, including the scrapes that used the last sample', exporter_dict['scrapes']],
+            ['collection_duration_seconds', 'gauge', 'Seconds the last collection took', exporter_dict['duration']],
+            ['last_collection_success', 'gauge', '1 if the last collection succeeded', exporter_dict['success']],
+            ['sample_timestamp_seconds', 'gauge', 'Time the sample of the metrics was collected', exporter_dict['sample_time']],
+            ['sample_age_seconds', 'gauge', 'Seconds since the sample of the metrics was collected', now - exporter_dict['sample_time'] if exporter_dict['sample_time'] else 0],
+            ['interfaces', 'gauge', 'Interfaces in the sample', exporter_dict['intfs']],
+        ]
+        metric_line_list = []
+        for metric_name, metric_type, metric_help, metric_value in exporter_metric_list:
+            metric_name = exporter_metric_prefix + 'exporter_' + metric_name
+            metric_line_list.extend(['# HELP ' + metric_name + ' ' + metric_help, '# TYPE ' + metric_name + ' ' + metric_type, metric_name + ' ' + str(metric_value)])
+        return exporter_dict['metrics'] + '\n'.join(metric_line_list) + '\n'
+    finally:
+        exporter_dict['lock'].release()
+
+#
+# Serve the metrics until interrupted
+#
+def run_exporter(intf_range, port_type_filter, args):
+    exporter_dict = {
+        'lock': threading.Lock(),
+        'intf_range': intf_range,
+        'port_type_filter': port_type_filter,
+        'metric_list': None,
+        'default_intf_dict': None,
+        'counter_index_dict': None,
+        'metrics': '',
+        'collect_time': 0.0,
+        'sample_time': 0.0,
+        'duration': 0.0,
+        'collections': 0,
+        'errors': 0,
+        'scrapes': 0,
+        'success': 0,
+        'intfs': 0,
+        'block_cache_dict': {},
+    }
+
+    class ExporterHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            metrics = get_exporter_metrics(exporter_dict, args).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(metrics)))
+            self.end_headers()
+            self.wfile.write(metrics)
+
+        def log_message(self, format, *log_args):
+            pass
+
+    try :
+        server = ThreadingHTTPServer((args.exporter_address, args.exporter), ExporterHandler)
+    except Exception as e:
+        print('Unable to start exporter on ' + args.exporter_address + ':' + str(args.exporter) + '. Failed with {}'.format(e))
+        sys.exit(1)
+    print('Serving metrics on http://' + args.exporter_address + ':' + str(args.exporter) + '/metrics')
+    sys.stdout.flush()
+    try :
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+#
+# Daemon: stay resident and run the requests of show_int_client.py
+#
+# Each request is the arguments of a run of show_int_tabular.py. It is run by main() in the daemon with stdout and
+# stderr sent back to the client, so a request does not pay for starting the interpreter and importing the modules.
+# The NX-OS version detected by the first request is kept, so show version is not issued again (--refresh issues
+# it again), and the --cache is kept in memory instead of being loaded for every request. Requests are run one at a
+# time, as the runs share timing_dict, stdout and the cli module.
+#
+# request  = length of the arguments (uint32) + the arguments separated by '\0' (utf-8)
+# response = frames of type (1 byte) + length of the data (uint32) + data: 'o' stdout, 'e' stderr and a last 'x'
+#            with the exit status of the run
+#
+# show_int_client.py has its own copy of daemon_default_socket and the formats, so it does not import this module.
+#
+daemon_default_socket = '/tmp/show_int_tabular.sock'
+daemon_request_header_format = '<I'
+daemon_frame_header_format = '<cI'
+daemon_output_chunk_len = 65536
+daemon_dict = {'socket': None, 'counter_detail_new': None, 'cache_dicts': {}, 'requests': 0}
+
+#
+# Send a frame of the response of a request
+#
+def send_daemon_frame(connection, frame_type, data):
+    if not isinstance(data, bytes):
+        data = data.encode('utf-8')
+    connection.sendall(struct.pack(daemon_frame_header_format, frame_type, len(data)) + data)
+
+#
+# Run the arguments of a request with main()
+#
+# Returns the exit status of the run
+#
+def run_daemon_request(argv):
+    saved_argv = sys.argv
+    sys.argv = [saved_argv[0]] + argv
+    try :
+        main(argv)
+        exit_status = 0
+    except SystemExit as e:
+        if e.code == None:
+            exit_status = 0
+        elif isinstance(e.code, integer_types):
+            exit_status = e.code
+        else:
+            sys.stderr.write(str(e.code) + '\n')
+            exit_status = 1
+    finally:
+        sys.argv = saved_argv
+    return exit_status
+
+#
+# Serve the requests on the Unix domain socket until interrupted
+#
+def run_daemon(socket_name):
     #
-    # All done 
-    # Create header_trailer and seperator lines
-    # print out table
+    # Remove the socket of a daemon that is no longer running, but not the socket of one that is
     #
-    header_trailer = ' '
-    seperator = '+'
-    for column_width in column_widths_list:
-        header_trailer += ''.ljust(column_width + 1,'-') + '-+'
-        seperator += ''.ljust(column_width + 1,'-') + '-+'
+    if os.path.exists(socket_name):
+        probe_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try :
+            probe_socket.connect(socket_name)
+            probe_socket.close()
+            print('A daemon is already running on ' + socket_name)
+            sys.exit(1)
+        except socket.error:
+            probe_socket.close()
+            os.unlink(socket_name)
+
     #
-    # Add Description if requested
+    # Write the output of a request to the client, a frame every daemon_output_chunk_len bytes and on flush()
     #
-    if args.include_description:
-        header_trailer += ''.ljust(max_descr_len + 1,'-') + '-+'
-        seperator += ''.ljust(max_descr_len + 1,'-') + '-+'
-        
-    header_trailer = header_trailer[:-1]
-    
-    clock_type_line = current_datetime + ' ' + type_line
+    class DaemonOutput(object):
+        def __init__(self, connection, frame_type):
+            self.connection = connection
+            self.frame_type = frame_type
+            self.output_list = []
+            self.output_len = 0
 
-    columns = len(output_table_list[0])
-    if outfile_name == '':
-        print(clock_type_line)
-        print(header_trailer)
-        #
-        # Print 2 or 3 header lines - left justify
+        def write(self, output):
+            self.output_list.append(output)
+            self.output_len += len(output)
+            if self.output_len >= daemon_output_chunk_len:
+                self.flush()
+
+        def flush(self):
+            if self.output_list:
+                output = ''.join(self.output_list)
+                self.output_list = []
+                self.output_len = 0
+                send_daemon_frame(self.connection, self.frame_type, output)
+
+    class DaemonHandler(StreamRequestHandler):
+        def handle(self):
+            request_header = self.rfile.read(struct.calcsize(daemon_request_header_format))
+            if len(request_header) != struct.calcsize(daemon_request_header_format):
+                return
+            request = self.rfile.read(struct.unpack(daemon_request_header_format, request_header)[0]).decode('utf-8')
+            argv = request.split('\0') if request else []
+            saved_stdout = sys.stdout
+            saved_stderr = sys.stderr
+            sys.stdout = DaemonOutput(self.connection, b'o')
+            sys.stderr = DaemonOutput(self.connection, b'e')
+            daemon_dict['requests'] += 1
+            #
+            # A client that goes away fails the next write of the request and the send of the exit status
+            #
+            try :
+                try :
+                    exit_status = run_daemon_request(argv)
+                except Exception as e:
+                    print('Request failed with {}'.format(e))
+                    exit_status = 1
+                sys.stdout.flush()
+                sys.stderr.flush()
+                send_daemon_frame(self.connection, b'x', str(exit_status))
+            except socket.error:
+                pass
+            finally:
+                sys.stdout = saved_stdout
+                sys.stderr = saved_stderr
+
+    try :
+        server = UnixStreamServer(socket_name, DaemonHandler)
+    except Exception as e:
+        print('Unable to start daemon on ' + socket_name + '. Failed with {}'.format(e))
+        sys.exit(1)
+    daemon_dict['socket'] = socket_name
+    print('Serving requests on ' + socket_name)
+    sys.stdout.flush()
+    try :
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+    daemon_dict['socket'] = None
+    os.unlink(socket_name)
+
+#
+# Build the counter_list of a stat type
+#
+# stat_type is the args attribute of the type, e.g. 'type_link_stats'
+#
+# Returns type_line, counter_list
+#
+def build_counter_list(stat_type, show_int_counter_detail_new):
+    #
+    # If general-stats, link-stats or congestion-stats issue show interface counters detailed command
+    #
+    if stat_type in ['type_link_stats', 'type_congestion_stats', 'type_general_stats']:
         #
-        for row_num in range(len(column_names_list)):
-            #header_str = '| ' + output_table_list[row_num][0].ljust(column_widths_list[0] +1)
-            header_str = ''
-            for column_num in column_number_list:
-                header_str += '| ' + column_names_list[row_num][column_num].ljust(column_widths_list[column_num] +1)
-            if args.include_description and row_num == 0:
-                header_str += '| ' + ''.ljust(max_descr_len +1)
-            if args.include_description and row_num == 1:
-                header_str += '| ' + 'Description'.ljust(max_descr_len +1)
-            header_str += '|'
-            print(header_str)
+        # Counter_list = [
+        #                [[number of tokens on line], [[Heading, [%variable_name, match keyword 1, match keyword 2, ..., match keyword n]]]],
+        #                ...
+        #                ]
         #
-        # print seperator line after header lines
+        # --link-stats
         #
-        print(seperator)
+        if stat_type == 'type_link_stats':
+            type_line = 'Link Stats:'
+            link_failures_col = ['Link','Failures']
+            sync_loss_col = ['Sync', 'Loss']
+            signal_loss_col = ['Signal','Loss']
+            invalid_words_col = ['Invalid','Words']
+            invalid_crcs_col = ['Invalid','CRCs']
+            nos_rx_col = ['NOS','Rx']
+            nos_tx_col = ['NOS','Tx']
+            ols_rx_col = ['OLS','Rx']
+            ols_tx_col = ['OLS','Tx']
+            lrr_rx_col = ['LRR','Rx']
+            lrr_tx_col = ['LRR','Tx']
+            fec_corrected_col = ['FEC','Corrected']
+            fec_uncorrected_col = ['FEC','Uncorrected']
+            bb_scs_col = ['','BB_SCs']
+            bb_scr_col = ['','BB_SCr']
+        
+            if show_int_counter_detail_new:
+                counter_list = [ 
+                                [[4], [[link_failures_col, ['Rx', 'Link', 'failures:', '%intf_link_failures']]]],
+                                [[4], [[sync_loss_col, ['Rx', 'Sync' , 'losses:', '%intf_sync_losses']]]], 
+                                [[4], [[signal_loss_col, ['Rx', 'Signal', 'losses:', '%intf_sig_loss']]]],
+                                [[5], [[invalid_words_col, ['Rx', 'Invalid', 'transmission', 'words:', '%intf_invalid_tx_words']]]],
+                                [[4], [[invalid_crcs_col, ['Rx', 'Invalid', 'CRCs:', '%intf_invalid_crcs']]]],
+                                [[4], [[nos_rx_col, ['Rx', 'Non-Operational', 'Sequences(NOS):', '%intf_nos_rx']]]],
+                                [[4], [[nos_tx_col, ['Tx', 'Non-Operational', 'Sequences(NOS):', '%intf_nos_tx']]]],
+                                [[4], [[ols_rx_col, ['Rx', 'Offline', 'Sequences(OLS):', '%intf_ols_rx']]]],
+                                [[4], [[ols_tx_col, ['Tx', 'Offline', 'Sequences(OLS):', '%intf_ols_tx']]]],
+                                [[5], [[lrr_rx_col, ['Rx', 'Link', 'Reset', 'Responses(LRR):', '%intf_lrr_rx']]]],
+                                [[5], [[lrr_tx_col, ['Tx', 'Link', 'Reset', 'Responses(LRR):', '%intf_lrr_tx']]]],
+                                [[5], [[fec_corrected_col, ['Rx', 'FEC', 'corrected', 'blocks:', '%intf_fec_corrected']]]],
+                                [[5], [[fec_uncorrected_col, ['Rx', 'FEC', 'uncorrected', 'blocks:', '%intf_fec_uncorrected']]]],
+                                [[5], [[bb_scs_col, ['BB_SCs', 'credit', 'resend', 'actions:', '%intf_bbscs']]]], 
+                                [[6], [[bb_scr_col, ['BB_SCr', 'Tx', 'credit', 'increment', 'actions:', '%intf_bbscr']]]],
+                                ]
+        
+            else:
+                counter_list = [ 
+                                [[9], [[link_failures_col, ['%intf_link_failures', 'link', 'failures,']], [sync_loss_col, ['.', '.', '.', '%intf_sync_losses', 'sync' , 'losses,']], [signal_loss_col, ['.', '.', '.', '.', '.', '.','%intf_sig_loss', 'signal', 'losses']]]],
+                                [[4], [[invalid_words_col, ['%intf_invalid_tx_words', 'invalid', 'transmission', 'words']]]],
+                                [[6], [[invalid_crcs_col, ['%intf_invalid_crcs', 'invalid', 'CRCs,']]]],
+                                [[4], [[nos_rx_col, ['%intf_nos_rx', 'non-operational', 'sequences', 'received']]]],
+                                [[4], [[nos_tx_col, ['%intf_nos_tx', 'non-operational', 'sequences', 'transmitted']]]],
+                                [[5], [[ols_rx_col, ['%intf_ols_rx', 'Offline', 'Sequence', 'errors', 'received']]]],
+                                [[5], [[ols_tx_col, ['%intf_ols_tx', 'Offline', 'Sequence', 'errors', 'transmitted']]]],
+                                [[5], [[lrr_rx_col, ['%intf_lrr_rx', 'link', 'reset', 'responses', 'received']]]],
+                                [[5], [[lrr_tx_col, ['%intf_lrr_tx', 'link', 'reset', 'responses', 'transmitted']]]],
+                                [[4], [[fec_corrected_col, ['%intf_fec_corrected', 'fec', 'corrected', 'blocks']]]],
+                                [[4], [[fec_uncorrected_col, ['%intf_fec_uncorrected', 'fec', 'uncorrected', 'blocks']]]],
+                                [[11],[[bb_scs_col, ['%intf_bbscs', 'BB_SCs', 'credit', 'resend', 'actions,']], [bb_scr_col, ['.', '.', '.', '.', '.', '%intf_bbscr', 'BB_SCr', 'Tx', 'credit', 'increment', 'actions']]]],
+                                ]
+        #       
+        # --congestion-stats
         #
-        # print intf data lines
+        elif stat_type == 'type_congestion_stats':
+            type_line = 'Congestion Stats:'
+            tbbz_col = ['','TBBZ']
+            rbbz_col = ['','RBBZ']
+            txwait_col = ['','TxWait']
+            txwait_1s1m1h72h_col = ['TxWait % last', '1s/1m/1h/72h']
+            timeout_discards_col = ['Timeout','Discards']
+            credit_loss_col = ['Credit','Loss']
+            active_lr_rx_col = ['Active','LR Rx']
+            active_lr_tx_col = ['Active','LR Tx']
+            lrr_rx_col = ['LRR','Rx']
+            lrr_tx_col = ['LRR','Tx']
+            if show_int_counter_detail_new:
+                counter_list = [
+                                [[7], [[tbbz_col, ['Tx',  'B2B', 'credit', 'transitions', 'to', 'zero:', '%intf_tbbz']]]],
+                                [[7], [[rbbz_col, ['Rx', 'B2B', 'credit', 'transitions', 'to', 'zero:', '%intf_rbbz']]]],
+                                [[9], [[txwait_col, ['TxWait', '2.5us', 'due', 'to', 'lack', 'of', 'transmit', 'credits:', '%intf_txwait', ]]]],
+                                [[6], [[txwait_1s1m1h72h_col, ['Percentage', 'TxWait', 'for', 'last', '1s/1m/1h/72h:', '%intf_txwait_1s1m1h72h']]]],
+                                [[8], [['&', ['Percentage', 'TxWait', 'not', 'available', 'for', 'last', '1s/1m/1h/72h:', '%intf_txwait_1s1m1h72h']]]],
+                                [[4], [[timeout_discards_col, ['Tx', 'Timeout', 'discards:', '%intf_timeout_discards']]]], 
+                                [[4], [[credit_loss_col, ['Tx', 'Credit' , 'loss:', '%intf_credit_loss']]]],
+                                [[8], [[active_lr_rx_col, ['Rx', 'Link', 'Reset(LR)', 'while', 'link', 'is', 'active:', '%intf_lr_rx_act']]]],
+                                [[8], [[active_lr_tx_col, ['Tx', 'Link', 'Reset(LR)', 'while', 'link', 'is', 'active:', '%intf_lr_tx_act']]]],
+                                [[5], [[lrr_rx_col, ['Rx', 'Link', 'Reset', 'Responses(LRR):', '%intf_lrr_rx']]]],
+                                [[5], [[lrr_tx_col, ['Tx', 'Link', 'Reset', 'Responses(LRR):', '%intf_lrr_tx']]]],
+                               ]
+            else:
+                counter_list = [
+                                [[7], [[tbbz_col, ['%intf_tbbz', 'Transmit',  'B2B', 'credit', 'transitions', 'to', 'zero']]]],
+                                [[7], [[rbbz_col, ['%intf_rbbz', 'Receive', 'B2B', 'credit', 'transitions', 'to', 'zero']]]],
+                                [[9], [[txwait_col, ['%intf_txwait', '2.5us', 'TxWait', 'due', 'to', 'lack', 'of', 'transmit', 'credits']]]],
+                                [[8], [[txwait_1s1m1h72h_col, ['Percentage', 'TxWait', 'not', 'available', 'for', 'last', '1s/1m/1h/72h:', '%intf_txwait_1s1m1h72h']]]],
+                                [[6], [[timeout_discards_col, ['%intf_timeout_discards', 'timeout', 'discards,']], [credit_loss_col, ['.', '.', '.', '%intf_credit_loss', 'credit' , 'loss']]]],
+                                [[8], [[active_lr_rx_col, ['%intf_lr_rx_act', 'link', 'reset', 'received', 'while', 'link', 'is', 'active']]]],
+                                [[8], [[active_lr_tx_col, ['%intf_lr_tx_act', 'link', 'reset', 'transmitted', 'while', 'link', 'is', 'active']]]],
+                                [[5], [[lrr_rx_col, ['%intf_lrr_rx', 'link', 'reset', 'responses', 'received']]]],
+                                [[5], [[lrr_tx_col, ['%intf_lrr_tx', 'link', 'reset', 'responses', 'transmitted']]]],
+                               ]
         #
-        for row_num in range(0,len(output_table_list)):
-            #
-            # Print intf left justified
-            #
-            row_str = '| ' + output_table_list[row_num][0].ljust(column_widths_list[0] +1 )
+        # --general-stats
+        #  
+        else:
+            type_line = 'General Stats:'
+            frames_rx_col = ['Frames','Rx']
+            frames_tx_col = ['Frames','Tx']
+            c3_frames_rx_col = ['C3 Frames','Rx']
+            c3_frames_tx_col = ['C3 Frames','Tx']
+            c2_frames_rx_col = ['C2 Frames','Rx']
+            c2_frames_tx_col = ['C2 Frames','Tx']
+            cf_frames_rx_col = ['CF Frames','Rx']
+            cf_frames_tx_col = ['CF Frames','Tx']
+            mcast_frames_rx_col = ['Mcast','Frames Rx']
+            mcast_frames_tx_col = ['Mcast','Frames Tx']
+            bcast_frames_rx_col = ['Bcast','Frames Rx']
+            bcast_frames_tx_col = ['Bcast','Frames Tx']
+            ucast_frames_rx_col = ['Ucast','Frames Rx']
+            ucast_frames_tx_col = ['Ucast','Frames Tx']
+            if show_int_counter_detail_new:
+                counter_list = [
+                                [[4], [[frames_rx_col, ['Rx', 'total', 'frames:', '%intf_frames_received']]]], 
+                                [[4], [[frames_tx_col, ['Tx', 'total', 'frames:', '%intf_frames_transmitted',]]]],
+                                [[4], [[c3_frames_rx_col, ['Rx', 'class-3', 'frames:', '%intf_class_3_frames_received']]]],
+                                [[4], [[c3_frames_tx_col, ['Tx', 'class-3', 'frames:', '%intf_class_3_frames_transmitted']]]],
+                                [[4], [[c2_frames_rx_col, ['Rx', 'class-2', 'frames:', '%intf_class_2_frames_received']]]],
+                                [[4], [[c2_frames_tx_col, ['Tx', 'class-2', 'frames:', '%intf_class_2_frames_transmitted']]]],
+                                [[4], [[cf_frames_rx_col, ['Rx', 'class-f', 'frames:', '%intf_class_f_frames_received']]]],
+                                [[4], [[cf_frames_tx_col, ['Tx', 'class-f', 'frames:', '%intf_class_f_frames_transmitted']]]],
+                                [[4], [[mcast_frames_rx_col, ['Rx', 'total', 'multicast:', '%intf_multicast_frames_received',]]]], 
+                                [[4], [[mcast_frames_tx_col, ['Tx', 'total', 'multicast:', '%intf_multicast_frames_transmitted']]]],
+                                [[4], [[bcast_frames_rx_col, ['Rx', 'total', 'broadcast:', '%intf_broadcast_frames_received',]]]], 
+                                [[4], [[bcast_frames_tx_col, ['Tx', 'total', 'broadcast:', '%intf_broadcast_frames_transmitted']]]],
+                                [[4], [[ucast_frames_rx_col, ['Rx', 'total', 'unicast:', '%intf_unicast_frames_received',]]]], 
+                                [[4], [[ucast_frames_tx_col, ['Tx', 'total', 'unicast:', '%intf_unicast_frames_transmitted']]]],
+                               ]
+            else:
+                counter_list = [
+                                [[5], [[frames_rx_col, ['%intf_frames_received', 'frames,', '.', 'bytes', 'received']]]], 
+                                [[5], [[frames_tx_col, ['%intf_frames_transmitted', 'frames,', '.', 'bytes', 'transmitted']]]],
+                                [[6], [[c3_frames_rx_col, ['%intf_class_3_frames_received', 'class-3', 'frames,', '.', 'bytes', 'received']]]],
+                                [[6], [[c3_frames_tx_col, ['%intf_class_3_frames_transmitted', 'class-3', 'frames,', '.', 'bytes', 'transmitted']]]],
+                                [[6], [[c2_frames_rx_col, ['%intf_class_2_frames_received', 'class-2', 'frames,', '.', 'bytes', 'received']]]],
+                                [[6], [[c2_frames_tx_col, ['%intf_class_2_frames_transmitted', 'class-2', 'frames,', '.', 'bytes', 'transmitted']]]],
+                                [[6], [[cf_frames_rx_col, ['%intf_class_f_frames_received', 'class-f', 'frames,', '.', 'bytes', 'received']]]],
+                                [[6], [[cf_frames_tx_col, ['%intf_class_f_frames_transmitted', 'class-f', 'frames,', '.', 'bytes', 'transmitted']]]],
+                                [[6], [[mcast_frames_rx_col, ['%intf_multicast_frames_received', 'multicast', 'packets', 'received,']], [mcast_frames_tx_col, ['.', 'multicast', 'packets', '.', '%intf_multicast_frames_transmitted', 'transmitted']]]],
+                                [[6], [[bcast_frames_rx_col, ['%intf_broadcast_frames_received', 'broadcast', 'packets', 'received,']], [bcast_frames_tx_col, ['.', 'broadcast', 'packets', '.', '%intf_broadcast_frames_transmitted', 'transmitted']]]],
+                                [[6], [[ucast_frames_rx_col, ['%intf_unicast_frames_received', 'unicast', 'packets', 'received,']], [ucast_frames_tx_col, ['.', 'unicast', 'packets', '.', '%intf_unicast_frames_transmitted', 'transmitted']]]],
+                               ]
+      
+    #
+    # These are the same... just different names for the same output
+    #
+    # --transceiver-stats
+    # --sfp-stats
+    #
+    elif stat_type in ['type_sfp_stats', 'type_sfp_detail_stats']:
+        name_col = ['','Name']
+        pid_col = ['Cisco','PID']
+        serial_col = ['Serial','Number']
+        sync_col = ['','Sync?']
+        bit_rate_col = ['Nominal','Bit Rate']
+        temp_col = ['','Temp']
+        voltage_col = ['','Voltage']
+        current_col = ['','Current']
+        txpower_col = ['Tx','Power']
+        rxpower_col = ['Rx','Power']
+        txfault_col = ['Tx','Fault']
+        if stat_type == 'type_sfp_stats':
+        
             #
-            # Print intf's data columns
+            # '&' in column header indicates no column header
+            # '&' in front of variable name indicates append to variable name
             #
-            for column_num in column_number_list[1:]:
-                row_str += '| ' + (output_table_list[row_num][column_num]+' ').rjust(column_widths_list[column_num] +1)
+            # Counter_list = [
+            #                [number of tokens on line, [[Heading, [%variable_name, match keyword 1, match keyword 2, ..., match keyword n]]]],
+            #                ...
+            #                ]
             #
-            # Include description if request (left justified) 
+            # --transceiver-stats
             #
-            if args.include_description:
-                row_str += '| ' + show_int_variables_dict[output_table_list[row_num][0]]['description'].ljust(max_descr_len +1)
-                #row_str += '| ' + show_int_descr_dict[output_table_list[row_num][0]].ljust(max_descr_len +1)
-            row_str += '|'
-            print(row_str)
+            type_line = 'Transceiver(SFP) Stats:'
+            counter_list = [ 
+                            [[3], [[name_col, ['Name', 'is', '%intf_sfp_name']]]],
+                            [[4,5], [[pid_col, ['Cisco', 'pid', 'is', '%intf_sfp_pid']]]],    # LW SFPs have a space in the PID: Cisco pid is DS-SFP-FC16G-SW - Need tokens either 4 or 5 because - See CSCvz53902
+                            [[5], [['&', ['Cisco', 'pid', 'is', '.', '&intf_sfp_pid']]]],     # LW SFPs have a space in the PID: Cisco pid is DS-SFP-FC16G-SW - This line appends the 'LW'
+                            [[13,14], [[sync_col, ['.', '.', '.', '.', '.', '%intf_sfp_sync', 'sync', 'exists,']], ['&', ['.', '.', '.', '.', '.', '.','&intf_sfp_sync', 'sync', 'exists,']], ['&', ['.', '.', '.', '.', '.', '.', '&intf_sfp_sync', 'sync', 'state,']]]],
+                            [[4,5], [[temp_col, ['Temperature', ':', '%intf_sfp_temp']], ['&', ['Temperature', ':', '.', '&intf_sfp_temp']], ['&', ['Temperature', ':', '.', '.', '&intf_sfp_temp']]]],
+                            [[4,5], [[voltage_col, ['Voltage', ':', '%intf_sfp_volt']], ['&', ['Voltage', ':', '.', '&intf_sfp_volt']], ['&', ['Voltage', ':', '.', '.', '&intf_sfp_volt']]]],
+                            [[4,5], [[current_col, ['Current', ':', '%intf_sfp_curr']], ['&', ['Current', ':', '.', '&intf_sfp_curr']], ['&', ['Current', ':', '.', '.', '&intf_sfp_curr']]]],
+                            [[6,7], [[txpower_col, ['Optical', 'Tx', 'Power', ':', '%intf_sfp_tx_power']], ['&', ['Optical', 'Tx', 'Power', ':', '.', '&intf_sfp_tx_power']], ['&', ['Optical', 'Tx', 'Power', ':', '.', '.', '&intf_sfp_tx_power']]]],
+                            [[6,7], [[rxpower_col, ['Optical', 'Rx', 'Power', ':', '%intf_sfp_rx_power']], ['&', ['Optical', 'Rx', 'Power', ':', '.', '&intf_sfp_rx_power']], ['&', ['Optical', 'Rx', 'Power', ':', '.', '.', '&intf_sfp_rx_power']]]],
+                            [[5], [[txfault_col, ['Tx', 'Fault', 'count', ':', '%intf_sfp_tx_fault']]]],
+                        
+                           ]
+    
         #
-        # print trailer line
+        # --transceiver-detail-stats
+        # --sfp-detail-stats
+        #         
+        else:
+            type_line = 'Transceiver(SFP) Detail Stats:'
+            counter_list = [ 
+                            [[3], [[name_col, ['Name', 'is', '%intf_sfp_name']]]],
+                            [[4,5], [[pid_col, ['Cisco', 'pid', 'is', '%intf_sfp_pid']]]],      # LW SFPs have a space in the PID: Cisco pid is DS-SFP-FC16G-SW - Need tokens either 4 or 5 because - See CSCvz53902
+                            [[5], [['&', ['Cisco', 'pid', 'is', '.', '&intf_sfp_pid']]]],     # LW SFPs have a space in the PID: Cisco pid is DS-SFP-FC16G-SW - This line appends the 'LW'
+                            [[4], [[serial_col, ['Serial', 'number', 'is', '%intf_sfp_sn']]]],
+                            [[13,14], [[sync_col, ['.', '.', '.', '.', '.', '%intf_sfp_sync', 'sync', 'exists,']], ['&', ['.', '.', '.', '.', '.', '.','&intf_sfp_sync', 'sync', 'exists,']], ['&', ['.', '.', '.', '.', '.', '.', '&intf_sfp_sync', 'sync', 'state,']]]],
+                            [[6], [[bit_rate_col, ['Nominal', 'bit', 'rate', 'is', '%intf_sfp_brate']], ['&', ['Nominal', 'bit', 'rate', 'is', '.', '&intf_sfp_brate']]]], 
+                            [[4,5], [[temp_col, ['Temperature', ':', '%intf_sfp_temp']], ['&', ['Temperature', ':', '.', '&intf_sfp_temp']], ['&', ['Temperature', ':', '.', '.', '&intf_sfp_temp']]]],
+                            [[4,5], [[voltage_col, ['Voltage', ':', '%intf_sfp_volt']], ['&', ['Voltage', ':', '.', '&intf_sfp_volt']], ['&', ['Voltage', ':', '.', '.', '&intf_sfp_volt']]]],
+                            [[4,5], [[current_col, ['Current', ':', '%intf_sfp_curr']], ['&', ['Current', ':', '.', '&intf_sfp_curr']], ['&', ['Current', ':', '.', '.', '&intf_sfp_curr']]]],
+                            [[6,7], [[txpower_col, ['Optical', 'Tx', 'Power', ':', '%intf_sfp_tx_power']], ['&', ['Optical', 'Tx', 'Power', ':', '.', '&intf_sfp_tx_power']], ['&', ['Optical', 'Tx', 'Power', ':', '.', '.', '&intf_sfp_tx_power']]]],
+                            [[6,7], [[rxpower_col, ['Optical', 'Rx', 'Power', ':', '%intf_sfp_rx_power']], ['&', ['Optical', 'Rx', 'Power', ':', '.', '&intf_sfp_rx_power']], ['&', ['Optical', 'Rx', 'Power', ':', '.', '.', '&intf_sfp_rx_power']]]],
+                            [[5], [[txfault_col, ['Tx', 'Fault', 'count', ':', '%intf_sfp_tx_fault']]]],
+                        
+                           ]
+
+    #
+    # --brief-stats
+    #      
+    else:
+        #print('Processing --brief-stats...')
+        type_line = 'Interface Brief + Device-alias + Peer PWWN + Description:'
+
+        vsan_col = ['VSAN']
+        admin_mode_col = ['Admin','Mode']
+        admin_trunk_mode_col = ['Admin','Trunk', 'Mode']
+        status_col = ['','Status']
+        sfp_col = ['','SFP']
+        oper_mode_col = ['Oper','Mode']
+        oper_speed_col = ['Oper', 'Speed', '(Gbps)']
+        port_channel_col = ['Port', 'Channel']
+        logical_type_col = ['logical', 'Type']
+        device_alias_or_switchname_col = ['Device-alias', 'Name or', 'Switchname']
+        peer_pwwn_col = ['F Port','Peer PWWN']
+        description_col = ['','Description']
+    
+        #
+        # This will build the columnd
         #
-        print(header_trailer)
+        counter_list = [ 
+                         [[0],[[vsan_col,['%vsan']]]],
+                         [[0],[[admin_mode_col,['%admin_mode']]]],
+                         [[0],[[admin_trunk_mode_col,['%admin_trunk_mode']]]],
+                         [[0],[[status_col,['%status']]]],
+                         [[0],[[sfp_col,['%sfp']]]],
+                         [[0],[[oper_mode_col ,['%oper_mode']]]],
+                         [[0],[[oper_speed_col,['%oper_speed']]]],
+                         [[0],[[port_channel_col,['%port_channel']]]],
+                         [[0],[[logical_type_col,['%logical_type']]]],
+                         [[0],[[device_alias_or_switchname_col, ['%device_alias_or_switchname']]]],
+                         [[0],[[peer_pwwn_col,['%peer_pwwn']]]],
+                         [[0],[[description_col,['%description']]]],
+                        ]
+
+    return type_line, counter_list
+
+#
+# Merge the counter_lists of several stat types into one counter_list
+#
+# Line entries that are in more than one counter_list (e.g. LRR Rx/Tx are in link and congestion stats) are only kept once
+#
+def merge_counter_lists(counter_list_list):
+    merged_counter_list = []
+    for counter_list in counter_list_list:
+        for line_entry in counter_list:
+            if line_entry not in merged_counter_list:
+                merged_counter_list.append(line_entry)
+    return merged_counter_list
+
+#
+# --columns: display only the selected variables of the link, congestion, general, transceiver and brief stats
+#
+# columns_stat_type_list = [[stat type, source of its variables], ...]
+#
+# counters is show interface counters detailed, transceiver is show interface transceiver and brief is show interface
+# brief (with show topology, show flogi database and show interface description for the variables that come from them).
+# The commands of a source are only issued when one of its variables is selected.
+#
+columns_stat_type_list = [['type_link_stats', 'counters'], ['type_congestion_stats', 'counters'], ['type_general_stats', 'counters'],
+                          ['type_sfp_detail_stats', 'transceiver'], ['type_brief', 'brief']]
+
+#
+# Get the variable of a counter_list column entry (the one set by '%' or appended to by '&')
+#
+def get_counter_entry_var(counter_entry):
+    for pattern_entry in counter_entry[1]:
+        if pattern_entry[0:1] in ['%', '&']:
+            return pattern_entry[1:]
+    return None
+
+#
+# Get the source of each --columns variable, {variable name: source}
+#
+# The old and new format of show interface counters detailed have the same variables
+#
+def get_columns_var_dict():
+    columns_var_dict = {}
+    for stat_type, source in columns_stat_type_list:
+        for var_name in get_var_list(build_counter_list(stat_type, True)[1]):
+            columns_var_dict.setdefault(var_name, source)
+    return columns_var_dict
+
+#
+# Get the --columns variable for a variable name, with or without 'intf_'
+#
+# Returns None if there is no such variable
+#
+def get_columns_var(var_name, columns_var_dict):
+    for columns_var_name in [var_name, 'intf_' + var_name]:
+        if columns_var_name in columns_var_dict:
+            return columns_var_name
+    return None
+
+#
+# Parse a --columns list of variable names separated by commas, returns columns_var_list
+#
+def parse_columns(columns):
+    columns_var_dict = get_columns_var_dict()
+    columns_var_list = []
+    for column in columns.split(','):
+        column = column.strip().lower()
+        if column == '':
+            continue
+        var_name = get_columns_var(column, columns_var_dict)
+        if var_name == None:
+            raise argparse.ArgumentTypeError('column "' + column + '" not found. Columns are: ' + ', '.join(sorted([var_name[5:] if var_name[:5] == 'intf_' else var_name for var_name in columns_var_dict])))
+        if var_name not in columns_var_list:
+            columns_var_list.append(var_name)
+    if not columns_var_list:
+        raise argparse.ArgumentTypeError('invalid --columns: empty')
+    return columns_var_list
+
+#
+# Get the variables collected for --columns: the columns followed by the --where variables that are not columns
+#
+def get_columns_var_list(args):
+    columns_var_dict = get_columns_var_dict()
+    columns_var_list = list(args.columns)
+    if args.where != None:
+        for var_name in get_where_var_list(args.where):
+            var_name = get_columns_var(var_name, columns_var_dict)
+            if var_name != None and var_name not in columns_var_list:
+                columns_var_list.append(var_name)
+    return columns_var_list
+
+#
+# Get the sources of the variables in columns_var_list, in columns_stat_type_list order
+#
+def get_columns_source_list(columns_var_list):
+    columns_var_dict = get_columns_var_dict()
+    var_source_list = [columns_var_dict[var_name] for var_name in columns_var_list]
+    columns_source_list = []
+    for stat_type, source in columns_stat_type_list:
+        if source in var_source_list and source not in columns_source_list:
+            columns_source_list.append(source)
+    return columns_source_list
+
+#
+# Build the counter_list of the variables in columns_var_list
+#
+# Only the entries that set or append to these variables are kept, so fewer entries are tried on each line of output.
+# The columns are in the columns_var_list order, except that the columns of one line entry (e.g. link failures, sync
+# losses and signal losses in the old format) stay in the order of the line.
+#
+def build_columns_counter_list(columns_var_list, show_int_counter_detail_new):
+    counter_list = merge_counter_lists([build_counter_list(stat_type, show_int_counter_detail_new)[1] for stat_type, source in columns_stat_type_list])
+    columns_counter_list = []
+    for tok_count_list, counter_entry_list in counter_list:
+        counter_entry_list = [counter_entry for counter_entry in counter_entry_list if get_counter_entry_var(counter_entry) in columns_var_list]
+        if counter_entry_list:
+            columns_counter_list.append([tok_count_list, counter_entry_list])
+    #
+    # The sort is stable, so an '&' line entry (e.g. the LW PID) stays after the line entry of its variable
+    #
+    columns_counter_list.sort(key = lambda line_entry: min([columns_var_list.index(get_counter_entry_var(counter_entry)) for counter_entry in line_entry[1]]))
+    return columns_counter_list
+
+##############################################################################
+# Main
+##############################################################################
+#
+# argv is the arguments of a --daemon request, None for the command line
+#
+def main(argv = None):
+    # argument parsing
+    parser = argparse.ArgumentParser(prog='show_int_tabular', description='show_int_tabular version v1.11')
+    parser.add_argument('--version', action='version', help='version', version='%(prog)s v1.11')
+    parser.add_argument('fc_interface', nargs='*', default = '', help='fc interface, port-channel interface, interface range or interface list')
+    parser.add_argument('--general-stats', action="store_true", dest='type_general_stats', help = 'Display general statistics (non errors).')
+    parser.add_argument('--link-stats', action="store_true",  dest='type_link_stats', help = 'Display physical link statistics. Default')
+    parser.add_argument('--congestion-stats', action="store_true",  dest='type_congestion_stats', help = 'Display congestion statistics')
+    parser.add_argument('--transceiver-stats', action="store_true",  dest='type_sfp_stats', help = 'Display transceiver(SFP) statistics')
+    parser.add_argument('--sfp-stats', action="store_true",  dest='type_sfp_stats', help = 'Display transceiver(SFP) statistics')
+    parser.add_argument('--transceiver-detail-stats', action="store_true",  dest='type_sfp_detail_stats', help = 'Display transceiver(SFP) detailed statistics')
+    parser.add_argument('--sfp-detail-stats', action="store_true",  dest='type_sfp_detail_stats', help = 'Display transceiver(SFP) detailed statistics')
+    parser.add_argument('--all', action="store_true", dest='type_all', help = 'Display link, congestion and general statistics from one collection')
+    parser.add_argument('--wide', action="store_true", help = 'Display all the requested statistics types in one table')
+    parser.add_argument('--brief', action="store_true", dest='type_brief', help = 'Display interface brief values + description + peer pwwn + device-alias or switchname')
+    parser.add_argument('--columns', type=parse_columns, help='Display only these variables of the link, congestion, general, transceiver and brief stats in one table, separated by commas, e.g. invalid_crcs,txwait or sfp_rx_power,description. Only the show commands of these variables are issued')
+    parser.add_argument('--e', action="store_true", dest='filter_e_port', help='Display only (T)E ports in interface range or list')
+    parser.add_argument('--f', action="store_true", dest='filter_f_port', help='Display only (T)F ports in interface range or list')
+    parser.add_argument('--np', action="store_true", dest='filter_np_port', help='Display only (T)NP ports in interface range or list')
+    parser.add_argument('--edge', action="store_true", dest='filter_edge_port', help='Display only logical-type edge ports in interface range or list')
+    parser.add_argument('--core', action="store_true", dest='filter_core_port', help='Display only logical-type core ports in interface range or list')
+    parser.add_argument('--errorsonly', action='store_true', dest='filter_errorsonly', help='Display only interfaces with non-zero counts.')
+    parser.add_argument('--where', type=parse_where, help='Display only the interfaces that match this expression of variable names, e.g. "intf_invalid_crcs > 100 or intf_txwait_1s1m1h72h.1m >= 5" or "sfp_rx_power < -10"')
+    parser.add_argument('--outfile', help='Write output to file on bootflash on switch. If file exists already it will be overwritten.')
+    parser.add_argument('--appendfile', help='Append output to file on bootflash on switch. If file does not exist it will be created.')
+    parser.add_argument('--d', action="store_true", dest='include_description', help='Include port description if found')
+    parser.add_argument('--format', choices=['table', 'csv', 'jsonl', 'json'], default='table', dest='output_format', help='Output format. csv, jsonl (one JSON record per line) or json have a record per interface with the variable names as keys, in one table for all the requested types. Default table')
+    parser.add_argument('--json', action="store_true", dest='use_json', help='Use the structured (JSON) output of the show commands when available. Falls back to the text output per command.')
+    parser.add_argument('--serial', action="store_true", help='Issue the show commands one at a time instead of at the same time')
+    parser.add_argument('--per-module', action="store_true", dest='per_module', help='Issue the counters or transceiver command for each module and for the port-channels at the same time and parse their outputs in parallel')
+    parser.add_argument('--parse-processes', type=int, dest='parse_processes', help='Processes to parse the --per-module outputs in when they are large. Default the number of CPUs')
+    parser.add_argument('--interval', type=int, default=0, help='Watch mode: sample the counters every INTERVAL seconds and display the delta and per second rate since the previous sample')
+    parser.add_argument('--count', type=int, default=0, help='Number of samples to take in watch mode. Default 0 is until interrupted')
+    parser.add_argument('--snapshot', help='Save the counters to this file on bootflash after the run and display the delta and per second rate since the counters saved by the previous run')
+    parser.add_argument('--history', help='Record each sample in this fixed size history file on bootflash. The oldest samples are overwritten once the file is full')
+    parser.add_argument('--history-retention', type=parse_duration, default=parse_duration('24h'), dest='history_retention', help='Time of samples kept when the history file is created, e.g. 72h. Default 24h')
+    parser.add_argument('--history-max-intfs', type=int, default=0, dest='history_max_intfs', help='Interfaces the history file has room for when it is created, e.g. all the interfaces of the switch when --history is used with a port type filter or an interface range. Default the interfaces of the run')
+    parser.add_argument('--history-resolution', type=parse_duration, default=parse_duration('1m'), dest='history_resolution', help='Minimum time between recorded samples when the history file is created, e.g. 1m. Default 1m')
+    parser.add_argument('--query', help='Display the delta, rate, max rate or a percentile of the rates of the samples recorded in this history file on bootflash instead of the current counters')
+    parser.add_argument('--query-window', type=parse_duration, default=parse_duration('1h'), dest='query_window', help='Time of the samples used by --query, e.g. 24h. Default 1h')
+    parser.add_argument('--query-stat', default='rate', dest='query_stat', help='delta, rate, max (highest rate between two samples) or a percentile of the rates between two samples, e.g. p95. Default rate')
+    parser.add_argument('--sort', help='Sort the interfaces on this column, highest first. The column heading (e.g. "Invalid CRC") or variable name (e.g. invalid_crcs)')
+    parser.add_argument('--top', type=int, default=0, help='Display only the first TOP interfaces of --sort')
+    parser.add_argument('--reverse', action="store_true", help='Reverse the --sort order')
+    parser.add_argument('--cache', nargs='?', const='show_int_tabular.cache', help='Cache the show topology, show flogi database, show interface description and show version results in this file on bootflash. Default file show_int_tabular.cache')
+    parser.add_argument('--cache-ttl', type=parse_cache_ttl, default=dict(cache_default_ttl_dict), dest='cache_ttl', help='Seconds the cached results are used, e.g. topology=10m,flogi=5m,description=1h (the defaults). show version is cached until the switch reloads')
+    parser.add_argument('--refresh', action="store_true", help='Issue all the show commands and update the --cache')
+    parser.add_argument('--alias-index', nargs='?', const='show_int_tabular.alias', dest='alias_index', help='With --brief look up the device-aliases by peer PWWN in this device-alias index file on bootflash. The index is rebuilt from show device-alias database when the database changes. Default file show_int_tabular.alias')
+    parser.add_argument('--timing', nargs='?', const='', help='Print the time and output size of each show command and the time of the parse, build rows and render phases at the end of the run, or write them as JSON to this file on bootflash')
+    parser.add_argument('--profile', help='Save cProfile stats of the run to this file on bootflash and a summary of the functions with the highest cumulative time to PROFILE.txt')
+    parser.add_argument('--exporter', nargs='?', type=int, const=9180, help='Serve the counters of all the interfaces as Prometheus metrics on this port until interrupted. Default port 9180')
+    parser.add_argument('--exporter-address', default='0.0.0.0', dest='exporter_address', help='Address the --exporter listens on. Default 0.0.0.0 (all)')
+    parser.add_argument('--exporter-refresh', type=parse_duration, default=parse_duration('1m'), dest='exporter_refresh', help='Minimum time between collections of the --exporter. Scrapes in between get the last sample, e.g. 30s. Default 1m')
+    parser.add_argument('--cli-timeout', type=int, default=300, dest='cli_timeout', help='Seconds to wait for each show command. Default 300')
+    parser.add_argument('--daemon', nargs='?', const=daemon_default_socket, help='Stay resident and run the requests of show_int_client.py, which takes the same arguments, on this Unix domain socket until interrupted. Default /tmp/show_int_tabular.sock')
+
+    #
+    # Handle arguments
+    #
+    args = parser.parse_args(argv)
+
+    if not validateArgs (args) :
+        sys.exit() 
+
+    if cli == None:
+        print('The NX-OS cli module is not available. Run on the switch, or use show_int_fabric.py to collect from switches off the switch.')
+        sys.exit(1)
+
+    #
+    # Daemon: the requests are runs of main() in this process
+    #
+    if daemon_dict['socket'] != None and (args.daemon or args.exporter != None):
+        print('--daemon and --exporter can not be run by the daemon')
+        sys.exit(1)
     #
-    # Handle outfile
+    # Requests are run one at a time, so one that never ends would block every other client
     #
+    if daemon_dict['socket'] != None and args.interval and not args.count:
+        print('--interval without --count can not be run by the daemon')
+        sys.exit(1)
+    if args.daemon:
+        run_daemon(args.daemon)
+        return
+
+    #
+    # --timing and --profile
+    #
+    reset_timing(argv)
+    profiler = None
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    #if not (args.type_link_stats or args.type_congestion_stats or args.type_general_stats):
+    #    args.type_link_stats = True
+
+    #
+    # Requested stat types in display order
+    #
+    stat_type_list = [stat_type for stat_type in ['type_link_stats', 'type_congestion_stats', 'type_general_stats', 'type_sfp_stats', 'type_sfp_detail_stats', 'type_brief'] if getattr(args, stat_type)]
+
+    if len(args.fc_interface) > 0:
+        intf_range = args.fc_interface[0] + ' '
+    else:
+        intf_range = ''
+
+    #if args.filter_e_port == True:
+    #print('args.filter_e_port: ' + str(args.filter_e_port))
+
+    #
+    # outfile
+    #
+    outfile_name = ''
+    outfile_handle = None
+    if args.outfile != None:
+        outfile_name = '/bootflash/' + args.outfile
+        try:
+            outfile_handle = open(outfile_name,'w')
+        except Exception as e:
+            print('Invalid filename: "' + outfile_name + '". Open failed with {}'.format(e))
+            sys.exit(1)
+    
+    #
+    # appendfile
+    #
+    if args.appendfile != None:
+        outfile_name = '/bootflash/' + args.appendfile
+        try:
+            outfile_handle = open(outfile_name,'a')
+        except Exception as e:
+            print('Invalid filename: "' + outfile_name + '". Open failed with {}'.format(e))
+            sys.exit(1)
+    
+    current_datetime = datetime.datetime.today().strftime('%Y/%m/%d %H:%M:%S')
+
+    #
+    # History query: display the samples recorded in the history file without issuing any show commands
+    #
+    if args.query:
+        print_history_query('/bootflash/' + args.query, args.query_window, args.query_stat, args, outfile_handle)
+        end_timing(args, profiler)
+        if outfile_handle != None:
+            outfile_handle.close()
+        return
+    #print('Current date time: ' + current_datetime)
+
+    #
+    # Initialize intf_table where all variables are stored
+    # Initialize  intf_list which is the list of interfaces to output
+    #
+    intf_table = create_intf_table(intf_info_var_list)
+    intf_list = []
+    port_channel_dict = {}
+    #
+    # Issue show interface brief if any filter is specified or if type brief is requested
+    #
+    # port_type_filter == True indicates one of the port types(e, f, np, core, edge) is requested
+    #
+    # Add the interfaces of show interface brief to intf_table
+    #
+    if args.filter_e_port | args.filter_f_port | args.filter_np_port | args.filter_edge_port | args.filter_core_port:
+        port_type_filter = True
     else:
-        outfile_handle.write(clock_type_line + '\n')
-        outfile_handle.write(header_trailer + '\n')
+        port_type_filter = False
+    
+    #
+    # Exporter: serve the metrics of all the counters instead of displaying the requested type
+    #
+    if args.exporter != None:
+        run_exporter(str(intf_range), port_type_filter, args)
+        end_timing(args, profiler)
+        return
+
+    #
+    # Commands needed for the requested type and filters
+    #
+    show_int_brief_cmd = 'show interface ' + str(intf_range) + 'brief'
+    show_topo_cmd = 'show topology'
+    show_flogi_database_cmd = 'show flogi database |  i \\[ p 1'
+    show_flogi_database_name = '"show flogi database | \\["'
+    show_flogi_database_json_cmd = 'show flogi database'
+    show_da_status_cmd = 'show device-alias status'
+    show_da_database_cmd = 'show device-alias database'
+    show_int_descr_cmd = 'show interface ' + str(intf_range) + 'description'
+    show_ver_cmd = 'show version'
+
+    #
+    # --columns: only the commands of the sources of the columns and --where variables are issued
+    #
+    columns_var_list = []
+    columns_source_list = []
+    if args.columns:
+        columns_var_list = get_columns_var_list(args)
+        columns_source_list = get_columns_source_list(columns_var_list)
+
+    show_int_cmd_format_list = []
+    if args.type_link_stats or args.type_congestion_stats or args.type_general_stats or 'counters' in columns_source_list:
+        show_int_cmd_format_list.append('show interface {}counters detailed')
+    if args.type_sfp_stats | args.type_sfp_detail_stats or 'transceiver' in columns_source_list:
+        show_int_cmd_format_list.append('show interface {} transceiver')
+
+    use_brief = port_type_filter | args.type_brief or 'brief' in columns_source_list
+    use_topology = (port_type_filter | args.type_brief or 'device_alias_or_switchname' in columns_var_list) and (not port_type_filter or args.filter_e_port or args.filter_core_port)
+    use_flogi = args.type_brief or 'device_alias_or_switchname' in columns_var_list or 'peer_pwwn' in columns_var_list
+    use_description = args.include_description or args.type_brief or 'description' in columns_var_list
+
+    #
+    # --alias-index: the device-aliases are looked up in the device-alias index by peer PWWN, so the full
+    # show flogi database output is used and show device-alias status tells if the index must be rebuilt
+    #
+    alias_index_dict = None
+    if use_flogi and args.alias_index:
+        show_flogi_database_cmd = show_flogi_database_json_cmd
+        show_flogi_database_name = '"show flogi database"'
+        alias_index_name = '/bootflash/' + args.alias_index
+        alias_index_dict = open_alias_index(alias_index_name)
+
+    #
+    # --cache: use the parsed output of show topology, show flogi database, show interface description and show version
+    # cached by a previous run so these commands are not issued
+    #
+    topology_list = None
+    flogi_list = None
+    description_list = None
+    show_int_counter_detail_new = None
+    if args.cache:
+        cache_name = '/bootflash/' + args.cache
+        if cache_name in daemon_dict['cache_dicts']:
+            cache_dict = daemon_dict['cache_dicts'][cache_name]
+        else:
+            cache_dict = load_cache(cache_name)
+        if daemon_dict['socket'] != None:
+            daemon_dict['cache_dicts'][cache_name] = cache_dict
+        cache_hits = cache_dict['hits']
+        cache_misses = cache_dict['misses']
+        boot_time = get_boot_time()
+        if use_topology:
+            topology_list = get_cache_entry(cache_dict, 'topology', show_topo_cmd, args.cache_ttl['topology'], args.refresh)
+        if use_flogi:
+            flogi_list = get_cache_entry(cache_dict, 'flogi', show_flogi_database_cmd, args.cache_ttl['flogi'], args.refresh)
+        if use_description:
+            description_list = get_cache_entry(cache_dict, 'description', show_int_descr_cmd, args.cache_ttl['description'], args.refresh)
         #
-        # Print two header lines - left justify
+        # In the daemon the version of a previous request is written to the cache first, so it is a hit
         #
-        for row_num in [0,1]:
-            row_str = ''
-            for column_num in column_number_list:
-                row_str += '| ' + output_table_list[row_num][column_num].ljust(column_widths_list[column_num] +1)
-            row_str += '|'
-            outfile_handle.write(row_str + '\n')
+        if daemon_dict['counter_detail_new'] != None and not args.refresh:
+            set_cache_entry(cache_dict, 'version', boot_time, daemon_dict['counter_detail_new'])
+        show_int_counter_detail_new = get_cache_entry(cache_dict, 'version', boot_time, None, args.refresh)
+    if show_int_counter_detail_new == None and not args.refresh:
+        show_int_counter_detail_new = daemon_dict['counter_detail_new']
+
+    #
+    # cli_cmd_list = [[command, command name for error message, JSON command or '' for text output only], ...]
+    #
+    cli_cmd_list = []
+    if use_brief:
+        cli_cmd_list.append([show_int_brief_cmd, show_int_brief_cmd, show_int_brief_cmd])
+    if use_topology and topology_list == None:
+        cli_cmd_list.append([show_topo_cmd, show_topo_cmd, show_topo_cmd])
+    if use_flogi and flogi_list == None:
+        cli_cmd_list.append([show_flogi_database_cmd, show_flogi_database_name, show_flogi_database_json_cmd])
+    if use_flogi and args.alias_index:
+        cli_cmd_list.append([show_da_status_cmd, show_da_status_cmd, ''])
+    if use_description and description_list == None:
+        cli_cmd_list.append([show_int_descr_cmd, show_int_descr_cmd, show_int_descr_cmd])
+    if show_int_counter_detail_new == None:
+        cli_cmd_list.append([show_ver_cmd, '"show version"', show_ver_cmd])
+    #
+    # With a port type filter the counters are only collected for the interfaces that match the filter,
+    # so the counters command is issued once show interface brief has been parsed
+    #
+    # --per-module: one counters command per module, for the modules of the interface range or, without one, of the
+    # interfaces in show interface brief
+    #
+    show_int_cmd_list = []
+    if show_int_cmd_format_list and not port_type_filter:
+        if args.per_module and intf_range != '':
+            for show_int_cmd_format in show_int_cmd_format_list:
+                for module_intf_range in build_module_range_list(intf_range.split()[0].split(',')):
+                    show_int_cmd_list.append(get_show_int_cmd_entry(show_int_cmd_format, module_intf_range + ' ', args))
+            cli_cmd_list.extend(show_int_cmd_list)
+        elif args.per_module:
+            if not use_brief:
+                cli_cmd_list.insert(0, [show_int_brief_cmd, show_int_brief_cmd, show_int_brief_cmd])
+        else:
+            for show_int_cmd_format in show_int_cmd_format_list:
+                show_int_cmd_list.append(get_show_int_cmd_entry(show_int_cmd_format, str(intf_range), args))
+            cli_cmd_list.extend(show_int_cmd_list)
+    if not args.use_json:
+        for cli_cmd_entry in cli_cmd_list:
+            cli_cmd_entry[2] = ''
+
+    cli_output_dict = issue_cli_commands(cli_cmd_list, args.cli_timeout, args.serial)
+    first_sample_time = time.time()
+    parse_start = first_sample_time
+    parse_cli_time = timing_dict['phases']['cli']
+
+    if use_brief:
+        show_int_brief_json = cli_output_dict.get((show_int_brief_cmd, True))
+        if show_int_brief_json == None or not parse_show_int_brief_json(show_int_brief_json, port_type_filter, args, intf_table, intf_list, port_channel_dict):
+            parse_show_int_brief(get_cli_output(cli_output_dict, show_int_brief_cmd), port_type_filter, args, intf_table, intf_list, port_channel_dict)
         #
-        # print seperator line after header lines
+        # Determine adjacent switchname
         #
-        outfile_handle.write(seperator + '\n')
+        if use_topology:
+            if topology_list == None:
+                show_topo_json = cli_output_dict.get((show_topo_cmd, True))
+                if show_topo_json != None:
+                    topology_list = parse_show_topology_json(show_topo_json)
+                if topology_list == None:
+                    topology_list = parse_show_topology(get_cli_output(cli_output_dict, show_topo_cmd))
+                if args.cache:
+                    set_cache_entry(cache_dict, 'topology', show_topo_cmd, topology_list)
+            set_topology(topology_list, intf_table, port_channel_dict)
         #
-        # print intf data lines
+        # Issue the counters command for the filtered interfaces, split into several commands if the list is long
         #
-        for row_num in range(2,len(output_table_list)):
-            #
-            # Print intf left justified
-            #
-            row_str = '| ' + output_table_list[row_num][0].ljust(column_widths_list[0] +1)
-            #
-            # Print intf's data columns
-            #
-            for column_num in column_number_list[1:]:
-                row_str += '| ' + output_table_list[row_num][column_num].rjust(column_widths_list[column_num] +1)
-            row_str += '|'
-            outfile_handle.write(row_str + '\n')
+        if show_int_cmd_format_list and port_type_filter:
+            if args.per_module:
+                filter_intf_range_list = build_module_range_list(intf_list)
+            else:
+                filter_intf_range_list = build_intf_range_list(intf_list)
+            for show_int_cmd_format in show_int_cmd_format_list:
+                for filter_intf_range in filter_intf_range_list:
+                    show_int_cmd_list.append(get_show_int_cmd_entry(show_int_cmd_format, filter_intf_range + ' ', args))
+            cli_output_dict.update(issue_cli_commands(show_int_cmd_list, args.cli_timeout, args.serial))
+            first_sample_time = time.time()
+    else:
+        port_type_filter = False
+    #
+    # --per-module without an interface range: issue the counters command for each module of the interfaces in
+    # show interface brief, or for all the interfaces if show interface brief failed
+    #
+    if show_int_cmd_format_list and args.per_module and not port_type_filter and not show_int_cmd_list:
+        inventory_table = create_intf_table(intf_info_var_list)
+        inventory_intf_list = []
+        show_int_brief_json = cli_output_dict.get((show_int_brief_cmd, True))
+        if show_int_brief_json == None or not parse_show_int_brief_json(show_int_brief_json, False, args, inventory_table, inventory_intf_list, {}):
+            parse_show_int_brief(get_cli_output(cli_output_dict, show_int_brief_cmd), False, args, inventory_table, inventory_intf_list, {})
+        module_range_list = [module_intf_range + ' ' for module_intf_range in build_module_range_list(inventory_intf_list)]
+        if not module_range_list:
+            module_range_list = [str(intf_range)]
+        for show_int_cmd_format in show_int_cmd_format_list:
+            for module_intf_range in module_range_list:
+                show_int_cmd_list.append(get_show_int_cmd_entry(show_int_cmd_format, module_intf_range, args))
+        cli_output_dict.update(issue_cli_commands(show_int_cmd_list, args.cli_timeout, args.serial))
+        first_sample_time = time.time()
+    if args.per_module and not args.serial:
+        parse_processes = args.parse_processes or get_cpu_count()
+    else:
+        parse_processes = 1
+    
+    #
+    # For type_brief and the --columns peer_pwwn and device_alias_or_switchname only:
+    # Set the following variables of the interfaces in intf_table:
+    #
+    # 'peer_pwwn' = Peer PWWN
+    # 'device_alias_or_switchname' = device-alias name (if any)
+    #
+    # I could issue 'show device-alias database' and 'show interface' or 'show flogi database' and 'show interface description'
+    # Since the 'show device-alias database' is fabric wide and could be 1000s of entries I will use 'show flogi database'
+    #
+    # With --alias-index the device-aliases come from the device-alias index instead. show device-alias database is
+    # only issued and parsed when the index is missing or the show device-alias status fingerprint has changed.
+    # 
+    if use_flogi:
+        if flogi_list == None:
+            show_flogi_database_json = cli_output_dict.get((show_flogi_database_json_cmd, True))
+            if show_flogi_database_json != None:
+                flogi_list = parse_show_flogi_database_json(show_flogi_database_json, not args.alias_index)
+            if flogi_list == None:
+                flogi_list = parse_show_flogi_database(get_cli_output(cli_output_dict, show_flogi_database_cmd, show_flogi_database_name))
+            if args.cache:
+                set_cache_entry(cache_dict, 'flogi', show_flogi_database_cmd, flogi_list)
+        if args.alias_index:
+            da_fingerprint = get_device_alias_fingerprint(get_cli_output(cli_output_dict, show_da_status_cmd))
+            if alias_index_dict == None or da_fingerprint == None or alias_index_dict['fingerprint'] != da_fingerprint:
+                if alias_index_dict != None:
+                    close_alias_index(alias_index_dict)
+                da_cli_output_dict = issue_cli_commands([[show_da_database_cmd, show_da_database_cmd, show_da_database_cmd if args.use_json else '']], args.cli_timeout, args.serial)
+                alias_list = None
+                show_da_database_json = da_cli_output_dict.get((show_da_database_cmd, True))
+                if show_da_database_json != None:
+                    alias_list = parse_show_device_alias_database_json(show_da_database_json)
+                if alias_list == None:
+                    alias_list = parse_show_device_alias_database(get_cli_output(da_cli_output_dict, show_da_database_cmd))
+                save_alias_index(alias_index_name, da_fingerprint, alias_list)
+                alias_index_dict = open_alias_index(alias_index_name)
+            flogi_list = [[intf, pwwn, lookup_alias_index(alias_index_dict, pwwn)] for intf, pwwn, device_alias in flogi_list]
+            close_alias_index(alias_index_dict)
+        set_flogi(flogi_list, intf_table)
+
+    #
+    # Issue show interface description command if include_description, --brief or the --columns description is specified
+    #
+    # Set the following variable of the interfaces in intf_table:
+    # 'description' = first 64 bytes of switchport description
+    #
+    max_descr_len = None
+    if use_description:
+        if description_list == None:
+            show_int_descr_json = cli_output_dict.get((show_int_descr_cmd, True))
+            if show_int_descr_json != None:
+                description_list = parse_show_int_description_json(show_int_descr_json)
+            if description_list == None:
+                description_list = parse_show_int_description(get_cli_output(cli_output_dict, show_int_descr_cmd))
+            if args.cache:
+                set_cache_entry(cache_dict, 'description', show_int_descr_cmd, description_list)
+        max_descr_len = set_descriptions(description_list, port_type_filter, intf_table)
+    #
+    # Determine NX-OS version
+    # At 8.4(2) the output of the "show interface counters details" command has completely changed
+    #
+    if show_int_counter_detail_new == None:
+        show_ver_json = cli_output_dict.get((show_ver_cmd, True))
+        if show_ver_json != None:
+            show_int_counter_detail_new = parse_show_version_json(show_ver_json)
+        if show_int_counter_detail_new == None:
+            show_int_counter_detail_new = parse_show_version(get_cli_output(cli_output_dict, show_ver_cmd, '"show version"'))
+        if args.cache:
+            set_cache_entry(cache_dict, 'version', boot_time, show_int_counter_detail_new)
+        if daemon_dict['socket'] != None:
+            daemon_dict['counter_detail_new'] = show_int_counter_detail_new
+    timing_dict['counter_detail_new'] = show_int_counter_detail_new
+
+
+    #
+    # Build the counter_list of each requested type
+    #
+    # The link, congestion and general stats all come from the show interface counters detailed output and both
+    # transceiver types from the show interface transceiver output, so the output is parsed once with the merged
+    # counter_list. Each type is displayed as its own table, or all in one table with --wide.
+    #
+    # --columns is one table of the counter_list of its variables. The output is parsed with the counter_list of
+    # the columns and --where variables.
+    #
+    # table_list = [[type_line, counter_list], ...]
+    #
+    table_list = []
+    for stat_type in stat_type_list:
+        table_list.append(list(build_counter_list(stat_type, show_int_counter_detail_new)))
+    if args.columns:
+        table_list.append(['Columns:', build_columns_counter_list(args.columns, show_int_counter_detail_new)])
+    counter_list = merge_counter_lists([table_entry[1] for table_entry in table_list])
+    if args.wide and len(table_list) > 1:
+        table_list = [[' + '.join([table_entry[0][:-1] for table_entry in table_list]) + ':', counter_list]]
+    parse_counter_list = counter_list
+    if args.columns:
+        parse_counter_list = build_columns_counter_list(columns_var_list, show_int_counter_detail_new)
+
+    
+    magnatude_list = [[1000000000000, 'TB'], [1000000000, 'GB'], [1000000, 'MB'], [1000,'KB'], [0, 'B']]
+
+    column_names_list, column_widths_list, default_intf_dict = build_columns(counter_list)
+    if not check_sort_column(counter_list, column_names_list, args):
+        sys.exit(1)
+    #
+    # The JSON output of show interface counters detailed has the counters variables, so the --columns of the other
+    # sources do not make it fall back to the text output
+    #
+    json_intf_dict = default_intf_dict
+    if args.columns:
+        json_intf_dict = dict([[var_name, var_value] for var_name, var_value in build_columns(parse_counter_list)[2].items() if var_name in json_counter_key_dict])
+    #
+    # Go through show interface counters detailed output and set the variables of each interface in intf_table
+    #
+    # For type_brief (and --columns of only brief variables) intf_table is already built so skip this
+    #
+    # If port_type_filter is TRUE then intf_table has already been initialized with the filtered interfaces
+    #
+    # --where is compiled once the variables of counter_list are in intf_table and is evaluated once the outputs are
+    # parsed, so the interfaces that do not match are not in intf_list
+    #
+    # Watch mode keeps the parsed interface blocks of each sample, so the next sample only parses the blocks that changed
+    #
+    block_cache_dict = None
+    if args.interval:
+        block_cache_dict = {}
+    if show_int_cmd_format_list:
+        counter_index_dict = compile_counter_list(parse_counter_list, intf_table)
+        where_function = None
+        if args.where != None:
+            if not check_where(intf_table, args):
+                sys.exit(1)
+            where_function = compile_where(args.where, intf_table)
+        parse_show_int_counters_outputs(cli_output_dict, show_int_cmd_list, counter_index_dict, json_intf_dict, port_type_filter, intf_table, intf_list, parse_processes, where_function, block_cache_dict)
+                        
+    sample_time = first_sample_time
+    timing_dict['phases']['parse'] += time.time() - parse_start - (timing_dict['phases']['cli'] - parse_cli_time)
+    timing_dict['intfs'] = len(intf_list)
+
+    #print('intf_table interfaces: ' + str(intf_table['intf_names']))
+    #
+    # --format csv, jsonl or json: one record per interface with all the requested types
+    #
+    if args.output_format != 'table':
+        if intf_table['intf_names']:
+            write_records(' + '.join([table_entry[0][:-1] for table_entry in table_list]) + ':', current_datetime, counter_list, intf_list, intf_table, args, outfile_handle)
+    elif intf_table['intf_names']:
+        for type_line, table_counter_list in table_list:
+            column_names_list, column_widths_list, table_default_intf_dict = build_columns(table_counter_list)
+            output_table_list = build_table_rows(table_counter_list, intf_list, intf_table, column_widths_list, args)
+            clock_type_line = current_datetime + ' ' + type_line
+            print_table(clock_type_line, column_names_list, column_widths_list, output_table_list, intf_table, max_descr_len, args, outfile_handle)
+
+    #
+    # History: record the sample in the --history file
+    #
+    history_dict = None
+    if args.history:
+        history_name = '/bootflash/' + args.history
+        history_col_list = get_history_col_list(get_var_list(counter_list), intf_table)
+        history_exists = os.path.exists(history_name)
+        try :
+            history_dict, error_str = open_history_for_write(history_name, history_col_list, intf_list, args.history_retention, args.history_resolution, args.history_max_intfs)
+        except Exception as e:
+            error_str = 'Create failed with {}'.format(e)
+        if history_dict == None:
+            print('Unable to record history: "' + history_name + '". ' + error_str)
+        else:
+            if not history_exists:
+                print('Created history file "' + history_name + '" for ' + str(history_dict['num_samples']) + ' samples of ' + str(history_dict['max_intfs']) + ' interfaces (' + str(history_dict['file_len']) + ' bytes)')
+            write_history_sample(history_dict, history_col_list, sample_time, intf_list, intf_table)
+            warn_history_intfs(history_dict, history_name, args)
+
+    #
+    # Snapshot: display the delta and per second rate since the snapshot saved by the previous run
+    #
+    if args.interval or args.snapshot:
+        rate_var_list = get_rate_var_list(default_intf_dict, intf_table)
+        watch_table_list = [[type_line, build_watch_counter_list(table_counter_list, rate_var_list)] for type_line, table_counter_list in table_list]
+    if args.snapshot:
+        snapshot_name = '/bootflash/' + args.snapshot
+        snapshot_time, snapshot_table = load_snapshot(snapshot_name)
+        if snapshot_time != None:
+            snapshot_datetime = datetime.datetime.fromtimestamp(snapshot_time).strftime('%Y/%m/%d %H:%M:%S')
+            for type_line, watch_counter_list in watch_table_list:
+                print_delta_table(type_line, 'since ' + snapshot_datetime, watch_counter_list, intf_list, snapshot_table, intf_table, default_intf_dict, rate_var_list, sample_time - snapshot_time, max_descr_len, args, outfile_handle)
+
+    #
+    # Watch mode: sample the counters every --interval seconds and print the delta and per second rate since the previous sample
+    #
+    # Only the counters command is issued again. The interfaces, their show interface brief values and descriptions,
+    # the NX-OS version and the compiled counter_list are kept from the first sample.
+    #
+    if args.interval:
+        sample_num = 0
+        try :
+            while args.count == 0 or sample_num < args.count:
+                sample_num += 1
+                time.sleep(max(first_sample_time + args.interval * sample_num - time.time(), 0))
+                cli_output_dict = issue_cli_commands(show_int_cmd_list, args.cli_timeout, args.serial)
+                prev_sample_time = sample_time
+                sample_time = time.time()
+                #
+                # Only the interfaces of the first sample are kept
+                #
+                prev_table = intf_table
+                intf_table = create_intf_table(prev_table['var_list'])
+                for intf in intf_list:
+                    set_intf_value(intf_table, intf, 'description', get_intf_value(prev_table, intf, 'description'))
+                parse_start = time.time()
+                parse_show_int_counters_outputs(cli_output_dict, show_int_cmd_list, counter_index_dict, json_intf_dict, True, intf_table, intf_list, parse_processes, None, block_cache_dict)
+                add_phase_time('parse', parse_start)
+                if history_dict != None:
+                    write_history_sample(history_dict, history_col_list, sample_time, intf_list, intf_table)
+                    warn_history_intfs(history_dict, history_name, args)
+                for type_line, watch_counter_list in watch_table_list:
+                    print_delta_table(type_line, 'over %.1fs' % (sample_time - prev_sample_time), watch_counter_list, intf_list, prev_table, intf_table, default_intf_dict, rate_var_list, sample_time - prev_sample_time, max_descr_len, args, outfile_handle)
+                sys.stdout.flush()
+        except KeyboardInterrupt:
+            pass
+
+    #
+    # Save the counters of the last sample for the next run
+    #
+    if args.snapshot:
+        try :
+            save_snapshot(snapshot_name, sample_time, intf_list, rate_var_list, intf_table)
+        except Exception as e:
+            print('Unable to save snapshot: "' + snapshot_name + '". Save failed with {}'.format(e))
+
+    if history_dict != None:
+        close_history(history_dict)
+
+    #
+    # Save the cache and report how many show commands it saved
+    #
+    if args.cache:
+        cache_line = 'Cache: ' + str(cache_dict['hits'] - cache_hits) + ' hits, ' + str(cache_dict['misses'] - cache_misses) + ' misses (total ' + str(cache_dict['hits']) + ' hits, ' + str(cache_dict['misses']) + ' misses)'
         #
-        # print trailer line
+        # Keep the --format records on stdout parseable
         #
-        outfile_handle.write(header_trailer + '\n')
-        outfile_handle.write('\n')
+        if args.output_format == 'table':
+            print(cache_line)
+        else:
+            sys.stderr.write(cache_line + '\n')
+        try :
+            save_cache(cache_name, cache_dict)
+        except Exception as e:
+            print('Unable to save cache: "' + cache_name + '". Save failed with {}'.format(e))
+
+    end_timing(args, profiler)
+
+    if outfile_handle != None:
         outfile_handle.close()
-        
\ No newline at end of file
+
+if __name__ == '__main__':
+    main()